@@ -0,0 +1,128 @@
+"""
+Storage benchmark for scraped followers.
+
+Scales the followers in ``data/alan_johnsonvfx_followers.json`` up to a
+larger account (unique ids and usernames per copy) and compares the current
+pretty-printed JSON output, NDJSON (``OUTPUT_FORMAT=ndjson``) and the
+Parquet store in ``columnar``: file size, full-scan read time and, for
+Parquet, a read projected onto ``username``. Needs pyarrow.
+
+Usage:
+    python benchmarks/bench_columnar.py [--scale 100] [--repeat 5]
+        [--sample data/alan_johnsonvfx_followers.json]
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ENGINE_DIR))
+
+import columnar  # noqa: E402
+from output import FollowerWriter, read_followers  # noqa: E402
+
+
+def scaled_followers(users, scale):
+    """
+    ``scale`` copies of ``users`` with distinct ids, usernames and picture
+    URL signatures, so copies do not compress better than real accounts.
+    """
+    rng = random.Random(0)
+    out = []
+    for copy in range(scale):
+        for user in users:
+            user = dict(user)
+            pk = str(int(user["pk"]) + copy * 10**12)
+            for key in ("pk",) + columnar.ID_ALIASES:
+                user[key] = pk
+            user["username"] = f"{user['username']}_{copy}"
+            user["fbid_v2"] = str(int(user["fbid_v2"]) + copy)
+            user["profile_pic_url"] = re.sub(
+                r"oh=[^&]+", f"oh=00_{rng.getrandbits(256):064x}", user["profile_pic_url"]
+            )
+            out.append(user)
+    return out
+
+
+def best(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--sample",
+        default=str(ENGINE_DIR / "data" / "alan_johnsonvfx_followers.json"),
+    )
+    args = parser.parse_args()
+
+    with open(args.sample, "r", encoding="utf-8") as f:
+        header = json.load(f)
+    users = scaled_followers(header.pop("followers"), args.scale)
+    print(f"{len(users):,} followers")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        json_path = tmp / "followers.json"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(dict(header, followers=users), f, indent=4)
+
+        ndjson_path = tmp / "followers.ndjson"
+        with FollowerWriter(ndjson_path, header) as writer:
+            for start in range(0, len(users), 12):
+                writer.write_page(users[start:start + 12])
+
+        root = tmp / "parquet"
+        with columnar.ColumnarFollowerWriter(root, header) as writer:
+            for start in range(0, len(users), 12):
+                writer.write_page(users[start:start + 12])
+        parquet_path = writer.path
+
+        def read_json():
+            with open(json_path, "r", encoding="utf-8") as f:
+                return json.load(f)["followers"]
+
+        def read_ndjson():
+            return list(read_followers(ndjson_path)[1])
+
+        rows = [
+            ("json (indent=4)", json_path.stat().st_size, best(read_json, args.repeat)),
+            ("ndjson", ndjson_path.stat().st_size, best(read_ndjson, args.repeat)),
+            (
+                "parquet",
+                parquet_path.stat().st_size,
+                best(lambda: columnar.read_followers_table(root), args.repeat),
+            ),
+            (
+                "parquet [username]",
+                parquet_path.stat().st_size,
+                best(
+                    lambda: columnar.read_followers_table(root, columns=["username"]),
+                    args.repeat,
+                ),
+            ),
+        ]
+
+    base_size, base_time = rows[0][1], rows[0][2]
+    print(f"{'format':<20}{'bytes':>12}{'size':>8}{'full scan':>12}{'speedup':>9}")
+    for name, size, seconds in rows:
+        print(
+            f"{name:<20}{size:>12,}{size / base_size:>8.1%}"
+            f"{seconds * 1000:>10.1f}ms{base_time / seconds:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
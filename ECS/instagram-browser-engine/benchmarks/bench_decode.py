@@ -0,0 +1,105 @@
+"""
+Event decoding benchmark for mycdp.
+
+Replays the ``performance_logs.txt`` capture through
+``mycdp.util.parse_json_event`` and reports events decoded per second.
+Run it on a checkout from before the fast ``from_json`` decoders of
+``network.py`` to compare. It then compares eager and lazy
+(``parse_json_event(..., lazy=True)``) decoding for a consumer that only
+filters on request/response URL and method.
+
+Usage:
+    python benchmarks/bench_decode.py [--rounds 200] [--repeat 5]
+        [--log performance_logs.txt]
+"""
+import argparse
+import ast
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ENGINE_DIR))
+
+from mycdp import network, util  # noqa: E402
+
+
+def load_events(path):
+    """Load the CDP messages recorded by ``driver.get_log("performance")``."""
+    with open(path, "r", encoding="utf-8") as f:
+        entries = ast.literal_eval(f.read())
+    return [json.loads(entry["message"])["message"] for entry in entries]
+
+
+def run(events, rounds):
+    parse = util.parse_json_event
+    for event in events:
+        parse(event)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for event in events:
+            parse(event)
+    return len(events) * rounds / (time.perf_counter() - start)
+
+
+def touch_urls(event):
+    """Read only what the pipeline filters on."""
+    if isinstance(event, network.RequestWillBeSent):
+        return event.request.url, event.request.method
+    if isinstance(event, network.ResponseReceived):
+        return event.response.url, event.response.status
+    return None
+
+
+def run_filter(events, rounds, lazy):
+    parse = util.parse_json_event
+    for event in events:
+        touch_urls(parse(event, lazy=lazy))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for event in events:
+            touch_urls(parse(event, lazy=lazy))
+    return len(events) * rounds / (time.perf_counter() - start)
+
+
+def bytes_per_event(events, lazy):
+    """Memory retained by the decoded events, excluding the raw dicts."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [util.parse_json_event(event, lazy=lazy) for event in events]
+    for event in kept:
+        touch_urls(event)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(kept)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--log", default=str(ENGINE_DIR / "performance_logs.txt")
+    )
+    args = parser.parse_args()
+
+    events = load_events(args.log)
+    print(f"{len(events)} events")
+
+    rate = max(run(events, args.rounds) for _ in range(args.repeat))
+    print(f"eager decode: {rate:>12,.0f} events/s")
+
+    print("\nfilter on url/method:")
+    for lazy in (False, True):
+        rate = max(
+            run_filter(events, args.rounds, lazy) for _ in range(args.repeat)
+        )
+        size = bytes_per_event(events, lazy)
+        label = "lazy" if lazy else "eager"
+        print(f"{label:>9}: {rate:>12,.0f} events/s {size:>8,.0f} bytes/event")
+
+
+if __name__ == "__main__":
+    main()
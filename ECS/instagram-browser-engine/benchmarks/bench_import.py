@@ -0,0 +1,93 @@
+"""
+Import-time benchmark for the mycdp package.
+
+Every measurement runs in a fresh interpreter so nothing is cached in
+``sys.modules``. "lazy" is the cost of the import as it behaves today;
+"eager" additionally resolves every deferred sibling reference, which is
+what each import used to cost when domains imported each other up front.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 5] [domain ...]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ENGINE_DIR))
+
+import mycdp  # noqa: E402
+
+_TIMER = """
+import sys, time
+start = time.perf_counter()
+import {target}
+{force}
+elapsed = time.perf_counter() - start
+loaded = sum(1 for m in sys.modules if m.startswith("mycdp."))
+print(elapsed * 1000, loaded)
+"""
+
+# Emulates the old behaviour: pull in the package's eager imports and then
+# keep resolving deferred siblings until the whole closure is loaded.
+_FORCE = """
+import mycdp
+from mycdp.util import _LazyDomain
+for name in {eager}:
+    getattr(mycdp, name)
+pending = True
+while pending:
+    pending = False
+    for module in list(sys.modules.values()):
+        if not getattr(module, "__name__", "").startswith("mycdp."):
+            continue
+        for value in list(vars(module).values()):
+            if isinstance(value, _LazyDomain):
+                value.__getattr__("__name__")
+                pending = True
+"""
+
+
+def measure(target, eager, repeat):
+    force = _FORCE.format(eager=eager) if eager is not None else ""
+    code = _TIMER.format(target=target, force=force)
+    timings = []
+    loaded = 0
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ENGINE_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        timings.append(float(out[0]))
+        loaded = int(out[1])
+    return statistics.median(timings), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("domains", nargs="*", default=mycdp.__all__)
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so the first row is not charged for compiling.
+    measure("mycdp", ["dom", "fetch", "target"], 1)
+
+    print(f"{'import':<34}{'lazy ms':>10}{'mods':>6}{'eager ms':>10}{'mods':>6}")
+    rows = [("mycdp", ["dom", "fetch", "target"])]
+    rows += [(f"mycdp.{name}", []) for name in args.domains]
+    for target, eager in rows:
+        lazy_ms, lazy_mods = measure(target, None, args.repeat)
+        eager_ms, eager_mods = measure(target, eager, args.repeat)
+        print(
+            f"{target:<34}{lazy_ms:>10.1f}{lazy_mods:>6}"
+            f"{eager_ms:>10.1f}{eager_mods:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
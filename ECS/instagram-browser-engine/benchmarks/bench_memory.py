@@ -0,0 +1,75 @@
+"""
+Memory benchmark for decoded CDP events.
+
+Decodes every ``Network.responseReceived`` event in ``performance_logs.txt``
+many times over and reports the bytes retained per event, once with the
+default dataclasses and once with ``MYCDP_SLOTS=1``. Each mode runs in a
+fresh interpreter because slots are chosen when the domains are imported.
+
+Usage:
+    python benchmarks/bench_memory.py [--copies 200] [--log performance_logs.txt]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+
+_MEASURE = """
+import ast, json, sys, tracemalloc
+sys.path.insert(0, {engine!r})
+from mycdp import network, util
+
+with open({log!r}, "r", encoding="utf-8") as f:
+    entries = ast.literal_eval(f.read())
+messages = [json.loads(entry["message"])["message"] for entry in entries]
+events = [m for m in messages if m["method"] == "Network.responseReceived"]
+events = [json.loads(json.dumps(m)) for m in events * {copies}]
+util.parse_json_event(events[0])
+
+tracemalloc.start()
+before = tracemalloc.get_traced_memory()[0]
+kept = [util.parse_json_event(event) for event in events]
+after = tracemalloc.get_traced_memory()[0]
+print((after - before) / len(kept), len(kept), hasattr(kept[0], "__dict__"))
+"""
+
+
+def measure(log, copies, slots):
+    env = dict(os.environ, MYCDP_SLOTS="1" if slots else "0")
+    code = _MEASURE.format(engine=str(ENGINE_DIR), log=log, copies=copies)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    return float(out[0]), int(out[1]), out[2] == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--copies", type=int, default=200)
+    parser.add_argument(
+        "--log", default=str(ENGINE_DIR / "performance_logs.txt")
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for slots in (False, True):
+        per_event, count, has_dict = measure(args.log, args.copies, slots)
+        results[slots] = per_event
+        label = "slots" if slots else "dict"
+        print(
+            f"{label:>6}: {per_event:>8,.0f} bytes per ResponseReceived "
+            f"({count} events, __dict__={has_dict})"
+        )
+    saved = 1 - results[True] / results[False]
+    print(f"saved: {saved:.0%}")
+
+
+if __name__ == "__main__":
+    main()
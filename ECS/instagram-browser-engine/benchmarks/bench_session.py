@@ -0,0 +1,173 @@
+"""
+Command throughput benchmark for ``mycdp.session.CDPSession``.
+
+Runs a fake CDP endpoint that answers every command immediately (and emits
+a ``Network.dataReceived`` event for every ``Network.getCookies`` it sees),
+then reports commands per second with one command in flight at a time and
+with many pipelined commands.
+
+By default the fake endpoint is served over a local websocket (needs the
+``websockets`` package). ``--transport memory`` swaps in an in-process
+message pipe, optionally with a simulated round-trip ``--latency``, to
+measure the session alone.
+
+Usage:
+    python benchmarks/bench_session.py [--commands 20000] [--window 64]
+        [--transport websocket|memory] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ENGINE_DIR))
+
+from mycdp import network  # noqa: E402
+from mycdp.session import CDPSession  # noqa: E402
+
+
+def fake_reply(raw):
+    """Return the frames a minimal browser would send back for ``raw``."""
+    message = json.loads(raw)
+    reply = {"id": message["id"], "result": {}}
+    if "sessionId" in message:
+        reply["sessionId"] = message["sessionId"]
+    if message["method"] == "Network.getCookies":
+        reply["result"] = {"cookies": []}
+        event = {
+            "method": "Network.dataReceived",
+            "params": {
+                "requestId": str(message["id"]),
+                "timestamp": 1.0,
+                "dataLength": 1,
+                "encodedDataLength": 1,
+            },
+        }
+        return [json.dumps(reply), json.dumps(event)]
+    return [json.dumps(reply)]
+
+
+class MemoryConnection:
+    """An in-process stand-in for a websocket talking to a fake browser."""
+
+    def __init__(self, latency=0.0):
+        self._incoming = asyncio.Queue()
+        self._latency = latency
+
+    def _deliver(self, frames):
+        for frame in frames:
+            self._incoming.put_nowait(frame)
+
+    async def send(self, raw):
+        frames = fake_reply(raw)
+        if self._latency:
+            loop = asyncio.get_running_loop()
+            loop.call_later(self._latency, self._deliver, frames)
+        else:
+            self._deliver(frames)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        frame = await self._incoming.get()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+    async def close(self):
+        self._incoming.put_nowait(None)
+
+
+async def serve_fake_browser():
+    """Serve the fake browser on a local websocket and return (server, url)."""
+    import websockets
+
+    async def handler(websocket, *args):
+        async for raw in websocket:
+            for frame in fake_reply(raw):
+                await websocket.send(frame)
+
+    server = await websockets.serve(handler, "127.0.0.1", 0)
+    port = next(iter(server.sockets)).getsockname()[1]
+    return server, f"ws://127.0.0.1:{port}/devtools/browser/fake"
+
+
+async def sequential(session, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        await session.execute(network.enable())
+    return count / (time.perf_counter() - start)
+
+
+async def pipelined(session, count):
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(session.execute(network.enable()) for _ in range(count))
+    )
+    return count / (time.perf_counter() - start)
+
+
+async def with_events(session, count):
+    """Pipelined commands while a consumer drains one event per command."""
+    received = 0
+
+    async def consume(stream):
+        nonlocal received
+        async for _ in stream:
+            received += 1
+            if received == count:
+                break
+
+    stream = session.listen(network.DataReceived)
+    start = time.perf_counter()
+    consumer = asyncio.ensure_future(consume(stream))
+    await asyncio.gather(
+        *(session.execute(network.get_cookies()) for _ in range(count))
+    )
+    await consumer
+    stream.close()
+    return count / (time.perf_counter() - start)
+
+
+async def run(args):
+    server = None
+    if args.transport == "memory":
+        connection = MemoryConnection(args.latency / 1000)
+        session = CDPSession(connection, max_in_flight=args.window).start()
+    else:
+        server, url = await serve_fake_browser()
+        session = await CDPSession.connect(url, max_in_flight=args.window)
+    async with session:
+        await sequential(session, 100)
+        print(f"transport: {args.transport}, window: {args.window}")
+        rate = await sequential(session, min(args.commands, 1000))
+        print(f"sequential: {rate:>12,.0f} commands/s")
+        rate = await pipelined(session, args.commands)
+        print(f"pipelined:  {rate:>12,.0f} commands/s")
+        rate = await with_events(session, args.commands)
+        print(f"+events:    {rate:>12,.0f} commands/s")
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--commands", type=int, default=20000)
+    parser.add_argument("--window", type=int, default=64)
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="simulated round trip in ms (memory transport only)",
+    )
+    parser.add_argument(
+        "--transport", choices=("websocket", "memory"), default="websocket"
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
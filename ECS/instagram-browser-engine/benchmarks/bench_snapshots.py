@@ -0,0 +1,98 @@
+"""
+Storage benchmark for the follower snapshot history.
+
+Simulates daily re-scrapes of one account with a small daily churn and
+compares the space taken by keeping every day's full follower set as
+``edges`` rows against the keyframe + delta history in ``snapshots``. It
+also times rebuilding the oldest and newest snapshot.
+
+Usage:
+    python benchmarks/bench_snapshots.py [--followers 100000] [--days 90]
+        [--churn 0.002]
+"""
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ENGINE_DIR))
+
+from snapshots import SnapshotHistory  # noqa: E402
+
+EDGES = """
+CREATE TABLE edges (
+    target_pk INTEGER NOT NULL,
+    scrape_date TEXT NOT NULL,
+    follower_pk INTEGER NOT NULL,
+    PRIMARY KEY (target_pk, scrape_date, follower_pk)
+) WITHOUT ROWID;
+"""
+
+
+def daily_sets(followers, days, churn, seed=0):
+    rng = random.Random(seed)
+    current = set(rng.sample(range(10**9, 10**11), followers))
+    for day in range(days):
+        changed = max(1, int(len(current) * churn))
+        current -= set(rng.sample(sorted(current), changed))
+        current |= {rng.randrange(10**9, 10**11) for _ in range(changed)}
+        yield f"2025-{1 + day // 28:02d}-{1 + day % 28:02d}", sorted(current)
+
+
+def db_size(conn, path):
+    conn.execute("VACUUM")
+    conn.commit()
+    return Path(path).stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--followers", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--churn", type=float, default=0.002)
+    args = parser.parse_args()
+    print(
+        f"{args.followers:,} followers, {args.days} daily scrapes, "
+        f"{args.churn:.1%} churn per day"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        full_path, delta_path = Path(tmp) / "full.db", Path(tmp) / "delta.db"
+        full = sqlite3.connect(full_path)
+        full.executescript(EDGES)
+        delta = sqlite3.connect(delta_path)
+        history = SnapshotHistory(delta)
+
+        record_time = 0.0
+        dates = []
+        for date, ids in daily_sets(args.followers, args.days, args.churn):
+            dates.append(date)
+            with full:
+                full.executemany(
+                    "INSERT INTO edges VALUES (1, ?, ?)", ((date, i) for i in ids)
+                )
+            start = time.perf_counter()
+            history.record(1, date, ids)
+            record_time += time.perf_counter() - start
+
+        full_size = db_size(full, full_path)
+        delta_size = db_size(delta, delta_path)
+        print(f"{'full edges per day':>22}: {full_size:>14,} bytes")
+        print(
+            f"{'keyframes + deltas':>22}: {delta_size:>14,} bytes "
+            f"({full_size / delta_size:,.0f}x smaller)"
+        )
+        print(f"{'record':>22}: {record_time / args.days * 1000:>11.1f}ms per scrape")
+        for label, date in (("rebuild oldest", dates[0]), ("rebuild newest", dates[-1])):
+            start = time.perf_counter()
+            ids = history.snapshot(1, date)
+            elapsed = time.perf_counter() - start
+            print(f"{label:>22}: {elapsed * 1000:>11.1f}ms ({len(ids):,} ids)")
+
+
+if __name__ == "__main__":
+    main()
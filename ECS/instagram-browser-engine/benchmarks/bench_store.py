@@ -0,0 +1,123 @@
+"""
+Ingest and lookup benchmark for the SQLite scrape database.
+
+Builds synthetic accounts from the followers in
+``data/alan_johnsonvfx_followers.json`` (distinct pks, with followers
+shared between accounts) and measures:
+
+* bulk ingest rate through ``FollowerStore`` with one commit per
+  12-user page and with larger batches, in WAL mode;
+* point-lookup latency for username -> pk, a follower-count history,
+  the followers of one account and the followers shared by two accounts.
+
+Usage:
+    python benchmarks/bench_store.py [--accounts 20] [--followers 5000]
+        [--lookups 2000]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ENGINE_DIR))
+
+from follower_store import FollowerStore  # noqa: E402
+
+
+def synthetic_accounts(sample, accounts, followers, seed=0):
+    """``accounts`` follower lists drawn from a shared pool of users."""
+    rng = random.Random(seed)
+    pool = []
+    for i in range(followers * accounts // 2):
+        user = dict(sample[i % len(sample)])
+        pk = str(10**12 + i)
+        for key in ("pk", "pk_id", "id", "strong_id__"):
+            user[key] = pk
+        user["username"] = f"{user['username']}_{i}"
+        pool.append(user)
+    return {
+        f"target_{n}": rng.sample(pool, followers) for n in range(accounts)
+    }
+
+
+def ingest(path, data, batch_size, limit=None):
+    """Ingest ``data`` page by page; returns followers per second."""
+    store = FollowerStore(path, batch_size=batch_size)
+    count = 0
+    start = time.perf_counter()
+    for n, (account, users) in enumerate(data.items()):
+        target_pk = store.add_target(n + 1, account)
+        users = users[:limit] if limit else users
+        for offset in range(0, len(users), 12):
+            count += store.ingest_page(target_pk, "2025-02-14", users[offset:offset + 12])
+        store.record_scrape(
+            {"username": account, "user_id": target_pk, "scrape_date": "2025-02-14",
+             "scrape_start_time": time.time(), "followers_count": len(users)}
+        )
+    store.close()
+    return count / (time.perf_counter() - start)
+
+
+def latency(func, args, rounds):
+    timings = []
+    for i in range(rounds):
+        arg = args[i % len(args)]
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return statistics.median(timings) * 1e6, timings[int(0.99 * (len(timings) - 1))] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--followers", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument(
+        "--sample",
+        default=str(ENGINE_DIR / "data" / "alan_johnsonvfx_followers.json"),
+    )
+    args = parser.parse_args()
+
+    with open(args.sample, "r", encoding="utf-8") as f:
+        sample = json.load(f)["followers"]
+    data = synthetic_accounts(sample, args.accounts, args.followers)
+    total = args.accounts * args.followers
+    print(f"{args.accounts} accounts x {args.followers:,} followers = {total:,} edges")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        print("\ningest:")
+        rate = ingest(tmp / "per_page.db", data, batch_size=1, limit=100)
+        print(f"{'commit per page':>22}: {rate:>10,.0f} followers/s")
+        for batch_size in (1_000, 50_000):
+            rate = ingest(tmp / f"batch_{batch_size}.db", data, batch_size)
+            print(f"{f'batches of {batch_size:,}':>22}: {rate:>10,.0f} followers/s")
+
+        db = tmp / f"batch_{50_000}.db"
+        print(f"{'database size':>22}: {db.stat().st_size:>10,} bytes")
+
+        store = FollowerStore(db)
+        usernames = [user["username"] for users in data.values() for user in users[:50]]
+        targets = list(range(1, args.accounts + 1))
+        pairs = [(a, b) for a in targets for b in targets if a < b]
+        print("\nlookups (p50 / p99):")
+        for label, func, func_args in (
+            ("username -> pk", store.pk_for, usernames),
+            ("count history", store.followers_count_history, list(data)),
+            ("followers of X", store.followers, targets),
+            ("follows X and Y", store.common_followers, pairs),
+        ):
+            p50, p99 = latency(func, func_args, args.lookups)
+            print(f"{label:>22}: {p50:>8.1f}us / {p99:>8.1f}us")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
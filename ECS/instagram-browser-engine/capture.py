@@ -0,0 +1,134 @@
+"""
+Capture of Instagram's followers API responses through the Fetch domain.
+
+Opening the followers modal makes the page request
+``/api/v1/friendships/<user_id>/followers/``. Instead of sleeping and then
+scanning the whole performance log for that URL, ``FollowerCapture``
+intercepts the request at the Response stage, reads the body with
+``Fetch.getResponseBody`` and hands the user id and the first page of
+followers over as soon as the response lands.
+"""
+import asyncio
+import base64
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from mycdp import fetch
+
+logger = logging.getLogger(__name__)
+
+FOLLOWERS_URL_PATTERN = "*://www.instagram.com/api/v1/friendships/*/followers/*"
+FOLLOWERS_URL_RE = re.compile(r"friendships/(\d+)/followers/")
+
+
+@dataclass
+class CapturedFollowers:
+    """The followers request the page made and the page it got back."""
+    user_id: str
+    url: str
+    page: dict
+
+
+class FollowerCapture:
+    """
+    Intercepts the first followers API response on the bridged page.
+
+    Call ``arm()`` before the click that opens the followers modal, then
+    ``wait()`` for the result. Every intercepted request is continued
+    unchanged, and interception is switched off again by ``disarm()``.
+    """
+
+    def __init__(self, bridge, url_pattern: str = FOLLOWERS_URL_PATTERN):
+        self._bridge = bridge
+        self._url_pattern = url_pattern
+        self._stream = None
+        self._task = None
+        self._done = threading.Event()
+        self.result: Optional[CapturedFollowers] = None
+
+    def arm(self) -> None:
+        """Start intercepting followers responses."""
+        self._done.clear()
+        self.result = None
+        self._bridge.run(self._arm(), timeout=10)
+
+    async def _arm(self):
+        page = self._bridge.page
+        self._stream = page.listen(fetch.RequestPaused)
+        self._task = asyncio.ensure_future(self._handle(self._stream))
+        await page.execute(
+            fetch.enable(
+                patterns=[
+                    fetch.RequestPattern(
+                        url_pattern=self._url_pattern,
+                        request_stage=fetch.RequestStage.RESPONSE,
+                    )
+                ]
+            )
+        )
+
+    async def _handle(self, stream):
+        page = self._bridge.page
+        async for event in stream:
+            try:
+                if self.result is None:
+                    self._capture(event, await self._body(event))
+            except Exception as e:
+                logger.warning(f"Could not read followers response: {e}")
+            finally:
+                await page.execute(fetch.continue_request(event.request_id))
+
+    async def _body(self, event) -> Optional[str]:
+        status = event.response_status_code
+        if status is None or not 200 <= status < 300:
+            return None
+        body, base64_encoded = await self._bridge.page.execute(
+            fetch.get_response_body(event.request_id)
+        )
+        if base64_encoded:
+            body = base64.b64decode(body).decode("utf-8")
+        return body
+
+    def _capture(self, event, body: Optional[str]) -> None:
+        url = event.request.url
+        match = FOLLOWERS_URL_RE.search(url)
+        if not match or body is None:
+            return
+        self.result = CapturedFollowers(
+            user_id=match.group(1), url=url, page=json.loads(body)
+        )
+        logger.info(f"Captured followers response for user {self.result.user_id}")
+        self._done.set()
+
+    def wait(self, timeout: float) -> Optional[CapturedFollowers]:
+        """Block until a followers response was captured or ``timeout``."""
+        self._done.wait(timeout)
+        return self.result
+
+    def disarm(self) -> None:
+        """Stop intercepting and continue anything still paused."""
+        try:
+            self._bridge.run(self._disarm(), timeout=10)
+        except Exception as e:
+            logger.debug(f"Error disarming follower capture: {e}")
+
+    async def _disarm(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if not self._bridge.page.closed:
+            await self._bridge.page.execute(fetch.disable())
+
+    def __enter__(self):
+        self.arm()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disarm()
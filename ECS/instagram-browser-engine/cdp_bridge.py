@@ -0,0 +1,104 @@
+"""
+Synchronous access to the browser's DevTools connection from SeleniumBase.
+
+ChromeDriver already runs Chrome with a DevTools port (exposed as
+``goog:chromeOptions.debuggerAddress``). ``CDPBridge`` opens a second,
+event-capable client on that port with ``mycdp.session`` and runs it on a
+background event loop, so the synchronous scraping code can subscribe to
+CDP events (Fetch, Page, Network, ...) that ``driver.execute_cdp_cmd``
+cannot deliver.
+"""
+import asyncio
+import json
+import logging
+import threading
+import urllib.request
+
+from mycdp import target
+from mycdp.session import CDPSession, TargetMultiplexer
+
+logger = logging.getLogger(__name__)
+
+
+class CDPBridge:
+    """
+    A DevTools session for the page the WebDriver is controlling.
+
+    ``page`` is a ``CDPSession`` attached (flat) to the driver's current
+    window; ``run`` executes a coroutine on the bridge loop and waits for
+    its result from the calling thread.
+    """
+
+    def __init__(self, debugger_address: str, target_id: str):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="cdp-bridge", daemon=True
+        )
+        self._thread.start()
+        try:
+            self.browser, self.targets, self.page = self.run(
+                self._connect(debugger_address, target_id), timeout=30
+            )
+        except Exception:
+            self._stop()
+            raise
+
+    @classmethod
+    def for_driver(cls, driver) -> "CDPBridge":
+        """Attach to the window the SeleniumBase/WebDriver ``driver`` is on."""
+        address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        # ChromeDriver window handles are DevTools target ids.
+        return cls(address, driver.current_window_handle)
+
+    async def _connect(self, debugger_address: str, target_id: str):
+        loop = asyncio.get_running_loop()
+        url = await loop.run_in_executor(
+            None, _browser_websocket_url, debugger_address
+        )
+        browser = await CDPSession.connect(url, lazy_events=True)
+        targets = TargetMultiplexer(browser)
+        page = await targets.attach(target.TargetID(target_id))
+        return browser, targets, page
+
+    def run(self, coro, timeout=None):
+        """Run ``coro`` on the bridge loop and return its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(
+            timeout
+        )
+
+    def execute(self, cmd, timeout=None):
+        """Run a mycdp command generator on the page session."""
+        return self.run(self.page.execute(cmd), timeout)
+
+    def submit(self, coro) -> "asyncio.Future":
+        """Schedule ``coro`` on the bridge loop without waiting for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def close(self) -> None:
+        """Detach from the page and close the DevTools connection."""
+        try:
+            self.run(self._close(), timeout=10)
+        except Exception as e:
+            logger.debug(f"Error closing CDP bridge: {e}")
+        self._stop()
+
+    async def _close(self):
+        await self.page.close()
+        await self.browser.close()
+
+    def _stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _browser_websocket_url(debugger_address: str) -> str:
+    with urllib.request.urlopen(
+        f"http://{debugger_address}/json/version", timeout=10
+    ) as response:
+        return json.load(response)["webSocketDebuggerUrl"]
@@ -0,0 +1,154 @@
+"""
+Durable pagination checkpoints.
+
+``CheckpointJournal`` is an append-only JSON lines file with one record per
+written page:
+
+    {"account": ..., "user_id": ..., "next_max_id": ..., "pages_written": ...,
+     "bytes_written": ..., "users_written": ..., "time": ...}
+
+Records are flushed on every page but only fsynced every few pages (or
+seconds), so a checkpoint costs a ``write`` rather than a disk round trip.
+After a crash the latest record per account says where to resume: which
+cursor to request next and how many bytes of the partial NDJSON output are
+covered by it. Finished accounts get a ``done`` record, and the journal is
+compacted to the open checkpoints whenever it is opened.
+"""
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Checkpoint:
+    """Where the followers walk of one account stopped."""
+    account: str
+    user_id: str
+    next_max_id: str
+    pages_written: int
+    bytes_written: int
+    users_written: int = 0
+    time: float = 0.0
+
+
+class CheckpointJournal:
+    """
+    Append-only checkpoint journal with batched fsync.
+
+    :param path: Journal file. Put it on storage that outlives the task.
+    :param fsync_every: Records between fsyncs.
+    :param fsync_interval: Maximum seconds between fsyncs.
+    :param max_age: Checkpoints older than this (seconds) are not resumed.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fsync_every: int = 10,
+        fsync_interval: float = 2.0,
+        max_age: float = 24 * 60 * 60,
+    ):
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.max_age = max_age
+        self._open: Dict[str, Checkpoint] = dict()
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # torn last line from a crash mid-write
+                    continue
+                if record.get("done"):
+                    self._open.pop(record["account"], None)
+                else:
+                    self._open[record["account"]] = Checkpoint(**record)
+        self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for checkpoint in self._open.values():
+                f.write(json.dumps(asdict(checkpoint)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def latest(self, account: str) -> Optional[Checkpoint]:
+        """The checkpoint to resume ``account`` from, if any."""
+        checkpoint = self._open.get(account)
+        if checkpoint is None:
+            return None
+        if time.time() - checkpoint.time > self.max_age:
+            logger.info(f"Ignoring stale checkpoint for {account}")
+            return None
+        return checkpoint
+
+    def record(
+        self,
+        checkpoint: Checkpoint,
+        before_sync: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        """
+        Append ``checkpoint``; returns True if this call fsynced.
+
+        ``before_sync`` runs right before the journal is fsynced and should
+        make the output the checkpoint points into durable first.
+        """
+        checkpoint.time = time.time()
+        self._open[checkpoint.account] = checkpoint
+        self._append(asdict(checkpoint))
+        if (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            if before_sync is not None:
+                before_sync()
+            self.sync()
+            return True
+        return False
+
+    def complete(self, account: str) -> None:
+        """Mark ``account`` finished so it starts from scratch next time."""
+        self._open.pop(account, None)
+        self._append({"account": account, "done": True, "time": time.time()})
+        self.sync()
+
+    def _append(self, record: Dict) -> None:
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+
+    def sync(self) -> None:
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,110 @@
+"""
+Thin command line client for the scrape daemon.
+
+Sends the usernames to a running ``python main.py --daemon`` and waits for
+the job to finish, so a small batch costs one HTTP round trip instead of
+a Chrome launch and a login. If no daemon answers, one is started in the
+background first (unless ``--no-start``), and later runs reuse it. Only
+the standard library is imported, so the client itself starts instantly.
+
+Usage:
+    python client.py user1 user2 [--url http://127.0.0.1:8765] [--no-wait] [--no-start]
+    python client.py --health
+    python client.py --shutdown
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from daemon import DEFAULT_PORT, DaemonClient
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+DAEMON_URL = os.getenv(
+    "DAEMON_URL",
+    f"http://{os.getenv('DAEMON_HOST', '127.0.0.1')}:{os.getenv('DAEMON_PORT', DEFAULT_PORT)}",
+)
+
+
+def start_daemon(client: DaemonClient, timeout: float = 60) -> None:
+    """Launch ``main.py --daemon`` detached from this process and wait for it to answer."""
+    log_path = SCRIPT_DIR / "data" / "daemon.log"
+    log_path.parent.mkdir(exist_ok=True)
+    logger.info(f"No daemon at {client.url}, starting one (log: {log_path})")
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    with open(log_path, "ab") as log:
+        subprocess.Popen(
+            [sys.executable, str(SCRIPT_DIR / "main.py"), "--daemon"],
+            cwd=str(SCRIPT_DIR),
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            **kwargs,
+        )
+    deadline = time.monotonic() + timeout
+    while not client.alive():
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Daemon did not come up within {timeout:.0f}s, see {log_path}")
+        time.sleep(0.5)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("usernames", nargs="*")
+    parser.add_argument("--url", default=DAEMON_URL)
+    parser.add_argument("--no-wait", action="store_true", help="print the job id and return")
+    parser.add_argument("--no-start", action="store_true", help="fail instead of starting a daemon")
+    parser.add_argument("--health", action="store_true")
+    parser.add_argument("--shutdown", action="store_true")
+    args = parser.parse_args()
+
+    client = DaemonClient(args.url)
+    if args.health or args.shutdown:
+        if not client.alive():
+            logger.error(f"No daemon at {args.url}")
+            sys.exit(1)
+        if args.shutdown:
+            client.shutdown()
+            logger.info("Daemon is shutting down after the running job")
+        else:
+            print(json.dumps(client.health(), indent=4))
+        sys.exit(0)
+
+    if not args.usernames:
+        logger.error("No usernames provided")
+        sys.exit(1)
+    if not client.alive():
+        if args.no_start:
+            logger.error(f"No daemon at {args.url}, start one with: python main.py --daemon")
+            sys.exit(1)
+        start_daemon(client)
+
+    start_time = time.time()
+    job_id = client.submit(args.usernames)
+    if args.no_wait:
+        print(job_id)
+        sys.exit(0)
+    logger.info(f"Submitted job {job_id}, waiting for it to finish")
+    job = client.wait(job_id)
+    if job["status"] == "failed":
+        logger.error(f"Job failed: {job['error']}")
+        sys.exit(1)
+    summary = job["summary"]
+    logger.info(
+        f"Scraped {len(summary['scraped'])}/{summary['accounts']} accounts, "
+        f"{summary['followers']} followers, failed: {summary['failed']} "
+        f"in {time.time() - start_time:.1f}s"
+    )
+    sys.exit(1 if summary["failed"] else 0)
@@ -0,0 +1,282 @@
+"""
+Columnar (Parquet) storage for scraped followers.
+
+Every follower record in the JSON output repeats the same ~20 keys and
+stores its id four times (``pk``, ``pk_id``, ``id``, ``strong_id__``).
+``ColumnarFollowerWriter`` stores the same data as typed Parquet columns
+instead: int64 ids, bools, and dictionary-encoded strings for the
+low-cardinality fields. The duplicate ids are kept once, and unknown keys
+are preserved in an ``extra`` JSON column. Files are partitioned by scrape date
+and account:
+
+    <root>/scrape_date=2025-02-14/account=alan_johnsonvfx/part-0.parquet
+
+and ``read_followers_table`` reads them back with a column projection and
+partition filters, so a query only touches the columns and partitions it
+needs.
+
+pyarrow is optional (commented out in requirements.txt); it is only imported
+when this module is used.
+"""
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = ds = pq = None
+
+logger = logging.getLogger(__name__)
+
+# Keys that always equal ``pk`` in the API response; stored once.
+ID_ALIASES = ("pk_id", "id", "strong_id__")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError(
+            "Columnar follower storage needs pyarrow (pip install pyarrow)"
+        )
+
+
+def follower_schema() -> "pa.Schema":
+    _require_pyarrow()
+    dict_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("pk", pa.int64()),
+            ("username", pa.string()),
+            ("full_name", pa.string()),
+            ("is_private", pa.bool_()),
+            ("is_verified", pa.bool_()),
+            ("has_anonymous_profile_picture", pa.bool_()),
+            ("fbid_v2", pa.int64()),
+            ("latest_reel_media", pa.int64()),
+            ("third_party_downloads_enabled", pa.int8()),
+            ("profile_pic_id", pa.string()),
+            ("profile_pic_url", pa.string()),
+            ("account_badges", dict_string),
+            ("allowed_commenter_type", dict_string),
+            ("reel_auto_archive", dict_string),
+            ("has_onboarded_to_text_post_app", pa.bool_()),
+            ("interop_messaging_user_fbid", pa.int64()),
+            ("extra", dict_string),
+        ]
+    )
+
+
+def _int(value):
+    return None if value is None or value == "" else int(value)
+
+
+# How each stored column is derived from an API user dict.
+_CONVERTERS = {
+    "pk": _int,
+    "fbid_v2": _int,
+    "interop_messaging_user_fbid": _int,
+    "account_badges": lambda value: None if value is None else json.dumps(value),
+}
+
+
+def partition_dir(root: Path, scrape_date: str, account: str) -> Path:
+    return Path(root) / f"scrape_date={scrape_date}" / f"account={account}"
+
+
+class ColumnarFollowerWriter:
+    """
+    Buffers follower pages and writes them as Parquet row groups.
+
+    Has the same ``write_page``/``close`` interface as
+    ``output.FollowerWriter``. ``header`` and ``footer`` are stored in the
+    file's key-value metadata when it is closed, so changes made to them
+    while writing still land in the file.
+
+    :param root: Dataset root directory.
+    :param header: Account metadata; needs ``username`` and ``scrape_date``.
+    :param row_group_size: Rows buffered before a row group is written.
+    """
+
+    def __init__(self, root: Path, header: Dict, row_group_size: int = 50_000):
+        _require_pyarrow()
+        self.header = dict(header)
+        self.footer: Dict = dict()
+        self.path = (
+            partition_dir(root, header["scrape_date"], header["username"])
+            / "part-0.parquet"
+        )
+        self.row_group_size = row_group_size
+        self.pages_written = 0
+        self.users_written = 0
+        self._schema = follower_schema()
+        self._names = self._schema.names
+        self._known = set(self._names) | set(ID_ALIASES)
+        self._columns: Dict[str, List] = {name: [] for name in self._names}
+        self._buffered = 0
+        self._writer = None
+
+    def open(self) -> "ColumnarFollowerWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = pq.ParquetWriter(
+            self.path, self._schema, compression="zstd"
+        )
+        return self
+
+    def write_page(self, users: Iterable[Dict]) -> int:
+        """Buffer one page of users; flushes a row group when full."""
+        columns = self._columns
+        count = 0
+        for user in users:
+            for name in self._names:
+                value = user.get(name)
+                converter = _CONVERTERS.get(name)
+                columns[name].append(converter(value) if converter else value)
+            extra = {k: v for k, v in user.items() if k not in self._known}
+            columns["extra"][-1] = json.dumps(extra, sort_keys=True) if extra else None
+            count += 1
+        self._buffered += count
+        self.pages_written += 1
+        self.users_written += count
+        if self._buffered >= self.row_group_size:
+            self._flush()
+        return count
+
+    def _flush(self) -> None:
+        if not self._buffered:
+            return
+        table = pa.Table.from_pydict(self._columns, schema=self._schema)
+        self._writer.write_table(table)
+        self._columns = {name: [] for name in self._names}
+        self._buffered = 0
+
+    def close(self, footer: Optional[Dict] = None) -> None:
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.add_key_value_metadata(
+            {
+                "header": json.dumps(self.header),
+                "footer": json.dumps(
+                    {
+                        "pages_written": self.pages_written,
+                        "users_written": self.users_written,
+                        "written_at": time.time(),
+                        **self.footer,
+                        **(footer or {}),
+                    }
+                ),
+            }
+        )
+        self._writer.close()
+        self._writer = None
+        logger.info(
+            f"Wrote {self.users_written} users in {self.pages_written} pages to {self.path}"
+        )
+
+    def abort(self) -> None:
+        """Drop the partial file; Parquet cannot be appended to."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self.path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        if self._writer is None:
+            self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_followers(root: Path, header: Dict, users: Iterable[Dict]) -> Path:
+    """Write a complete follower list in one go."""
+    with ColumnarFollowerWriter(root, header) as writer:
+        writer.write_page(users)
+    return writer.path
+
+
+def read_followers_table(
+    root: Path,
+    columns: Optional[Sequence[str]] = None,
+    accounts: Optional[Sequence[str]] = None,
+    scrape_dates: Optional[Sequence[str]] = None,
+    filter=None,
+) -> "pa.Table":
+    """
+    Read followers from the dataset under ``root``.
+
+    :param columns: Projection; only these columns are decoded.
+        ``account`` and ``scrape_date`` are available as columns too.
+    :param accounts: Only read these accounts' partitions.
+    :param scrape_dates: Only read these dates' partitions.
+    :param filter: Extra ``pyarrow.dataset`` expression, e.g.
+        ``ds.field("is_private") == False``.
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(
+        root,
+        format="parquet",
+        partitioning=ds.partitioning(
+            pa.schema([("scrape_date", pa.string()), ("account", pa.string())]),
+            flavor="hive",
+        ),
+    )
+    expression = filter
+    if accounts is not None:
+        expression = _and(expression, ds.field("account").isin(list(accounts)))
+    if scrape_dates is not None:
+        expression = _and(
+            expression, ds.field("scrape_date").isin(list(scrape_dates))
+        )
+    return dataset.to_table(
+        columns=list(columns) if columns is not None else None,
+        filter=expression,
+    )
+
+
+def _and(left, right):
+    return right if left is None else left & right
+
+
+def read_header(path: Path) -> Dict:
+    """Return the account metadata stored with one Parquet file."""
+    return _read_metadata(path, b"header")
+
+
+def read_footer(path: Path) -> Dict:
+    """Return the footer (counts, ``scrape_end_time``, ...) of one Parquet file."""
+    return _read_metadata(path, b"footer")
+
+
+def _read_metadata(path: Path, key: bytes) -> Dict:
+    _require_pyarrow()
+    metadata = pq.read_metadata(path).metadata or {}
+    return json.loads(metadata.get(key, b"{}"))
+
+
+def to_records(table: "pa.Table") -> List[Dict]:
+    """Turn a table back into API-shaped user dicts."""
+    records = []
+    for row in table.to_pylist():
+        extra = row.pop("extra", None)
+        if row.get("pk") is not None:
+            row["pk"] = str(row["pk"])
+            for alias in ID_ALIASES:
+                row[alias] = row["pk"]
+        for key in ("fbid_v2", "interop_messaging_user_fbid"):
+            if row.get(key) is not None:
+                row[key] = str(row[key])
+        if row.get("account_badges") is not None:
+            row["account_badges"] = json.loads(row["account_badges"])
+        if extra:
+            row.update(json.loads(extra))
+        records.append({k: v for k, v in row.items() if v is not None})
+    return records
@@ -0,0 +1,279 @@
+"""
+Scrape daemon that keeps one logged-in browser alive between runs.
+
+Every ``python main.py user1 user2`` run used to launch Chrome, log in (or
+load ``cookies.json``) and tear it all down again, which dominates small
+batches. ``ScrapeDaemon`` opens the browser session once and serves scrape
+jobs over a small JSON HTTP API on localhost. HTTP rather than a Unix
+socket, so it works the same on the Windows machines used for local
+development:
+
+    POST /jobs {"usernames": [...]}  -> 202 {"id": ..., "queued": n}
+    GET  /jobs/<id>                  -> {"status": queued|running|done|failed, ...}
+    GET  /health                     -> browser state and job counts
+    POST /shutdown                   -> finish the running job and exit
+
+Jobs run one at a time on the thread that owns the browser. The session
+is recycled (closed and opened again) when the browser stops responding
+or after ``max_jobs`` jobs, so a leaking Chrome never lives for long.
+
+``DaemonClient`` is the matching client; ``client.py`` is the thin CLI
+built on it.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, ContextManager, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+# finished jobs kept for GET /jobs/<id>
+MAX_FINISHED_JOBS = 1000
+
+
+@dataclass
+class Job:
+    usernames: List[str]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    summary: Optional[Dict] = None
+    error: Optional[str] = None
+
+
+class ScrapeDaemon:
+    """
+    Serves scrape jobs from one long-lived browser session.
+
+    :param open_session: Returns a context manager that launches and logs
+        in a browser and yields a session object.
+    :param scrape: ``scrape(session, usernames) -> summary``.
+    :param healthy: ``healthy(session) -> bool``, checked after every job.
+    :param host: Interface to listen on; keep it local.
+    :param port: TCP port.
+    :param max_jobs: Jobs per session before the browser is recycled
+        (0 never recycles a healthy browser).
+    """
+
+    def __init__(
+        self,
+        open_session: Callable[[], ContextManager],
+        scrape: Callable[[object, List[str]], Dict],
+        healthy: Optional[Callable[[object], bool]] = None,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        max_jobs: int = 50,
+    ):
+        self.open_session = open_session
+        self.scrape = scrape
+        self.healthy = healthy
+        self.max_jobs = max_jobs
+        self.jobs: Dict[str, Job] = OrderedDict()
+        self.pending: "queue.Queue[Job]" = queue.Queue()
+        self.browser_up = False
+        self.sessions = 0
+        self.jobs_done = 0
+        self.jobs_in_session = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._run_worker, name="scrape-daemon", daemon=True)
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def submit(self, usernames: List[str]) -> Job:
+        job = Job(usernames=list(usernames))
+        with self._lock:
+            self.jobs[job.id] = job
+            finished = [key for key, old in self.jobs.items() if old.finished_at is not None]
+            for key in finished[: max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+                del self.jobs[key]
+        self.pending.put(job)
+        logger.info(f"Queued job {job.id} for {len(job.usernames)} accounts")
+        return job
+
+    def health(self) -> Dict:
+        return {
+            "browser": "up" if self.browser_up else "down",
+            "sessions": self.sessions,
+            "jobs_done": self.jobs_done,
+            "jobs_in_session": self.jobs_in_session,
+            "queued": self.pending.qsize(),
+            "stopping": self._stop.is_set(),
+        }
+
+    def _run_worker(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with self.open_session() as session:
+                    self.browser_up = True
+                    self.sessions += 1
+                    self.jobs_in_session = 0
+                    logger.info(f"Browser session {self.sessions} ready")
+                    self._serve_session(session)
+            except Exception as e:
+                logger.error(f"Browser session failed: {e}")
+                time.sleep(5)
+            finally:
+                self.browser_up = False
+        # nothing will run what is still queued
+        while not self.pending.empty():
+            job = self.pending.get_nowait()
+            job.status = "failed"
+            job.error = "daemon stopped"
+            job.finished_at = time.time()
+        self.server.shutdown()
+
+    def _serve_session(self, session) -> None:
+        while not self._stop.is_set():
+            if self.max_jobs and self.jobs_in_session >= self.max_jobs:
+                logger.info(f"Recycling the browser after {self.jobs_in_session} jobs")
+                return
+            try:
+                job = self.pending.get(timeout=1)
+            except queue.Empty:
+                continue
+            self._run_job(session, job)
+            if self.healthy is not None and not self.healthy(session):
+                logger.warning("Browser is not responding, recycling it")
+                return
+
+    def _run_job(self, session, job: Job) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.summary = self.scrape(session, job.usernames)
+            job.status = "done"
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        job.finished_at = time.time()
+        self.jobs_done += 1
+        self.jobs_in_session += 1
+
+    def serve_forever(self) -> None:
+        """Start the browser and serve requests until ``stop``."""
+        self._worker.start()
+        logger.info(f"Scrape daemon listening on {self.address}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self._stop.set()
+            self.server.server_close()
+        self._worker.join()
+
+    def stop(self) -> None:
+        """Finish the running job, then close the browser and the server."""
+        self._stop.set()
+
+    def _handler(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, body: Dict) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    return self._reply(200, daemon.health())
+                if self.path.startswith("/jobs/"):
+                    job = daemon.jobs.get(self.path[len("/jobs/"):])
+                    if job is None:
+                        return self._reply(404, {"error": "unknown job"})
+                    return self._reply(200, asdict(job))
+                self._reply(404, {"error": "not found"})
+
+            def do_POST(self):
+                if self.path == "/shutdown":
+                    daemon.stop()
+                    return self._reply(202, {"stopping": True})
+                if self.path != "/jobs":
+                    return self._reply(404, {"error": "not found"})
+                if daemon._stop.is_set():
+                    return self._reply(503, {"error": "daemon is stopping"})
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    usernames = json.loads(self.rfile.read(length) or b"{}").get("usernames")
+                except ValueError:
+                    usernames = None
+                if not usernames or not isinstance(usernames, list):
+                    return self._reply(400, {"error": "expected {\"usernames\": [...]}"})
+                job = daemon.submit(usernames)
+                self._reply(202, {"id": job.id, "queued": daemon.pending.qsize()})
+
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} {format % args}")
+
+        return Handler
+
+
+class DaemonClient:
+    """
+    Talks to a running ``ScrapeDaemon``.
+
+    :param url: Daemon address, e.g. ``http://127.0.0.1:8765``.
+    :param timeout: Seconds per HTTP request.
+    """
+
+    def __init__(self, url: str, timeout: float = 10):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, body: Optional[Dict] = None) -> Dict:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(
+            self.url + path, data=data, method=method, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"{method} {path} failed: {e.code} {e.read().decode('utf-8', 'replace')}")
+
+    def alive(self) -> bool:
+        try:
+            self.health()
+            return True
+        except (OSError, RuntimeError):
+            return False
+
+    def health(self) -> Dict:
+        return self._request("GET", "/health")
+
+    def submit(self, usernames: List[str]) -> str:
+        return self._request("POST", "/jobs", {"usernames": list(usernames)})["id"]
+
+    def status(self, job_id: str) -> Dict:
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def wait(self, job_id: str, poll_interval: float = 2.0) -> Dict:
+        """Poll until the job is done or failed, and return it."""
+        while True:
+            job = self.status(job_id)
+            if job["status"] in ("done", "failed"):
+                return job
+            time.sleep(poll_interval)
+
+    def shutdown(self) -> None:
+        self._request("POST", "/shutdown")
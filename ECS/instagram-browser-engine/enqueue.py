@@ -0,0 +1,243 @@
+"""
+Bulk-enqueue usernames for the queue workers.
+
+Streams usernames from JSON lines files (a string, a list or an object with
+a ``username``/``usernames`` field per line; plain text lines also work),
+CSV files (the ``username`` column, or the first column of a file without
+a header row) or stdin. The usernames are normalized and deduplicated,
+then packed many to a message and sent in batches of 10 messages per call
+from several threads at once.
+
+A username is skipped when it was already enqueued within the window, per
+the persisted seen-set (a small SQLite file). It is also skipped when the
+scrape database recorded a scrape of it within the window.
+
+Usage:
+    python enqueue.py usernames.jsonl [more.csv ...] --queue sqlite:///queue.db
+        [--per-message 20] [--concurrency 8] [--window-days 1]
+        [--seen data/enqueued.sqlite] [--scrape-db scrape.db] [--force]
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+from follower_store import FollowerStore
+from work_queue import MAX_BATCH, encode_body, open_queue
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+USERNAME_RE = re.compile(r"^[a-z0-9._]{1,30}$")
+
+SEEN_SCHEMA = """
+CREATE TABLE IF NOT EXISTS enqueued (
+    username TEXT PRIMARY KEY,
+    enqueued_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def names_in(value, field: str) -> Iterator[str]:
+    """Usernames in one decoded JSON line."""
+    if isinstance(value, dict):
+        value = value.get(field) or value.get(field + "s")
+    if isinstance(value, list):
+        for item in value:
+            yield from names_in(item, field)
+    elif value:
+        yield str(value)
+
+
+def read_usernames(path: str, field: str = "username") -> Iterator[str]:
+    """Stream raw usernames from a CSV, JSON lines or text file (``-`` is stdin)."""
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", newline="")
+    try:
+        if path.lower().endswith(".csv"):
+            rows = csv.reader(f)
+            header = next(rows, [])
+            column = header.index(field) if field in header else 0
+            if field not in header and header:
+                # no header row, the first row is data
+                yield header[0]
+            for row in rows:
+                if len(row) > column:
+                    yield row[column]
+            return
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield from names_in(json.loads(line), field)
+            except ValueError:
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def normalize(username: str) -> str:
+    return username.strip().lstrip("@").lower()
+
+
+class SeenSet:
+    """
+    Usernames enqueued before, with when.
+
+    :param path: SQLite file, kept next to the queue producer.
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SEEN_SCHEMA)
+
+    def since(self, cutoff: float) -> set:
+        return {
+            row[0]
+            for row in self.conn.execute("SELECT username FROM enqueued WHERE enqueued_at >= ?", (cutoff,))
+        }
+
+    def add(self, usernames: Iterable[str]) -> None:
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO enqueued VALUES (?, ?)", ((name, now) for name in usernames)
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def enqueue(
+    paths: List[str],
+    queue,
+    seen: SeenSet = None,
+    scraped: Iterable[str] = (),
+    window_days: float = 1,
+    per_message: int = 20,
+    concurrency: int = 8,
+    field: str = "username",
+) -> dict:
+    """Send every new username in ``paths`` to ``queue``; returns counts."""
+    start = time.perf_counter()
+    counts = dict(read=0, invalid=0, duplicate=0, recently_enqueued=0, recently_scraped=0, enqueued=0, messages=0)
+    skip_enqueued = seen.since(time.time() - window_days * 24 * 60 * 60) if seen is not None else set()
+    skip_scraped = {normalize(name) for name in scraped}
+    taken = set()
+
+    def fresh() -> Iterator[str]:
+        for path in paths:
+            for raw in read_usernames(path, field):
+                counts["read"] += 1
+                name = normalize(raw)
+                if not USERNAME_RE.match(name):
+                    counts["invalid"] += 1
+                elif name in taken:
+                    counts["duplicate"] += 1
+                elif name in skip_enqueued:
+                    counts["recently_enqueued"] += 1
+                elif name in skip_scraped:
+                    counts["recently_scraped"] += 1
+                else:
+                    taken.add(name)
+                    yield name
+
+    def send(batch: List[List[str]]) -> List[List[str]]:
+        sent = queue.send([encode_body(usernames) for usernames in batch])
+        if sent != len(batch):
+            raise RuntimeError(f"only {sent} of {len(batch)} messages were accepted")
+        return batch
+
+    def finished(futures) -> None:
+        for future in futures:
+            try:
+                batch = future.result()
+            except Exception as e:
+                logger.error(f"Sending a batch failed: {e}")
+                continue
+            counts["messages"] += len(batch)
+            counts["enqueued"] += sum(len(usernames) for usernames in batch)
+            # only mark what the queue took, so failures are retried next run
+            if seen is not None:
+                seen.add(name for usernames in batch for name in usernames)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = set()
+        batch, message = [], []
+        for name in fresh():
+            message.append(name)
+            if len(message) < per_message:
+                continue
+            batch.append(message)
+            message = []
+            if len(batch) == MAX_BATCH:
+                pending.add(pool.submit(send, batch))
+                batch = []
+                # keep a bounded number of calls in flight while reading
+                if len(pending) >= 2 * concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    finished(done)
+        if message:
+            batch.append(message)
+        if batch:
+            pending.add(pool.submit(send, batch))
+        finished(wait(pending).done)
+
+    counts["seconds"] = round(time.perf_counter() - start, 3)
+    return counts
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("paths", nargs="+", help="JSON lines, CSV or text files, - for stdin")
+    parser.add_argument("--queue", default=os.getenv("QUEUE_URL"), help="SQS queue URL or sqlite:///path.db")
+    parser.add_argument("--field", default="username", help="JSON key or CSV column holding the username")
+    parser.add_argument("--per-message", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--window-days", type=float, default=1, help="skip usernames enqueued or scraped this recently")
+    parser.add_argument("--seen", default=str(SCRIPT_DIR / "data" / "enqueued.sqlite"))
+    parser.add_argument("--scrape-db", default=os.getenv("SCRAPE_DB"))
+    parser.add_argument("--force", action="store_true", help="enqueue every valid username, ignoring the window")
+    args = parser.parse_args()
+    if not args.queue:
+        parser.error("no queue given, pass --queue or set QUEUE_URL")
+
+    queue = open_queue(args.queue)
+    seen = SeenSet(args.seen)
+    scraped = []
+    if args.scrape_db and not args.force:
+        cutoff = time.strftime("%Y-%m-%d", time.localtime(time.time() - args.window_days * 24 * 60 * 60))
+        with FollowerStore(args.scrape_db) as store:
+            scraped = store.scraped_since(cutoff)
+    try:
+        counts = enqueue(
+            args.paths,
+            queue,
+            seen=seen,
+            scraped=scraped,
+            window_days=0 if args.force else args.window_days,
+            per_message=args.per_message,
+            concurrency=args.concurrency,
+            field=args.field,
+        )
+    finally:
+        seen.close()
+        queue.close()
+    logger.info(
+        f"Enqueued {counts['enqueued']} usernames in {counts['messages']} messages "
+        f"in {counts['seconds']:.2f}s ({counts['read']} read, {counts['duplicate']} duplicates, "
+        f"{counts['recently_enqueued']} recently enqueued, {counts['recently_scraped']} recently scraped, "
+        f"{counts['invalid']} invalid)"
+    )
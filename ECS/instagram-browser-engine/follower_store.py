@@ -0,0 +1,436 @@
+"""
+Normalized follower store.
+
+The per-account output files repeat a follower's full profile once for
+every target account they follow. ``FollowerStore`` keeps a SQLite database
+with two tables instead:
+
+    users (pk PRIMARY KEY, username, full_name, ..., profile JSON)
+    edges (target_pk, scrape_date, follower_pk)   -- WITHOUT ROWID
+
+so every profile is stored once and a follow relationship costs one
+three-column row. Disk grows with unique users plus edges rather than with
+the sum of follower counts. ``edges`` is clustered on
+``(target_pk, scrape_date, follower_pk)`` and indexed on
+``(follower_pk, target_pk)``, which makes "followers of X" and "who follows
+both X and Y" index range scans.
+
+Pages are buffered and written in batches: users are upserted (newest
+profile wins) and edges appended, one transaction per batch.
+
+The ``scrapes`` table keeps one row per ``get_user_information`` result
+(profile counters, timings), indexed by username and scrape date, so "which
+accounts were scraped today" or "followers of X last week" are single index
+lookups instead of a pass over ``data/``. File databases run in WAL mode.
+
+``start_scrape`` clears edges a same-day walk left behind, and
+``finish_scrape`` files a completed scrape into the snapshot history
+(``snapshots.SnapshotHistory``, keyframes plus gained/lost deltas) and
+drops the target's older edges, so ``edges`` only holds each target's
+latest follower set and older snapshots are rebuilt on demand.
+"""
+import datetime
+import json
+import logging
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from snapshots import SnapshotHistory
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    pk INTEGER PRIMARY KEY,
+    username TEXT,
+    full_name TEXT,
+    is_private INTEGER,
+    is_verified INTEGER,
+    profile_pic_url TEXT,
+    profile TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS edges (
+    target_pk INTEGER NOT NULL,
+    scrape_date TEXT NOT NULL,
+    follower_pk INTEGER NOT NULL,
+    PRIMARY KEY (target_pk, scrape_date, follower_pk)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_by_follower ON edges (follower_pk, target_pk);
+CREATE INDEX IF NOT EXISTS users_by_username ON users (username);
+CREATE TABLE IF NOT EXISTS scrapes (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    user_pk INTEGER,
+    scrape_date TEXT NOT NULL,
+    scrape_start_time REAL,
+    scrape_end_time REAL,
+    followers_count INTEGER,
+    following_count INTEGER,
+    is_verified INTEGER,
+    scraped_name TEXT,
+    number_of_posts INTEGER,
+    bio TEXT,
+    followers_written INTEGER,
+    UNIQUE (username, scrape_date, scrape_start_time)
+);
+CREATE INDEX IF NOT EXISTS scrapes_by_date ON scrapes (scrape_date);
+CREATE TABLE IF NOT EXISTS full_walks (
+    target_pk INTEGER PRIMARY KEY,
+    scrape_date TEXT NOT NULL
+);
+"""
+
+# Columns lifted out of the API dict; everything else goes into ``profile``.
+USER_COLUMNS = ("username", "full_name", "is_private", "is_verified", "profile_pic_url")
+# Keys that always equal ``pk`` in the API response.
+ID_ALIASES = ("pk", "pk_id", "id", "strong_id__")
+
+UPSERT_USER = """
+INSERT INTO users (pk, username, full_name, is_private, is_verified,
+                   profile_pic_url, profile, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (pk) DO UPDATE SET
+    username = excluded.username,
+    full_name = coalesce(excluded.full_name, users.full_name),
+    is_private = coalesce(excluded.is_private, users.is_private),
+    is_verified = coalesce(excluded.is_verified, users.is_verified),
+    profile_pic_url = coalesce(excluded.profile_pic_url, users.profile_pic_url),
+    profile = coalesce(excluded.profile, users.profile),
+    last_seen = excluded.last_seen
+"""
+INSERT_EDGE = "INSERT OR IGNORE INTO edges (target_pk, scrape_date, follower_pk) VALUES (?, ?, ?)"
+SCRAPE_COLUMNS = (
+    "username", "user_pk", "scrape_date", "scrape_start_time", "scrape_end_time",
+    "followers_count", "following_count", "is_verified", "scraped_name",
+    "number_of_posts", "bio", "followers_written",
+)
+INSERT_SCRAPE = (
+    f"INSERT OR REPLACE INTO scrapes ({', '.join(SCRAPE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(SCRAPE_COLUMNS))})"
+)
+
+
+def user_row(user: Dict, seen: float) -> Tuple:
+    """Flatten an API user dict into a ``users`` row."""
+    profile = {
+        k: v for k, v in user.items() if k not in ID_ALIASES and k not in USER_COLUMNS
+    }
+    return (
+        int(user["pk"]),
+        user.get("username"),
+        user.get("full_name"),
+        user.get("is_private"),
+        user.get("is_verified"),
+        user.get("profile_pic_url"),
+        json.dumps(profile, separators=(",", ":")) if profile else None,
+        seen,
+        seen,
+    )
+
+
+class FollowerStore:
+    """
+    Batched writer and queries over the users/edges tables.
+
+    :param path: SQLite database file (``":memory:"`` works too).
+    :param batch_size: Buffered rows that trigger a write.
+    """
+
+    def __init__(self, path, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        # worker processes share the file; wait for a writer instead of failing
+        self.conn = sqlite3.connect(str(path), timeout=30)
+        if str(path) != ":memory:":
+            # readers never block the scraper, and commits skip the per-transaction fsync
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.history = SnapshotHistory(self.conn)
+        self._users: Dict[int, Tuple] = dict()
+        self._edges: List[Tuple[int, str, int]] = []
+
+    def add_target(self, target_pk, username: str) -> int:
+        """
+        Record a scraped account, so queries can refer to it by name.
+
+        Without ``target_pk`` (older output files do not carry the user id)
+        the account gets a provisional negative pk, which is swapped for the
+        real one the first time it is scraped with a known id, together with
+        its edges, scrapes, snapshot history and full walks. Returns the pk.
+        """
+        self.flush()
+        provisional = self.conn.execute(
+            "SELECT pk FROM users WHERE username = ? AND pk < 0", (username,)
+        ).fetchone()
+        if target_pk is None:
+            if provisional:
+                return provisional[0]
+            lowest = self.conn.execute("SELECT min(pk) FROM users").fetchone()[0]
+            target_pk = min(lowest or 0, 0) - 1
+        target_pk = int(target_pk)
+        now = time.time()
+        self._users.setdefault(
+            target_pk, (target_pk, username, None, None, None, None, None, now, now)
+        )
+        if provisional and target_pk > 0:
+            self.flush()
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE OR IGNORE edges SET target_pk = ? WHERE target_pk = ?",
+                    (target_pk, provisional[0]),
+                )
+                self.conn.execute("DELETE FROM edges WHERE target_pk = ?", (provisional[0],))
+                self.conn.execute(
+                    "UPDATE scrapes SET user_pk = ? WHERE user_pk = ?", (target_pk, provisional[0])
+                )
+                self.conn.execute(
+                    "UPDATE OR IGNORE full_walks SET target_pk = ? WHERE target_pk = ?",
+                    (target_pk, provisional[0]),
+                )
+                self.conn.execute("DELETE FROM full_walks WHERE target_pk = ?", (provisional[0],))
+                self.history.rekey(provisional[0], target_pk)
+                self.conn.execute("DELETE FROM users WHERE pk = ?", (provisional[0],))
+        return target_pk
+
+    def record_scrape(self, result: Dict) -> None:
+        """Store one ``get_user_information`` result (without its followers)."""
+        row = dict(result)
+        row["user_pk"] = int(row["user_id"]) if row.get("user_id") else None
+        if row.get("followers_written") is None and isinstance(row.get("followers"), list):
+            row["followers_written"] = len(row["followers"])
+        with self.conn:
+            self.conn.execute(INSERT_SCRAPE, [row.get(column) for column in SCRAPE_COLUMNS])
+
+    def ingest_page(self, target_pk, scrape_date: str, users: Iterable[Dict]) -> int:
+        """Buffer one page of followers of ``target_pk``; returns users added."""
+        target_pk = int(target_pk)
+        seen = time.time()
+        count = 0
+        for user in users:
+            row = user_row(user, seen)
+            # the last page that mentions a user wins within a batch
+            self._users[row[0]] = row
+            self._edges.append((target_pk, scrape_date, row[0]))
+            count += 1
+        if len(self._edges) >= self.batch_size:
+            self.flush()
+        return count
+
+    def flush(self) -> None:
+        """Write the buffered users and edges in one transaction."""
+        if not self._users and not self._edges:
+            return
+        # key order keeps the B-tree inserts local
+        with self.conn:
+            self.conn.executemany(UPSERT_USER, sorted(self._users.values()))
+            self.conn.executemany(INSERT_EDGE, sorted(self._edges))
+        self._users = dict()
+        self._edges = []
+
+    def scraped_on(self, scrape_date: str) -> List[str]:
+        """Accounts scraped on ``scrape_date``."""
+        return [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT DISTINCT username FROM scrapes WHERE scrape_date = ?", (scrape_date,)
+            )
+        ]
+
+    def scraped_since(self, scrape_date: str) -> List[str]:
+        """Accounts scraped on or after ``scrape_date``."""
+        return [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT DISTINCT username FROM scrapes WHERE scrape_date >= ?", (scrape_date,)
+            )
+        ]
+
+    def followers_count_history(
+        self, username: str, since: Optional[str] = None
+    ) -> List[Tuple[str, Optional[int]]]:
+        """``(scrape_date, followers_count)`` for ``username``, oldest first."""
+        return self.conn.execute(
+            "SELECT scrape_date, followers_count FROM scrapes "
+            "WHERE username = ? AND scrape_date >= ? ORDER BY scrape_date, scrape_start_time",
+            (username, since or ""),
+        ).fetchall()
+
+    def pk_for(self, username: str) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT pk FROM users WHERE username = ? ORDER BY last_seen DESC LIMIT 1",
+            (username,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def latest_scrape_date(self, target_pk) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT max(scrape_date) FROM edges WHERE target_pk = ?", (int(target_pk),)
+        ).fetchone()
+        return row[0]
+
+    def start_scrape(self, target_pk, scrape_date: str) -> None:
+        """
+        Drop the edges an earlier walk of ``target_pk`` left on
+        ``scrape_date``, so a fresh complete walk replaces them instead of
+        merging into them. Not for a resumed walk, whose first pages are
+        among those edges.
+        """
+        self.flush()
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM edges WHERE target_pk = ? AND scrape_date = ?",
+                (int(target_pk), scrape_date),
+            )
+
+    def finish_scrape(
+        self, target_pk, scrape_date: str, complete: bool = True
+    ) -> Optional[Tuple[int, int]]:
+        """
+        File a scrape into the snapshot history and drop the target's older
+        edges. Returns ``(gained, lost)`` follower counts, or None if the
+        scrape is older than the history (its edges are kept).
+
+        ``complete=False`` is an incremental walk that stopped at known
+        followers: the pages it saw are added to the previous follower set,
+        and nobody is counted as lost.
+        """
+        self.flush()
+        target_pk = int(target_pk)
+        if not complete:
+            previous = self.conn.execute(
+                "SELECT max(scrape_date) FROM edges WHERE target_pk = ? AND scrape_date < ?",
+                (target_pk, scrape_date),
+            ).fetchone()[0]
+            if previous is not None:
+                with self.conn:
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO edges SELECT target_pk, ?, follower_pk "
+                        "FROM edges WHERE target_pk = ? AND scrape_date = ?",
+                        (scrape_date, target_pk, previous),
+                    )
+        changes = self.history.record(
+            target_pk, scrape_date, self._edge_followers(target_pk, scrape_date)
+        )
+        if changes is not None:
+            with self.conn:
+                self.conn.execute(
+                    "DELETE FROM edges WHERE target_pk = ? AND scrape_date < ?",
+                    (target_pk, scrape_date),
+                )
+                if complete:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO full_walks VALUES (?, ?)",
+                        (target_pk, scrape_date),
+                    )
+        return changes
+
+    def known_followers(self, target_pk, scrape_date: str, full_walk_days: int) -> Optional[Sequence[int]]:
+        """
+        Follower pks of the latest snapshot, for an incremental walk on
+        ``scrape_date``; None when a full walk is due instead (no history,
+        or the last full walk is ``full_walk_days`` or more days old).
+        """
+        row = self.conn.execute(
+            "SELECT scrape_date FROM full_walks WHERE target_pk = ?", (int(target_pk),)
+        ).fetchone()
+        if row is None:
+            return None
+        age = datetime.date.fromisoformat(scrape_date) - datetime.date.fromisoformat(row[0])
+        if age.days >= full_walk_days:
+            return None
+        previous_date, ids = self.history.latest(target_pk)
+        return ids if previous_date is not None else None
+
+    def _edge_followers(self, target_pk, scrape_date: str) -> List[int]:
+        return [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT follower_pk FROM edges WHERE target_pk = ? AND scrape_date = ?",
+                (int(target_pk), scrape_date),
+            )
+        ]
+
+    def _has_edges(self, target_pk, scrape_date: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM edges WHERE target_pk = ? AND scrape_date = ? LIMIT 1",
+            (int(target_pk), scrape_date),
+        ).fetchone() is not None
+
+    def followers(self, target_pk, scrape_date: Optional[str] = None) -> List[int]:
+        """
+        Follower pks of ``target_pk`` on ``scrape_date`` (default: latest).
+
+        Dates whose edges were filed into the history are rebuilt from it.
+        """
+        self.flush()
+        scrape_date = scrape_date or self.latest_scrape_date(target_pk)
+        if scrape_date is None or not self._has_edges(target_pk, scrape_date):
+            return list(self.history.snapshot(target_pk, scrape_date))
+        return self._edge_followers(target_pk, scrape_date)
+
+    def common_followers(self, target_pks: Sequence, scrape_date: Optional[str] = None) -> List[int]:
+        """
+        Pks following every account in ``target_pks``.
+
+        Uses each target's latest scrape unless ``scrape_date`` is given.
+        """
+        self.flush()
+        dates = [scrape_date or self.latest_scrape_date(t) for t in target_pks]
+        if not all(d and self._has_edges(t, d) for t, d in zip(target_pks, dates)):
+            # at least one side only exists in the snapshot history
+            common = None
+            for target_pk, date in zip(target_pks, dates):
+                ids = set(self.followers(target_pk, date))
+                common = ids if common is None else common & ids
+            return sorted(common or ())
+        parts, params = [], []
+        for target_pk, date in zip(target_pks, dates):
+            parts.append(
+                "SELECT follower_pk FROM edges WHERE target_pk = ? AND scrape_date = ?"
+            )
+            params += [int(target_pk), date]
+        query = " INTERSECT ".join(parts)
+        return [row[0] for row in self.conn.execute(query, params)]
+
+    def following(self, follower_pk) -> List[int]:
+        """Scraped accounts ``follower_pk`` has been seen following."""
+        self.flush()
+        return [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT DISTINCT target_pk FROM edges WHERE follower_pk = ?",
+                (int(follower_pk),),
+            )
+        ]
+
+    def users(self, pks: Iterable[int]) -> List[Dict]:
+        """Profiles for ``pks`` as API-shaped dicts."""
+        self.flush()
+        out = []
+        for row in self.conn.execute(
+            "SELECT pk, username, full_name, is_private, is_verified, profile_pic_url, profile "
+            "FROM users WHERE pk IN (SELECT value FROM json_each(?))",
+            (json.dumps([int(pk) for pk in pks]),),
+        ):
+            user = json.loads(row[6]) if row[6] else {}
+            user.update(zip(("pk",) + USER_COLUMNS, row[:6]))
+            user["pk"] = str(user["pk"])
+            for key in ("is_private", "is_verified"):
+                if user[key] is not None:
+                    user[key] = bool(user[key])
+            out.append({k: v for k, v in user.items() if v is not None})
+        return out
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,117 @@
+"""
+Incremental drain of ChromeDriver's performance log.
+
+``driver.get_log("performance")`` returns (and clears) everything Chrome
+logged since the last call, which is mostly Network and Page events the
+scraper never looks at. ``PerformanceLogDrain`` pulls the buffer often,
+drops every entry that does not contain one of a few cheap substrings
+before any JSON is parsed, and keeps only a small index of request URLs:
+
+    (host, path prefix) -> latest (request_id, url) pairs
+
+so lookups such as "the latest friendships request" are O(1) and memory
+stays flat however many accounts the browser works through.
+"""
+import json
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Only these events carry the request URL we index.
+URL_EVENTS = {
+    "Network.requestWillBeSent": "request",
+    "Network.responseReceived": "response",
+}
+
+
+def index_key(url: str, depth: int) -> Tuple[str, str]:
+    """Return ``(host, first depth path segments)`` for ``url``."""
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split("/") if s][:depth]
+    return parts.netloc, "/" + "/".join(segments)
+
+
+class PerformanceLogDrain:
+    """
+    Pulls the performance log incrementally and indexes matching URLs.
+
+    :param driver: The WebDriver (``sb.driver``) with performance logging on.
+    :param needles: Substrings a raw log message must contain to be parsed.
+    :param depth: Number of path segments used as the index prefix.
+    :param keep: Request ids kept per index key (newest last).
+    """
+
+    def __init__(
+        self,
+        driver,
+        needles: Iterable[str] = ("/api/v1/friendships/",),
+        depth: int = 3,
+        keep: int = 16,
+    ):
+        self._driver = driver
+        self.needles = tuple(needles)
+        self.depth = depth
+        self.keep = keep
+        self._index: Dict[Tuple[str, str], Deque[Tuple[str, str]]] = dict()
+        self.entries_seen = 0
+        self.entries_parsed = 0
+
+    def drain(self) -> int:
+        """Pull new log entries, index the relevant ones, discard the rest."""
+        entries = self._driver.get_log("performance")
+        indexed = 0
+        for entry in entries:
+            message = entry.get("message", "")
+            if not any(needle in message for needle in self.needles):
+                continue
+            if not any(method in message for method in URL_EVENTS):
+                continue
+            self.entries_parsed += 1
+            try:
+                event = json.loads(message)["message"]
+                holder = URL_EVENTS.get(event.get("method"))
+                if holder is None:
+                    continue
+                params = event["params"]
+                url = params[holder].get("url", "")
+                request_id = params.get("requestId")
+            except (KeyError, TypeError, ValueError):
+                continue
+            if self._add(request_id, url):
+                indexed += 1
+        self.entries_seen += len(entries)
+        return indexed
+
+    def _add(self, request_id: str, url: str) -> bool:
+        if not url or not any(needle in url for needle in self.needles):
+            return False
+        key = index_key(url, self.depth)
+        bucket = self._index.get(key)
+        if bucket is None:
+            bucket = self._index[key] = deque(maxlen=self.keep)
+        if bucket and bucket[-1] == (request_id, url):
+            return False
+        bucket.append((request_id, url))
+        return True
+
+    def latest(
+        self, host: str, path_prefix: str
+    ) -> Optional[Tuple[str, str]]:
+        """Return the newest ``(request_id, url)`` indexed under the key."""
+        bucket = self._index.get((host, path_prefix))
+        return bucket[-1] if bucket else None
+
+    def recent(self, host: str, path_prefix: str) -> Tuple[Tuple[str, str], ...]:
+        """Return the indexed ``(request_id, url)`` pairs, newest first."""
+        return tuple(reversed(self._index.get((host, path_prefix), ())))
+
+    def reset(self) -> None:
+        """Discard whatever the browser logged so far and clear the index."""
+        try:
+            self.drain()
+        except Exception as e:
+            logger.debug(f"Could not drain performance log: {e}")
+        self._index.clear()
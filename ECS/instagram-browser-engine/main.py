@@ -1,4 +1,6 @@
+import argparse
 import json
+import signal
 import sys
 import logging
 import random
@@ -6,6 +8,8 @@ import time
 from dotenv import load_dotenv
 import os
 from pathlib import Path
+from contextlib import contextmanager
+from dataclasses import dataclass
 from seleniumbase import SB, BaseCase
 from selenium.webdriver.chrome.options import Options
 
@@ -15,8 +19,21 @@ import colorama
 from colorama import Fore, Style
 import mycdp
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-import requests
-import re
+from cdp_bridge import CDPBridge
+from capture import FollowerCapture, FOLLOWERS_URL_RE
+from log_drain import PerformanceLogDrain
+from pagination import EarlyStop, FollowerPaginator
+from output import FollowerWriter, followers_path
+from checkpoint import Checkpoint, CheckpointJournal
+from columnar import ColumnarFollowerWriter
+from follower_store import FollowerStore
+from user_ids import UserIdCache
+from session_snapshot import capture as capture_snapshot, cdp_executor, from_webdriver_cookies, load as load_snapshot, restore as restore_snapshot, save as save_snapshot
+from readiness import PageReadiness, all_of, element_present, lcp_seen, loaded
+from daemon import ScrapeDaemon
+from work_queue import open_queue
+from queue_worker import QueueWorker
+from worker_pool import RateBudget, current_budget, merge_summaries, run_shards, scrape_each, shard, use_budget, walk_finished
 
 # Initialize colorama
 colorama.init(autoreset=True)
@@ -62,6 +79,58 @@ if not os.getenv("INSTAGRAM_USERNAME") or not os.getenv("INSTAGRAM_PASSWORD"):
 #global constant for current users follower count
 CURRENT_FOLLOWER_COUNT = 0
 
+#how long to wait for the followers API response after opening the modal
+FOLLOWERS_CAPTURE_TIMEOUT = 15
+
+#"json" keeps every follower in memory and writes one JSON document per account,
+#"ndjson" streams each page to data/<account>_followers.ndjson as it arrives,
+#"parquet" streams into data/followers/scrape_date=<date>/account=<account>/ (needs pyarrow)
+OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "json").lower()
+STREAMING_FORMATS = ("ndjson", "parquet")
+PARQUET_ROOT = data_dir / "followers"
+
+#pagination checkpoints for resuming ndjson output, keep on storage that outlives the task
+CHECKPOINT_PATH = Path(os.getenv("CHECKPOINT_PATH", data_dir / "checkpoints.jsonl"))
+
+#optional SQLite scrape database: every result and follower page is also recorded there
+SCRAPE_DB = os.getenv("SCRAPE_DB")
+
+#incremental re-scrapes (needs SCRAPE_DB): stop after EARLY_STOP_PAGES pages of already known followers,
+#with a full walk every FULL_WALK_DAYS days to pick up unfollows
+INCREMENTAL = os.getenv("INCREMENTAL", "0") not in ("", "0")
+EARLY_STOP_PAGES = int(os.getenv("EARLY_STOP_PAGES", "3"))
+FULL_WALK_DAYS = int(os.getenv("FULL_WALK_DAYS", "7"))
+
+#username -> user id cache, a hit skips the profile page and goes straight to the followers API (empty disables it);
+#the follower count then costs one profile API request instead of the page visit
+USER_ID_CACHE = os.getenv("USER_ID_CACHE", str(data_dir / "user_ids.sqlite"))
+USER_ID_TTL_DAYS = float(os.getenv("USER_ID_TTL_DAYS", "30"))
+
+#cookies + localStorage of the logged-in browser, restored before the first navigation,
+#keep on storage that outlives the task so a cold start skips the login
+SESSION_SNAPSHOT = Path(os.getenv("SESSION_SNAPSHOT", data_dir / "session.json.gz"))
+
+#worker processes for the account list, each with its own browser and session (--workers overrides)
+WORKERS = int(os.getenv("WORKERS", "1"))
+#follower API requests per second across all workers (0 leaves only the per-page delay)
+RATE_LIMIT = float(os.getenv("RATE_LIMIT", "0"))
+#seconds between worker starts, so the first login can save the session snapshot for the others
+WORKER_STAGGER = float(os.getenv("WORKER_STAGGER", "10"))
+
+#queue worker mode (--queue): an SQS queue URL, or sqlite:///path/queue.db for the local stand-in
+QUEUE_URL = os.getenv("QUEUE_URL")
+DLQ_URL = os.getenv("DLQ_URL")
+QUEUE_VISIBILITY_TIMEOUT = int(os.getenv("QUEUE_VISIBILITY_TIMEOUT", "300"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+#stop after this many seconds without messages, 0 keeps polling
+QUEUE_IDLE_EXIT = float(os.getenv("QUEUE_IDLE_EXIT", "0"))
+
+#browser daemon (--daemon): one warm browser serving jobs from client.py on localhost
+DAEMON_HOST = os.getenv("DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.getenv("DAEMON_PORT", "8765"))
+#recycle the daemon's browser after this many jobs (0 recycles only when it stops responding)
+DAEMON_MAX_JOBS = int(os.getenv("DAEMON_MAX_JOBS", "50"))
+
 
 def random_scroll(sb, max_time):
     """
@@ -164,53 +233,205 @@ def throw_off_scents(sb, base_url):
             logger.info("Scrolling explore page")
             random_scroll(sb, 10)
 
+def open_page(sb, url, readiness: PageReadiness = None):
+    # forget the previous page's readiness signals before navigating
+    if readiness is not None:
+        readiness.reset()
+    sb.open(url)
+
+def wait_for_page(readiness: PageReadiness, legacy_sleep, label, *conditions):
+    """
+    Waits until the page has loaded, the network has been idle for a moment
+    and every extra condition holds, capped at legacy_sleep seconds (the fixed
+    sleep this replaces). Without a readiness engine it just sleeps.
+    """
+    if readiness is None:
+        time.sleep(legacy_sleep)
+        return
+    ready = all_of(loaded, readiness.network_idle(), *conditions)
+    readiness.wait(ready, timeout=legacy_sleep, budget=legacy_sleep, label=label)
+
 def locate_modal(sb):
     return sb.driver.find_element(By.XPATH, "/html/body/div[5]/div[2]/div/div/div[1]/div/div[2]/div/div/div/div/div[2]/div/div/div[3]")
      
-def get_followers_from_api(sb, user_id, target_account):
-    users = []
-    next_max_id = None
-    while True:
-        time.sleep(1)
-        print("Getting followers at next_max_id:", next_max_id)
-        # Extract cookies from Selenium session
-        cookies = {cookie["name"]: cookie["value"] for cookie in sb.get_cookies()}
-        csrf_token = cookies.get("csrftoken", "")
-
-        headers = {
-            "sec-ch-ua-full-version-list": '"Not(A:Brand";v="99.0.0.0", "Google Chrome";v="133.0.6943.54", "Chromium";v="133.0.6943.54"',
-            "sec-ch-ua-platform": '"macOS"',
-            "sec-ch-ua": '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
-            "sec-ch-ua-model": '""',
-            "sec-ch-ua-mobile": "?0",
-            "X-IG-App-ID": "936619743392459",
-            "X-Requested-With": "XMLHttpRequest",
-            "Accept": "*/*",
-            "X-CSRFToken": csrf_token,
-            "X-Web-Session-ID": "wcfm36:dt9dcn:ib5aos",  # May need to update dynamically
-            "Referer": f"https://www.instagram.com/{target_account}/followers/",
-            "X-ASBD-ID": "129477",
-            "sec-ch-prefers-color-scheme": "dark",
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36",
-            "X-IG-WWW-Claim": "hmac.AR3KwkFLVueyIUz-AWqejkSqx6M86xUZNmPCAKexOlwHAvi0",
-            "sec-ch-ua-platform-version": '"15.1.0"',
-        }
+def get_followers_from_api(sb, user_id, target_account, first_page=None, stop: EarlyStop = None, relogin=None):
+    # one keep-alive session per account; headers and cookies are set up once
+    with FollowerPaginator(sb, target_account, budget=current_budget(), relogin=relogin) as paginator:
+        try:
+            return paginator.followers(user_id, first_page=first_page, stop=stop)
+        finally:
+            paginator.report()
 
-        params = {"count": 12, "search_surface": "follow_list_page"}
-        if next_max_id:
-            params["max_id"] = next_max_id
-
-        url = f"https://www.instagram.com/api/v1/friendships/{user_id}/followers/"
-        response = requests.get(url, headers=headers, cookies=cookies, params=params)
-        data = response.json()
-        users.extend(data.get("users", []))
-        next_max_id = data.get("next_max_id")
-        if not next_max_id:
-            break
-        
-    return users
+def early_stop_for(store: FollowerStore, user_id, scrape_date):
+    # None means walk every page: incremental mode is off, or a full walk is due
+    if not INCREMENTAL or store is None:
+        return None
+    known = store.known_followers(user_id, scrape_date, FULL_WALK_DAYS)
+    if known is None:
+        logger.info("Full follower walk due")
+        return None
+    logger.info(f"Incremental walk against {len(known)} known followers")
+    return EarlyStop(known, pages=EARLY_STOP_PAGES)
+
+def file_snapshot(store: FollowerStore, user_id, target_account, scrape_date, complete=True):
+    # only finished walks go into the history, a crashed one would look like lost followers
+    changes = store.finish_scrape(user_id, scrape_date, complete=complete)
+    if changes is not None:
+        gained, lost = changes
+        logger.info(f"{target_account} since last scrape: +{gained} / -{lost} followers")
+
+def stream_followers_to_file(sb, user_id, target_account, header, first_page=None, journal: CheckpointJournal = None, store: FollowerStore = None, id_cache: UserIdCache = None, relogin=None):
+    # memory stays at one page: each page is appended to the file and dropped
+    if OUTPUT_FORMAT == "parquet":
+        #row groups are buffered, and a partial parquet file cannot be resumed
+        writer = ColumnarFollowerWriter(PARQUET_ROOT, header)
+        journal = None
+    else:
+        writer = FollowerWriter(followers_path(data_dir, target_account), header)
+    
+    #pick up a partial file where the last run left it
+    max_id = None
+    checkpoint = journal.latest(target_account) if journal is not None else None
+    if checkpoint is not None and checkpoint.user_id == user_id and writer.resume(
+        checkpoint.bytes_written, checkpoint.pages_written, checkpoint.users_written
+    ):
+        first_page = None
+        max_id = checkpoint.next_max_id
+    
+    def before_sync():
+        #a durable checkpoint must not point past pages the store has not written
+        if store is not None:
+            store.flush()
+        writer.sync()
+    
+    if store is not None:
+        store.add_target(user_id, target_account)
+    
+    stop = early_stop_for(store, user_id, header["scrape_date"])
+    writer.header["incremental"] = stop is not None
+    if store is not None and stop is None and max_id is None:
+        #a full walk replaces whatever an earlier walk today stored
+        store.start_scrape(user_id, header["scrape_date"])
+    
+    with FollowerPaginator(sb, target_account, budget=current_budget(), relogin=relogin) as paginator, writer:
+        try:
+            for page in paginator.pages(user_id, first_page=first_page, max_id=max_id, stop=stop):
+                writer.write_page(page.get("users", []))
+                if store is not None:
+                    store.ingest_page(user_id, header["scrape_date"], page.get("users", []))
+                if id_cache is not None:
+                    #followers are future targets, their ids come for free
+                    id_cache.seed(page.get("users", []))
+                if journal is not None and page.get("next_max_id"):
+                    journal.record(
+                        Checkpoint(
+                            account=target_account,
+                            user_id=user_id,
+                            next_max_id=page["next_max_id"],
+                            pages_written=writer.pages_written,
+                            bytes_written=writer.bytes_written,
+                            users_written=writer.users_written,
+                        ),
+                        before_sync=before_sync,
+                    )
+            complete = stop is None or not stop.stopped
+            writer.footer.update(scrape_end_time=time.time(), complete_walk=complete)
+        finally:
+            paginator.report()
+            if store is not None:
+                store.flush()
+    if store is not None:
+        file_snapshot(store, user_id, target_account, header["scrape_date"], complete=complete)
+    if journal is not None:
+        journal.complete(target_account)
+    return writer.path, writer.users_written, complete
      
-def get_user_information(sb, target_account: str):
+def find_user_id_in_performance_logs(log_drain: PerformanceLogDrain):
+    # url: https://www.instagram.com/api/v1/friendships/8569400103/followers/?count=12&max_id=12&search_surface=follow_list_page
+    #only friendships requests are parsed and indexed, everything else in the log is dropped
+    log_drain.drain()
+    for request_id, url in log_drain.recent("www.instagram.com", "/api/v1/friendships"):
+        match = FOLLOWERS_URL_RE.search(url)
+        if match:
+            print("Found target url containing user_id")
+            user_id = match.group(1)
+            print("User ID:", user_id)
+            return user_id
+    return None
+
+def resolve_user_id_in_browser(sb, target_account: str, obj: dict, bridge: CDPBridge = None, log_drain: PerformanceLogDrain = None, readiness: PageReadiness = None):
+    """
+    Open the profile of target_account, read its followers count into obj and
+    click the followers link to learn its user id.
+    
+    Returns (user_id, first_page), first_page is the followers response the
+    click already fetched, or None if the id came from the performance logs.
+    """
+    if log_drain is None:
+        log_drain = PerformanceLogDrain(sb.driver)
+    #drop whatever the browser logged for the previous account
+    log_drain.reset()
+    
+    #navigate to the target account
+    open_page(sb, f"https://www.instagram.com/{target_account}", readiness)
+    
+    #wait for page to load and the profile header to render
+    wait_for_page(readiness, 10, "profile", lcp_seen, element_present(sb, "ul li:nth-child(2) a"))
+    
+    if "/accounts/login" in sb.get_current_url():
+        #the restored session was rejected, log in with the password and come back
+        password_relogin(sb, readiness, bridge)()
+        open_page(sb, f"https://www.instagram.com/{target_account}", readiness)
+        wait_for_page(readiness, 10, "profile", lcp_seen, element_present(sb, "ul li:nth-child(2) a"))
+    
+    logger.info("Getting user's information")
+    
+    try:
+        # Get the number of followers
+        followers = sb.get_text("ul li:nth-child(2) a span")
+        followers_count = int(followers.replace(",", ""))
+        
+        logger.info(f"User has {followers_count} followers")
+        
+        #update obj
+        obj["followers_count"] = followers_count
+    except Exception as e:
+        logger.warning(f"Could not get followers count: {e}")
+        obj["followers_count"] = None
+    
+    user_id = None
+    first_page = None
+    capture = None
+    if bridge is not None:
+        try:
+            capture = FollowerCapture(bridge)
+            capture.arm()
+        except Exception as e:
+            logger.warning(f"Could not arm followers capture: {e}")
+            capture = None
+    
+    try:
+        #click on followers
+        sb.click("ul li:nth-child(2) a")
+    
+        if capture is not None:
+            #returns as soon as the followers response lands
+            captured = capture.wait(FOLLOWERS_CAPTURE_TIMEOUT)
+            if captured:
+                user_id = captured.user_id
+                first_page = captured.page
+                print("User ID:", user_id)
+    finally:
+        if capture is not None:
+            capture.disarm()
+    
+    if not user_id:
+        #wait for modal to load
+        wait_for_page(readiness, 5, "followers modal")
+        user_id = find_user_id_in_performance_logs(log_drain)
+    return user_id, first_page
+
+def get_user_information(sb, target_account: str, bridge: CDPBridge = None, log_drain: PerformanceLogDrain = None, readiness: PageReadiness = None, journal: CheckpointJournal = None, store: FollowerStore = None, id_cache: UserIdCache = None):
     logger.info(f"Getting user information for {target_account} \n")
     try:
         obj = {
@@ -226,76 +447,78 @@ def get_user_information(sb, target_account: str):
             "bio": None,
         }
         
-        #navigate to the target account
-        sb.open(f"https://www.instagram.com/{target_account}")
-        
-        #wait for page to load
-        time.sleep(10)
-        
-        logger.info("Getting user's information")
-        
-        try:
-            # Get the number of followers
-            followers = sb.get_text("ul li:nth-child(2) a span")
-            followers_count = int(followers.replace(",", ""))
-            
-            logger.info(f"User has {followers_count} followers")
-            
-            #update obj
-            obj["followers_count"] = followers_count
-        except Exception as e:
-            logger.warning(f"Could not get followers count: {e}")
-            obj["followers_count"] = None
-        
         try:
             logger.info("Getting user's followers")
-            #click on followers
-            sb.click("ul li:nth-child(2) a")
+            user_id = None
+            first_page = None
+            from_cache = False
             
-            #wait for modal to load
-            time.sleep(5)
+            #an interrupted run already knows the user id, no need to open the profile
+            checkpoint = journal.latest(target_account) if journal is not None else None
+            if checkpoint is not None:
+                user_id = checkpoint.user_id
+                logger.info(f"Resuming {target_account} from checkpoint after {checkpoint.pages_written} pages")
             
-            user_id = None
+            if not user_id and id_cache is not None:
+                user_id = id_cache.get(target_account)
+                from_cache = bool(user_id)
+                if from_cache:
+                    logger.info(f"User ID {user_id} cached, skipping the profile page")
+            
+            if not user_id:
+                user_id, first_page = resolve_user_id_in_browser(sb, target_account, obj, bridge, log_drain, readiness)
+                if user_id and id_cache is not None:
+                    id_cache.put(target_account, user_id)
             
-            # print(sb.driver.get_log("performance"))
-            performance_logs = sb.driver.get_log("performance")
-            # url: https://www.instagram.com/api/v1/friendships/8569400103/followers/?count=12&max_id=12&search_surface=follow_list_page
-            #search performance logs for user_id buried in the request url
-            for entry in performance_logs:
-                try:
-                    log_entry = json.loads(entry["message"])
-                except Exception:
-                    continue
-
-                method = log_entry.get("message", {}).get("method")
-                url = ""
-                if method == "Network.requestWillBeSent":
-                    url = log_entry["message"]["params"]["request"].get("url", "")
-                elif method == "Network.responseReceived":
-                    url = log_entry["message"]["params"]["response"].get("url", "")
-
-                if "https://www.instagram.com/api/v1/friendships" in url and "show_many" not in url:
-                    print("Found target url containing user_id")
-                    match = re.search(r'friendships/(\d+)/', url)
-                    if match:
-                        user_id = match.group(1)
-                        print("User ID:", user_id)
-
             if not user_id:
                 logger.warning("Could not find user ID. Returning without gettng followers")
                 return obj
             
             print("Attempting to get data for user: ", user_id)
-            #make request to server
+            obj["user_id"] = user_id
+            #an expired session is logged in again mid-walk instead of failing the account
+            relogin = password_relogin(sb, readiness, bridge)
             
-            users = get_followers_from_api(sb=sb, user_id=user_id, target_account=target_account)
-            logger.info("FOLLOWERS DATA")
-            logger.info(users)
+            if obj["followers_count"] is None:
+                #the profile page was skipped, one profile API request keeps the count history going
+                with FollowerPaginator(sb, target_account, budget=current_budget(), relogin=relogin) as paginator:
+                    obj["followers_count"] = paginator.followers_count(target_account)
+            #make request to server
             
-            # Save followers data to JSON file
-            followers_file_path = data_dir / f"{target_account}_followers.json"
-            with open(followers_file_path, "w", encoding="utf-8") as f:
-                json.dump(users, f, indent=4)
+            if OUTPUT_FORMAT in STREAMING_FORMATS:
+                header = {
+                    "username": target_account,
+                    "user_id": user_id,
+                    "scrape_date": obj["scrape_date"],
+                    "scrape_start_time": obj["scrape_start_time"],
+                    "followers_count": obj["followers_count"],
+                }
+                followers_file, written, complete = stream_followers_to_file(sb, user_id, target_account, header, first_page=first_page, journal=journal, store=store, id_cache=id_cache, relogin=relogin)
+                obj["followers_file"] = str(followers_file)
+                obj["followers_written"] = written
+                obj["complete_walk"] = complete
+                logger.info(f"Streamed {written} followers to {followers_file}")
+            else:
+                stop = early_stop_for(store, user_id, obj["scrape_date"])
+                users = get_followers_from_api(sb=sb, user_id=user_id, target_account=target_account, first_page=first_page, stop=stop, relogin=relogin)
+                logger.info("FOLLOWERS DATA")
+                logger.info(users)
+                complete = stop is None or not stop.stopped
+                
+                if store is not None:
+                    store.add_target(user_id, target_account)
+                    if stop is None:
+                        store.start_scrape(user_id, obj["scrape_date"])
+                    store.ingest_page(user_id, obj["scrape_date"], users)
+                    file_snapshot(store, user_id, target_account, obj["scrape_date"], complete=complete)
+                if id_cache is not None:
+                    id_cache.seed(users)
+                
+                #update OBJ, navigate_instagram saves it to data/<account>_followers.json
+                #an incremental walk only holds the newest followers, up to the known ones
+                obj["followers"] = users
+                obj["complete_walk"] = complete
+                logger.info(f"Extracted {len(users)} followers")
             
             # base_scroll_amount = 1000
             # while True:
@@ -325,15 +548,19 @@ def get_user_information(sb, target_account: str):
                 
             # # extract users
             # users = extract_users_from_html(file_path)
-            
-            #update OBJ
-            obj["followers"] = users
-            logger.info(f"Extracted {len(users)} followers")
         except Exception as e:
             logger.warning(f"Could not get followers list: {e}")
-            obj["followers"] = []
+            #the walk did not finish, scrape_accounts reports the account as failed
+            obj["error"] = str(e) or type(e).__name__
+            if from_cache:
+                #the account may have been renamed, resolve it from the profile next time
+                id_cache.invalidate(target_account)
+            if OUTPUT_FORMAT not in STREAMING_FORMATS:
+                obj["followers"] = []
             
         obj["scrape_end_time"] = time.time()
+        if readiness is not None:
+            logger.info(f"Readiness waits saved {readiness.take_saved():.1f}s on {target_account}")
         logger.info(f"Finished scraping user information for {target_account}")
         return obj
             
@@ -385,101 +612,278 @@ def load_and_set_cookies(file_path, sb):
     sb.cdp.set_all_cookies(cookie_params)
 
 
-def navigate_instagram(
-    target_accounts: list,
+def save_session(sb, bridge: CDPBridge = None):
+    """Snapshot cookies and localStorage to SESSION_SNAPSHOT, if the browser is logged in."""
+    try:
+        snapshot = capture_snapshot(cdp_executor(sb, bridge))
+    except Exception as e:
+        logger.warning(f"Could not snapshot the session: {e}")
+        return
+    if not snapshot.has_cookie("sessionid"):
+        logger.warning("Browser is not logged in, keeping the previous session snapshot")
+        return
+    save_snapshot(snapshot, SESSION_SNAPSHOT)
+
+def log_in_with_password(sb, readiness: PageReadiness = None, account_username=None, account_password=None, bridge: CDPBridge = None):
+    login_url = "https://www.instagram.com/accounts/login/"
+    
+    #on initialization the browser will open, navigate to the login page, and login
+    open_page(sb, login_url, readiness)
+    wait_for_page(readiness, 5, "login page", element_present(sb, 'input[name="username"]'))
+    # sb.press_keys('input[name="username"]', account_username)
+    sb.press_keys('input[name="username"]', account_username)
+    time.sleep(random.uniform(0.3, 0.8))
+    sb.press_keys('input[name="password"]', account_password)
+    time.sleep(random.uniform(0.3, 0.8))
+    if readiness is not None:
+        readiness.reset()
+    sb.click('button[type="submit"]')
+    # Wait for login to complete
+    wait_for_page(readiness, 10, "login", lambda state: "/accounts/login" not in sb.get_current_url())
+    
+    # Save the session for the next browser
+    save_session(sb, bridge)
+
+def password_relogin(sb, readiness: PageReadiness = None, bridge: CDPBridge = None):
+    """Callable that logs sb in again with the password, for a session rejected mid-scrape."""
+    def relogin():
+        logger.warning("Session is no longer logged in, logging in again")
+        log_in_with_password(sb, readiness, os.getenv("INSTAGRAM_USERNAME"), os.getenv("INSTAGRAM_PASSWORD"), bridge)
+    return relogin
+
+def log_in(sb, readiness: PageReadiness = None, account_username=None, account_password=None, bridge: CDPBridge = None):
+    """
+    Restore the saved session into the fresh browser, or log in and save it.
+    
+    A restore sets every cookie in one call and navigates nowhere, the first
+    profile opened is the first page load.
+    """
+    cookie_file = "cookies.json"
+    
+    snapshot = load_snapshot(SESSION_SNAPSHOT)
+    if snapshot is None and os.path.exists(cookie_file): #this is for local development only. ECS will not maintain state
+        with open(cookie_file, "r") as f:
+            snapshot = from_webdriver_cookies(json.load(f))
+    
+    restored = False
+    if snapshot is not None and snapshot.has_cookie("sessionid"):
+        try:
+            cookies = restore_snapshot(cdp_executor(sb, bridge), snapshot)
+            logger.info(f"Restored {cookies} cookies from the session snapshot")
+            restored = True
+        except Exception as e:
+            logger.warning(f"Could not restore the session snapshot, logging in: {e}")
+    
+    if not restored:
+        log_in_with_password(sb, readiness, account_username, account_password, bridge)
+            
+    if readiness is not None:
+        logger.info(f"Readiness waits saved {readiness.take_saved():.1f}s during login")
+
+@dataclass
+class ScrapeSession:
+    """A logged-in browser and the helpers every scrape in it shares."""
+    sb: BaseCase
+    bridge: CDPBridge = None
+    readiness: PageReadiness = None
+    log_drain: PerformanceLogDrain = None
+    journal: CheckpointJournal = None
+    store: FollowerStore = None
+    id_cache: UserIdCache = None
+
+@contextmanager
+def browser_session(
     account_username = os.getenv("INSTAGRAM_USERNAME"),
     account_password = os.getenv("INSTAGRAM_PASSWORD"),
+    checkpoint_path: Path = None,
 ):
+    """
+    Launch a browser, log in, and yield a ScrapeSession until the block exits.
+    Checkpoints go to checkpoint_path (default CHECKPOINT_PATH).
+    """
     # ensure account_username and account_password are set
     if not account_username or not account_password:
         logger.error("Instagram username or password not set")
         sys.exit(1)
     
-    start_url = "https://about.instagram.com/"
-    base_url = "https://www.instagram.com/"
-    
-    #random chance to add reels/ or explore/ to base_url
-    # if random.random() < 0.5:
-    #     base_url += "reels/"
-    # else:
-    #     base_url += "explore/"
-    
-    login_url = "https://www.instagram.com/accounts/login/"
-    cookie_file = "cookies.json"
-    
     with SB(uc=True, test=True, locale_code="en", pls="none", log_cdp=True) as sb:
         sb: BaseCase 
         # sb.activate_cdp_mode("about:blank")
         # activte CDP
         # sb.cdp.driver.set_window_size(1200, 1000)   
-        if os.path.exists(cookie_file): #this is for local development only. ECS will not maintain state
-            # Open base page to establish domain context
-            sb.open(start_url)
-            
-            
-            time.sleep(5)
-            # Load and add cookies
-            with open(cookie_file, "r") as f:
-                cookies = json.load(f)
-            for cookie in cookies:
-                try:
-                    sb.driver.add_cookie(cookie)
-                except Exception as e:
-                    print(f"Error adding cookie {cookie}: {e}")
-                    
-                    
-            sb.open(base_url)
-            time.sleep(5)
-            
-        else:
-            #on initialization the browser will open, navigate to the login page, and login
-            sb.open(login_url)
-            time.sleep(5)
-            # sb.press_keys('input[name="username"]', account_username)
-            sb.press_keys('input[name="username"]', account_username)
-            time.sleep(2)
-            sb.press_keys('input[name="password"]', account_password)
-            time.sleep(1)
-            sb.click('button[type="submit"]')
-            time.sleep(10)  # Wait for login to complete
-            
-            # Save cookies
-            cookies = sb.get_cookies()
-            with open("cookies.json", "w") as f:
-                    json.dump(cookies, f)
         
-            
-                
-        # throw off the scent
-        # throw_off_scents(sb, base_url=base_url)
+        # DevTools client for event-driven waits and captures. Falls back to fixed sleeps and the performance log if unavailable
+        bridge = None
+        readiness = None
+        try:
+            bridge = CDPBridge.for_driver(sb.driver)
+            readiness = PageReadiness(bridge).start()
+        except Exception as e:
+            logger.warning(f"Could not open CDP bridge, using fixed waits and performance logs: {e}")
         
-        #begin targetting accounts
-        for target_account in target_accounts:
-            user_info = get_user_information(sb, target_account)
-            if user_info:
-                #write to json
+        journal = None
+        store = None
+        id_cache = None
+        try:
+            log_in(sb, readiness, account_username, account_password, bridge)
+            
+            journal = CheckpointJournal(checkpoint_path or CHECKPOINT_PATH) if OUTPUT_FORMAT == "ndjson" else None
+            store = FollowerStore(SCRAPE_DB) if SCRAPE_DB else None
+            id_cache = UserIdCache(USER_ID_CACHE, USER_ID_TTL_DAYS) if USER_ID_CACHE else None
+            yield ScrapeSession(
+                sb=sb,
+                bridge=bridge,
+                readiness=readiness,
+                log_drain=PerformanceLogDrain(sb.driver),
+                journal=journal,
+                store=store,
+                id_cache=id_cache,
+            )
+        finally:
+            if journal is not None:
+                journal.close()
+            if store is not None:
+                store.close()
+            if id_cache is not None:
+                id_cache.close()
+            #keep the cookies the site rotated during the run
+            save_session(sb, bridge)
+            if readiness is not None:
+                readiness.stop()
+            if bridge is not None:
+                bridge.close()
+
+def browser_alive(session: ScrapeSession) -> bool:
+    """False once the browser or its driver has gone away."""
+    try:
+        session.sb.driver.current_url
+        return True
+    except Exception as e:
+        logger.warning(f"Browser is not responding: {e}")
+        return False
+
+def scrape_accounts(session: ScrapeSession, target_accounts: list):
+    """Scrape target_accounts one after another in session; returns a run summary."""
+    def scrape_one(target_account):
+        user_info = get_user_information(session.sb, target_account, bridge=session.bridge, log_drain=session.log_drain, readiness=session.readiness, journal=session.journal, store=session.store, id_cache=session.id_cache)
+        #a walk that failed halfway must not overwrite the last good output or count as a scrape
+        if walk_finished(user_info):
+            if OUTPUT_FORMAT not in STREAMING_FORMATS:
+                #write to json (streamed output is already on disk)
                 file_path = data_dir / f"{target_account}_followers.json"
                 with open(file_path, "w") as f:
                     json.dump(user_info, f, indent=4)
-        
-        
+            if session.store is not None:
+                session.store.record_scrape(user_info)
+        return user_info
+    
+    return scrape_each(target_accounts, scrape_one)
+
+def navigate_instagram(
+    target_accounts: list,
+    account_username = os.getenv("INSTAGRAM_USERNAME"),
+    account_password = os.getenv("INSTAGRAM_PASSWORD"),
+    checkpoint_path: Path = None,
+):
+    with browser_session(account_username, account_password, checkpoint_path) as session:
+        return scrape_accounts(session, target_accounts)
+
+def scrape_shard(worker: int, usernames: list):
+    """Worker process entry point: scrape one shard in a browser of its own."""
+    #journals are not shared between processes, shard() keeps an account on the same worker
+    checkpoint_path = CHECKPOINT_PATH.with_name(f"{CHECKPOINT_PATH.stem}.w{worker}{CHECKPOINT_PATH.suffix}")
+    #let earlier workers log in first and leave the session snapshot behind
+    time.sleep(worker * WORKER_STAGGER)
+    logger.info(f"Worker {worker} scraping {len(usernames)} accounts")
+    return navigate_instagram(usernames, checkpoint_path=checkpoint_path)
 
-def main(usernames: list):
+def run_queue_worker(queue_url: str = QUEUE_URL):
+    """Scrape usernames from the queue in one warm browser, replacing it when it dies."""
+    queue = open_queue(queue_url, DLQ_URL)
+    worker = QueueWorker(
+        queue,
+        visibility_timeout=QUEUE_VISIBILITY_TIMEOUT,
+        max_attempts=QUEUE_MAX_ATTEMPTS,
+        idle_exit=QUEUE_IDLE_EXIT,
+    )
+    #ECS sends SIGTERM before stopping the task, finish the current message first
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    use_budget(RateBudget(RATE_LIMIT) if RATE_LIMIT > 0 else None)
+    
+    try:
+        while not worker.stopping:
+            try:
+                with browser_session() as session:
+                    worker.run(lambda usernames: scrape_accounts(session, usernames), healthy=lambda: browser_alive(session))
+            except Exception as e:
+                logger.error(f"Browser session failed: {e}")
+                time.sleep(5)
+            if not worker.stopping:
+                logger.warning("Restarting the browser")
+    finally:
+        queue.close()
+    logger.info(f"Queue worker handled {worker.handled} messages")
+
+def run_daemon(host: str = DAEMON_HOST, port: int = DAEMON_PORT):
+    """Keep one logged-in browser alive and serve scrape jobs until shut down."""
+    use_budget(RateBudget(RATE_LIMIT) if RATE_LIMIT > 0 else None)
+    daemon = ScrapeDaemon(
+        browser_session,
+        scrape_accounts,
+        healthy=browser_alive,
+        host=host,
+        port=port,
+        max_jobs=DAEMON_MAX_JOBS,
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    daemon.serve_forever()
+    logger.info(f"Daemon served {daemon.jobs_done} jobs in {daemon.sessions} browser sessions")
+
+def main(usernames: list, workers: int = WORKERS):
     logger.info(f"Beginning processing of {len(usernames)} usernames")
     
-    navigate_instagram(usernames)
+    budget = RateBudget(RATE_LIMIT) if RATE_LIMIT > 0 else None
+    shards = shard(usernames, workers)
+    if len(shards) > 1:
+        logger.info(f"Sharding across {len(shards)} workers: {[len(accounts) for accounts in shards]}")
+        summary = merge_summaries(run_shards(shards, scrape_shard, budget), budget)
+    else:
+        use_budget(budget)
+        summary = merge_summaries([navigate_instagram(usernames)], budget)
+    
+    logger.info(
+        f"Scraped {len(summary['scraped'])}/{summary['accounts']} accounts, "
+        f"{summary['followers']} followers, failed: {summary['failed']}"
+    )
+    with open(data_dir / "run_summary.json", "w") as f:
+        json.dump(summary, f, indent=4)
+    return summary
     
     
 if __name__ == "__main__":
     start_time = time.time()
-    usernames = sys.argv[1:]  # All arguments after the script name
+    parser = argparse.ArgumentParser(description="Scrape the followers of Instagram accounts")
+    parser.add_argument("usernames", nargs="*")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="browser processes to shard the accounts across")
+    parser.add_argument("--queue", nargs="?", const=QUEUE_URL, default=False, help="pull usernames from this queue (QUEUE_URL by default) until stopped")
+    parser.add_argument("--daemon", action="store_true", help="serve scrape jobs from client.py with one warm browser")
+    args = parser.parse_args()
+    usernames = args.usernames
     
-    #make sure there is at least one username, if not exit
-    if not usernames:
-        logger.error("No usernames provided")
-        sys.exit(1)
-        
-    main(usernames)
+    if args.daemon:
+        run_daemon()
+    elif args.queue is not False:
+        if not args.queue:
+            logger.error("No queue URL provided, set QUEUE_URL or pass one to --queue")
+            sys.exit(1)
+        run_queue_worker(args.queue)
+    else:
+        #make sure there is at least one username, if not exit
+        if not usernames:
+            logger.error("No usernames provided")
+            sys.exit(1)
+            
+        main(usernames, workers=args.workers)
     
     execution_time = time.time() - start_time
     minutes, seconds = divmod(execution_time, 60)
@@ -0,0 +1,100 @@
+"""
+Bulk-load existing scrape output into the SQLite scrape database.
+
+Reads every ``*_followers.json`` (a ``get_user_information`` result, or a
+bare follower list from older runs) and ``*_followers.ndjson`` file in the
+data directory and ingests it through ``FollowerStore`` with large batches.
+Files already recorded in ``scrapes`` are loaded again idempotently.
+
+Usage:
+    python migrate_data.py scrape.db [--data data] [--batch-size 50000]
+"""
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+
+from follower_store import FollowerStore
+from output import read_followers
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+def load_json(path: Path, store: FollowerStore) -> int:
+    with open(path, "r", encoding="utf-8") as f:
+        result = json.load(f)
+    if isinstance(result, list):
+        # older runs wrote only the follower list
+        mtime = path.stat().st_mtime
+        result = {
+            "username": path.name[: -len("_followers.json")],
+            "scrape_date": time.strftime("%Y-%m-%d", time.localtime(mtime)),
+            "scrape_start_time": mtime,
+            "followers": result,
+        }
+    followers = result.get("followers") or []
+    # an incremental walk only holds the newest followers
+    complete = result.get("complete_walk", True)
+    target_pk = store.add_target(result.get("user_id"), result["username"])
+    if complete:
+        store.start_scrape(target_pk, result["scrape_date"])
+    store.ingest_page(target_pk, result["scrape_date"], followers)
+    store.finish_scrape(target_pk, result["scrape_date"], complete=complete)
+    store.record_scrape(dict(result, user_id=target_pk))
+    return len(followers)
+
+
+def load_ndjson(path: Path, store: FollowerStore) -> int:
+    header, users, footer = read_followers(path)
+    target_pk = store.add_target(header.get("user_id"), header["username"])
+    if not header.get("incremental"):
+        store.start_scrape(target_pk, header["scrape_date"])
+    count = 0
+    page = []
+    for user in users:
+        page.append(user)
+        if len(page) == 1000:
+            count += store.ingest_page(target_pk, header["scrape_date"], page)
+            page = []
+    count += store.ingest_page(target_pk, header["scrape_date"], page)
+    if footer:
+        # an incremental walk that never reached a known follower is complete
+        complete = footer.get("complete_walk", not header.get("incremental"))
+        store.finish_scrape(target_pk, header["scrape_date"], complete=complete)
+    else:
+        logger.warning(f"{path} has no footer, loaded a partial scrape")
+    store.record_scrape(
+        dict(header, user_id=target_pk, followers_written=count,
+             scrape_end_time=footer.get("scrape_end_time", footer.get("written_at")))
+    )
+    return count
+
+
+def migrate(db_path, data_dir: Path, batch_size: int = 50_000) -> None:
+    start = time.perf_counter()
+    users = files = 0
+    with FollowerStore(db_path, batch_size=batch_size) as store:
+        for path in sorted(data_dir.glob("*_followers.json")):
+            users += load_json(path, store)
+            files += 1
+        for path in sorted(data_dir.glob("*_followers.ndjson")):
+            users += load_ndjson(path, store)
+            files += 1
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Loaded {users} followers from {files} files in {elapsed:.2f}s "
+        f"({users / elapsed if elapsed else 0:,.0f} followers/s)"
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("db")
+    parser.add_argument("--data", default=str(SCRIPT_DIR / "data"))
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+    migrate(args.db, Path(args.data), args.batch_size)
@@ -2,15 +2,16 @@
 #
 # This file is generated from the CDP specification. If you need to make
 # changes, edit the generator and regenerate all of the modules.
+#
+# Post-processed after generation; reapply this when regenerating:
+# - the eager ``from . import (dom, fetch, target)`` is replaced by the
+#   module ``__getattr__`` below, which imports a domain on first use.
 
-from . import (
-    dom,
-    fetch,
-    target,
-)
+import importlib
 
 # Instead of importing everything, make a list of all available imports.
 # This will speed things up because you don't need to import everything.
+# Domains are imported on first attribute access (see ``__getattr__``).
 __all__ = [
     "accessibility",
     "animation",
@@ -65,3 +66,13 @@ __all__ = [
     "web_audio",
     "web_authn",
 ]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
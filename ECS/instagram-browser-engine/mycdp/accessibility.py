@@ -3,16 +3,23 @@
 # This file is generated from the CDP specification. If you need to make
 # changes, edit the generator and regenerate all of the modules.
 #
+# Post-processed after generation; reapply this when regenerating:
+# - ``from . import <domain>`` becomes
+#   ``<domain> = lazy_domain("<domain>", globals())``, so sibling domains
+#   are only imported on first use (see ``util.lazy_domain``).
+# - ``from dataclasses import dataclass`` becomes
+#   ``from .util import dataclass``, which adds ``__slots__`` when
+#   ``MYCDP_SLOTS`` is set (see ``util.dataclass``).
+#
 # CDP domain: Accessibility (experimental)
 
 from __future__ import annotations
 import enum
 import typing
-from dataclasses import dataclass
-from .util import event_class, T_JSON_DICT
-from . import dom
-from . import page
-from . import runtime
+from .util import dataclass, event_class, lazy_domain, T_JSON_DICT
+dom = lazy_domain("dom", globals())
+page = lazy_domain("page", globals())
+runtime = lazy_domain("runtime", globals())
 
 
 class AXNodeId(str):
@@ -3,14 +3,21 @@
 # This file is generated from the CDP specification. If you need to make
 # changes, edit the generator and regenerate all of the modules.
 #
+# Post-processed after generation; reapply this when regenerating:
+# - ``from . import <domain>`` becomes
+#   ``<domain> = lazy_domain("<domain>", globals())``, so sibling domains
+#   are only imported on first use (see ``util.lazy_domain``).
+# - ``from dataclasses import dataclass`` becomes
+#   ``from .util import dataclass``, which adds ``__slots__`` when
+#   ``MYCDP_SLOTS`` is set (see ``util.dataclass``).
+#
 # CDP domain: CacheStorage (experimental)
 
 from __future__ import annotations
 import enum
 import typing
-from dataclasses import dataclass
-from .util import T_JSON_DICT
-from . import storage
+from .util import dataclass, lazy_domain, T_JSON_DICT
+storage = lazy_domain("storage", globals())
 
 
 class CacheId(str):
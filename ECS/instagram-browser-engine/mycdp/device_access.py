@@ -3,12 +3,16 @@
 # This file is generated from the CDP specification. If you need to make
 # changes, edit the generator and regenerate all of the modules.
 #
+# Post-processed after generation; reapply this when regenerating:
+# - ``from dataclasses import dataclass`` becomes
+#   ``from .util import dataclass``, which adds ``__slots__`` when
+#   ``MYCDP_SLOTS`` is set (see ``util.dataclass``).
+#
 # CDP domain: DeviceAccess (experimental)
 
 from __future__ import annotations
 import typing
-from dataclasses import dataclass
-from .util import event_class, T_JSON_DICT
+from .util import dataclass, event_class, T_JSON_DICT
 
 
 class RequestId(str):
@@ -3,12 +3,17 @@
 # This file is generated from the CDP specification. If you need to make
 # changes, edit the generator and regenerate all of the modules.
 #
+# Post-processed after generation; reapply this when regenerating:
+# - ``from . import <domain>`` becomes
+#   ``<domain> = lazy_domain("<domain>", globals())``, so sibling domains
+#   are only imported on first use (see ``util.lazy_domain``).
+#
 # CDP domain: IO
 
 from __future__ import annotations
 import typing
-from .util import T_JSON_DICT
-from . import runtime
+from .util import lazy_domain, T_JSON_DICT
+runtime = lazy_domain("runtime", globals())
 
 
 class StreamHandle(str):
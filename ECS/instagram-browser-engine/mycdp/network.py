@@ -3,19 +3,33 @@
 # This file is generated from the CDP specification. If you need to make
 # changes, edit the generator and regenerate all of the modules.
 #
+# Post-processed after generation; reapply this when regenerating:
+# - ``from . import <domain>`` becomes
+#   ``<domain> = lazy_domain("<domain>", globals())``, so sibling domains
+#   are only imported on first use (see ``util.lazy_domain``).
+# - ``from_json`` of the hottest classes (``Request``, ``Response``,
+#   ``ResourceTiming``, ``Cookie``, ``SecurityDetails``, ``Initiator`` and the
+#   ``requestWillBeSent``/``responseReceived``/``dataReceived``/
+#   ``loadingFinished``/``*ExtraInfo`` events and their nested types) reads
+#   each optional key once into a local instead of ``json.get(key, None) is
+#   not None`` followed by ``json[key]``, and builds enums with
+#   ``util.enum_member``.
+# - ``from dataclasses import dataclass`` becomes
+#   ``from .util import dataclass``, which adds ``__slots__`` when
+#   ``MYCDP_SLOTS`` is set (see ``util.dataclass``).
+#
 # CDP domain: Network
 
 from __future__ import annotations
 import enum
 import typing
-from dataclasses import dataclass
-from .util import event_class, T_JSON_DICT
-from . import debugger
-from . import emulation
-from . import io
-from . import page
-from . import runtime
-from . import security
+from .util import dataclass, enum_member, event_class, lazy_domain, T_JSON_DICT
+debugger = lazy_domain("debugger", globals())
+emulation = lazy_domain("emulation", globals())
+io = lazy_domain("io", globals())
+page = lazy_domain("page", globals())
+runtime = lazy_domain("runtime", globals())
+security = lazy_domain("security", globals())
 
 
 class ResourceType(enum.Enum):
@@ -308,6 +322,10 @@ class ResourceTiming:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> ResourceTiming:
+        worker_router_evaluation_start = json.get(
+            "workerRouterEvaluationStart"
+        )
+        worker_cache_lookup_start = json.get("workerCacheLookupStart")
         return cls(
             request_time=float(json["requestTime"]),
             proxy_start=float(json["proxyStart"]),
@@ -331,13 +349,13 @@ class ResourceTiming:
             receive_headers_start=float(json["receiveHeadersStart"]),
             receive_headers_end=float(json["receiveHeadersEnd"]),
             worker_router_evaluation_start=(
-                float(json["workerRouterEvaluationStart"])
-                if json.get("workerRouterEvaluationStart", None) is not None
+                float(worker_router_evaluation_start)
+                if worker_router_evaluation_start is not None
                 else None
             ),
             worker_cache_lookup_start=(
-                float(json["workerCacheLookupStart"])
-                if json.get("workerCacheLookupStart", None) is not None
+                float(worker_cache_lookup_start)
+                if worker_cache_lookup_start is not None
                 else None
             ),
         )
@@ -447,53 +465,49 @@ class Request:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> Request:
+        url_fragment = json.get("urlFragment")
+        post_data = json.get("postData")
+        has_post_data = json.get("hasPostData")
+        post_data_entries = json.get("postDataEntries")
+        mixed_content_type = json.get("mixedContentType")
+        is_link_preload = json.get("isLinkPreload")
+        trust_token_params = json.get("trustTokenParams")
+        is_same_site = json.get("isSameSite")
         return cls(
             url=str(json["url"]),
             method=str(json["method"]),
             headers=Headers.from_json(json["headers"]),
-            initial_priority=ResourcePriority.from_json(
-                json["initialPriority"]
+            initial_priority=enum_member(
+                ResourcePriority, json["initialPriority"]
             ),
             referrer_policy=str(json["referrerPolicy"]),
             url_fragment=(
-                str(json["urlFragment"])
-                if json.get("urlFragment", None) is not None
-                else None
-            ),
-            post_data=(
-                str(json["postData"])
-                if json.get("postData", None) is not None
-                else None
+                str(url_fragment) if url_fragment is not None else None
             ),
+            post_data=str(post_data) if post_data is not None else None,
             has_post_data=(
-                bool(json["hasPostData"])
-                if json.get("hasPostData", None) is not None
-                else None
+                bool(has_post_data) if has_post_data is not None else None
             ),
             post_data_entries=(
-                [PostDataEntry.from_json(i) for i in json["postDataEntries"]]
-                if json.get("postDataEntries", None) is not None
+                [PostDataEntry.from_json(i) for i in post_data_entries]
+                if post_data_entries is not None
                 else None
             ),
             mixed_content_type=(
-                security.MixedContentType.from_json(json["mixedContentType"])
-                if json.get("mixedContentType", None) is not None
+                enum_member(security.MixedContentType, mixed_content_type)
+                if mixed_content_type is not None
                 else None
             ),
             is_link_preload=(
-                bool(json["isLinkPreload"])
-                if json.get("isLinkPreload", None) is not None
-                else None
+                bool(is_link_preload) if is_link_preload is not None else None
             ),
             trust_token_params=(
-                TrustTokenParams.from_json(json["trustTokenParams"])
-                if json.get("trustTokenParams", None) is not None
+                TrustTokenParams.from_json(trust_token_params)
+                if trust_token_params is not None
                 else None
             ),
             is_same_site=(
-                bool(json["isSameSite"])
-                if json.get("isSameSite", None) is not None
-                else None
+                bool(is_same_site) if is_same_site is not None else None
             ),
         )
 
@@ -610,6 +624,9 @@ class SecurityDetails:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> SecurityDetails:
+        key_exchange_group = json.get("keyExchangeGroup")
+        mac = json.get("mac")
+        server_signature_algorithm = json.get("serverSignatureAlgorithm")
         return cls(
             protocol=str(json["protocol"]),
             key_exchange=str(json["keyExchange"]),
@@ -626,21 +643,20 @@ class SecurityDetails:
                 SignedCertificateTimestamp.from_json(i)
                 for i in json["signedCertificateTimestampList"]
             ],
-            certificate_transparency_compliance=CertificateTransparencyCompliance.from_json(  # noqa
-                json["certificateTransparencyCompliance"]
+            certificate_transparency_compliance=enum_member(
+                CertificateTransparencyCompliance,
+                json["certificateTransparencyCompliance"],
             ),
             encrypted_client_hello=bool(json["encryptedClientHello"]),
             key_exchange_group=(
-                str(json["keyExchangeGroup"])
-                if json.get("keyExchangeGroup", None) is not None
+                str(key_exchange_group)
+                if key_exchange_group is not None
                 else None
             ),
-            mac=(
-                str(json["mac"]) if json.get("mac", None) is not None else None
-            ),
+            mac=str(mac) if mac is not None else None,
             server_signature_algorithm=(
-                int(json["serverSignatureAlgorithm"])
-                if json.get("serverSignatureAlgorithm", None) is not None
+                int(server_signature_algorithm)
+                if server_signature_algorithm is not None
                 else None
             ),
         )
@@ -1049,6 +1065,25 @@ class Response:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> Response:
+        headers_text = json.get("headersText")
+        request_headers = json.get("requestHeaders")
+        request_headers_text = json.get("requestHeadersText")
+        remote_ip_address = json.get("remoteIPAddress")
+        remote_port = json.get("remotePort")
+        from_disk_cache = json.get("fromDiskCache")
+        from_service_worker = json.get("fromServiceWorker")
+        from_prefetch_cache = json.get("fromPrefetchCache")
+        from_early_hints = json.get("fromEarlyHints")
+        service_worker_router_info = json.get("serviceWorkerRouterInfo")
+        timing = json.get("timing")
+        service_worker_response_source = json.get(
+            "serviceWorkerResponseSource"
+        )
+        response_time = json.get("responseTime")
+        cache_storage_cache_name = json.get("cacheStorageCacheName")
+        protocol = json.get("protocol")
+        alternate_protocol_usage = json.get("alternateProtocolUsage")
+        security_details = json.get("securityDetails")
         return cls(
             url=str(json["url"]),
             status=int(json["status"]),
@@ -1059,98 +1094,82 @@ class Response:
             connection_reused=bool(json["connectionReused"]),
             connection_id=float(json["connectionId"]),
             encoded_data_length=float(json["encodedDataLength"]),
-            security_state=security.SecurityState.from_json(
-                json["securityState"]
+            security_state=enum_member(
+                security.SecurityState, json["securityState"]
             ),
             headers_text=(
-                str(json["headersText"])
-                if json.get("headersText", None) is not None
-                else None
+                str(headers_text) if headers_text is not None else None
             ),
             request_headers=(
-                Headers.from_json(json["requestHeaders"])
-                if json.get("requestHeaders", None) is not None
+                Headers.from_json(request_headers)
+                if request_headers is not None
                 else None
             ),
             request_headers_text=(
-                str(json["requestHeadersText"])
-                if json.get("requestHeadersText", None) is not None
+                str(request_headers_text)
+                if request_headers_text is not None
                 else None
             ),
             remote_ip_address=(
-                str(json["remoteIPAddress"])
-                if json.get("remoteIPAddress", None) is not None
-                else None
-            ),
-            remote_port=(
-                int(json["remotePort"])
-                if json.get("remotePort", None) is not None
+                str(remote_ip_address)
+                if remote_ip_address is not None
                 else None
             ),
+            remote_port=int(remote_port) if remote_port is not None else None,
             from_disk_cache=(
-                bool(json["fromDiskCache"])
-                if json.get("fromDiskCache", None) is not None
-                else None
+                bool(from_disk_cache) if from_disk_cache is not None else None
             ),
             from_service_worker=(
-                bool(json["fromServiceWorker"])
-                if json.get("fromServiceWorker", None) is not None
+                bool(from_service_worker)
+                if from_service_worker is not None
                 else None
             ),
             from_prefetch_cache=(
-                bool(json["fromPrefetchCache"])
-                if json.get("fromPrefetchCache", None) is not None
+                bool(from_prefetch_cache)
+                if from_prefetch_cache is not None
                 else None
             ),
             from_early_hints=(
-                bool(json["fromEarlyHints"])
-                if json.get("fromEarlyHints", None) is not None
+                bool(from_early_hints)
+                if from_early_hints is not None
                 else None
             ),
             service_worker_router_info=(
-                ServiceWorkerRouterInfo.from_json(
-                    json["serviceWorkerRouterInfo"]
-                )
-                if json.get("serviceWorkerRouterInfo", None) is not None
+                ServiceWorkerRouterInfo.from_json(service_worker_router_info)
+                if service_worker_router_info is not None
                 else None
             ),
             timing=(
-                ResourceTiming.from_json(json["timing"])
-                if json.get("timing", None) is not None
+                ResourceTiming.from_json(timing)
+                if timing is not None
                 else None
             ),
             service_worker_response_source=(
-                ServiceWorkerResponseSource.from_json(
-                    json["serviceWorkerResponseSource"]
+                enum_member(
+                    ServiceWorkerResponseSource, service_worker_response_source
                 )
-                if json.get("serviceWorkerResponseSource", None) is not None
+                if service_worker_response_source is not None
                 else None
             ),
             response_time=(
-                TimeSinceEpoch.from_json(json["responseTime"])
-                if json.get("responseTime", None) is not None
+                TimeSinceEpoch.from_json(response_time)
+                if response_time is not None
                 else None
             ),
             cache_storage_cache_name=(
-                str(json["cacheStorageCacheName"])
-                if json.get("cacheStorageCacheName", None) is not None
-                else None
-            ),
-            protocol=(
-                str(json["protocol"])
-                if json.get("protocol", None) is not None
+                str(cache_storage_cache_name)
+                if cache_storage_cache_name is not None
                 else None
             ),
+            protocol=str(protocol) if protocol is not None else None,
             alternate_protocol_usage=(
-                AlternateProtocolUsage.from_json(
-                    json["alternateProtocolUsage"]
-                )
-                if json.get("alternateProtocolUsage", None) is not None
+                enum_member(AlternateProtocolUsage, alternate_protocol_usage)
+                if alternate_protocol_usage is not None
                 else None
             ),
             security_details=(
-                SecurityDetails.from_json(json["securityDetails"])
-                if json.get("securityDetails", None) is not None
+                SecurityDetails.from_json(security_details)
+                if security_details is not None
                 else None
             ),
         )
@@ -1331,29 +1350,28 @@ class Initiator:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> Initiator:
+        stack = json.get("stack")
+        url = json.get("url")
+        line_number = json.get("lineNumber")
+        column_number = json.get("columnNumber")
+        request_id = json.get("requestId")
         return cls(
             type_=str(json["type"]),
             stack=(
-                runtime.StackTrace.from_json(json["stack"])
-                if json.get("stack", None) is not None
+                runtime.StackTrace.from_json(stack)
+                if stack is not None
                 else None
             ),
-            url=(
-                str(json["url"]) if json.get("url", None) is not None else None
-            ),
+            url=str(url) if url is not None else None,
             line_number=(
-                float(json["lineNumber"])
-                if json.get("lineNumber", None) is not None
-                else None
+                float(line_number) if line_number is not None else None
             ),
             column_number=(
-                float(json["columnNumber"])
-                if json.get("columnNumber", None) is not None
-                else None
+                float(column_number) if column_number is not None else None
             ),
             request_id=(
-                RequestId.from_json(json["requestId"])
-                if json.get("requestId", None) is not None
+                RequestId.from_json(request_id)
+                if request_id is not None
                 else None
             ),
         )
@@ -1454,6 +1472,10 @@ class Cookie:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> Cookie:
+        expires = json.get("expires")
+        same_site = json.get("sameSite")
+        partition_key = json.get("partitionKey")
+        partition_key_opaque = json.get("partitionKeyOpaque")
         return cls(
             name=str(json["name"]),
             value=str(json["value"]),
@@ -1463,28 +1485,26 @@ class Cookie:
             http_only=bool(json["httpOnly"]),
             secure=bool(json["secure"]),
             session=bool(json["session"]),
-            priority=CookiePriority.from_json(json["priority"]),
+            priority=enum_member(CookiePriority, json["priority"]),
             same_party=bool(json["sameParty"]),
-            source_scheme=CookieSourceScheme.from_json(json["sourceScheme"]),
-            source_port=int(json["sourcePort"]),
-            expires=(
-                float(json["expires"])
-                if json.get("expires", None) is not None
-                else None
+            source_scheme=enum_member(
+                CookieSourceScheme, json["sourceScheme"]
             ),
+            source_port=int(json["sourcePort"]),
+            expires=float(expires) if expires is not None else None,
             same_site=(
-                CookieSameSite.from_json(json["sameSite"])
-                if json.get("sameSite", None) is not None
+                enum_member(CookieSameSite, same_site)
+                if same_site is not None
                 else None
             ),
             partition_key=(
-                CookiePartitionKey.from_json(json["partitionKey"])
-                if json.get("partitionKey", None) is not None
+                CookiePartitionKey.from_json(partition_key)
+                if partition_key is not None
                 else None
             ),
             partition_key_opaque=(
-                bool(json["partitionKeyOpaque"])
-                if json.get("partitionKeyOpaque", None) is not None
+                bool(partition_key_opaque)
+                if partition_key_opaque is not None
                 else None
             ),
         )
@@ -1679,15 +1699,16 @@ class AssociatedCookie:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> AssociatedCookie:
+        exemption_reason = json.get("exemptionReason")
         return cls(
             cookie=Cookie.from_json(json["cookie"]),
             blocked_reasons=[
-                CookieBlockedReason.from_json(i)
+                enum_member(CookieBlockedReason, i)
                 for i in json["blockedReasons"]
             ],
             exemption_reason=(
-                CookieExemptionReason.from_json(json["exemptionReason"])
-                if json.get("exemptionReason", None) is not None
+                enum_member(CookieExemptionReason, exemption_reason)
+                if exemption_reason is not None
                 else None
             ),
         )
@@ -3414,16 +3435,13 @@ class DataReceived:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> DataReceived:
+        data = json.get("data")
         return cls(
             request_id=RequestId.from_json(json["requestId"]),
             timestamp=MonotonicTime.from_json(json["timestamp"]),
             data_length=int(json["dataLength"]),
             encoded_data_length=int(json["encodedDataLength"]),
-            data=(
-                str(json["data"])
-                if json.get("data", None) is not None
-                else None
-            ),
+            data=str(data) if data is not None else None,
         )
 
 
@@ -3656,6 +3674,10 @@ class RequestWillBeSent:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> RequestWillBeSent:
+        redirect_response = json.get("redirectResponse")
+        type_ = json.get("type")
+        frame_id = json.get("frameId")
+        has_user_gesture = json.get("hasUserGesture")
         return cls(
             request_id=RequestId.from_json(json["requestId"]),
             loader_id=LoaderId.from_json(json["loaderId"]),
@@ -3666,23 +3688,21 @@ class RequestWillBeSent:
             initiator=Initiator.from_json(json["initiator"]),
             redirect_has_extra_info=bool(json["redirectHasExtraInfo"]),
             redirect_response=(
-                Response.from_json(json["redirectResponse"])
-                if json.get("redirectResponse", None) is not None
+                Response.from_json(redirect_response)
+                if redirect_response is not None
                 else None
             ),
             type_=(
-                ResourceType.from_json(json["type"])
-                if json.get("type", None) is not None
-                else None
+                enum_member(ResourceType, type_) if type_ is not None else None
             ),
             frame_id=(
-                page.FrameId.from_json(json["frameId"])
-                if json.get("frameId", None) is not None
+                page.FrameId.from_json(frame_id)
+                if frame_id is not None
                 else None
             ),
             has_user_gesture=(
-                bool(json["hasUserGesture"])
-                if json.get("hasUserGesture", None) is not None
+                bool(has_user_gesture)
+                if has_user_gesture is not None
                 else None
             ),
         )
@@ -3754,16 +3774,17 @@ class ResponseReceived:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> ResponseReceived:
+        frame_id = json.get("frameId")
         return cls(
             request_id=RequestId.from_json(json["requestId"]),
             loader_id=LoaderId.from_json(json["loaderId"]),
             timestamp=MonotonicTime.from_json(json["timestamp"]),
-            type_=ResourceType.from_json(json["type"]),
+            type_=enum_member(ResourceType, json["type"]),
             response=Response.from_json(json["response"]),
             has_extra_info=bool(json["hasExtraInfo"]),
             frame_id=(
-                page.FrameId.from_json(json["frameId"])
-                if json.get("frameId", None) is not None
+                page.FrameId.from_json(frame_id)
+                if frame_id is not None
                 else None
             ),
         )
@@ -4006,6 +4027,10 @@ class RequestWillBeSentExtraInfo:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> RequestWillBeSentExtraInfo:
+        client_security_state = json.get("clientSecurityState")
+        site_has_cookie_in_other_partition = json.get(
+            "siteHasCookieInOtherPartition"
+        )
         return cls(
             request_id=RequestId.from_json(json["requestId"]),
             associated_cookies=[
@@ -4015,13 +4040,13 @@ class RequestWillBeSentExtraInfo:
             headers=Headers.from_json(json["headers"]),
             connect_timing=ConnectTiming.from_json(json["connectTiming"]),
             client_security_state=(
-                ClientSecurityState.from_json(json["clientSecurityState"])
-                if json.get("clientSecurityState", None) is not None
+                ClientSecurityState.from_json(client_security_state)
+                if client_security_state is not None
                 else None
             ),
             site_has_cookie_in_other_partition=(
-                bool(json["siteHasCookieInOtherPartition"])
-                if json.get("siteHasCookieInOtherPartition", None) is not None
+                bool(site_has_cookie_in_other_partition)
+                if site_has_cookie_in_other_partition is not None
                 else None
             ),
         )
@@ -4076,6 +4101,10 @@ class ResponseReceivedExtraInfo:
 
     @classmethod
     def from_json(cls, json: T_JSON_DICT) -> ResponseReceivedExtraInfo:
+        headers_text = json.get("headersText")
+        cookie_partition_key = json.get("cookiePartitionKey")
+        cookie_partition_key_opaque = json.get("cookiePartitionKeyOpaque")
+        exempted_cookies = json.get("exemptedCookies")
         return cls(
             request_id=RequestId.from_json(json["requestId"]),
             blocked_cookies=[
@@ -4083,31 +4112,29 @@ class ResponseReceivedExtraInfo:
                 for i in json["blockedCookies"]
             ],
             headers=Headers.from_json(json["headers"]),
-            resource_ip_address_space=IPAddressSpace.from_json(
-                json["resourceIPAddressSpace"]
+            resource_ip_address_space=enum_member(
+                IPAddressSpace, json["resourceIPAddressSpace"]
             ),
             status_code=int(json["statusCode"]),
             headers_text=(
-                str(json["headersText"])
-                if json.get("headersText", None) is not None
-                else None
+                str(headers_text) if headers_text is not None else None
             ),
             cookie_partition_key=(
-                CookiePartitionKey.from_json(json["cookiePartitionKey"])
-                if json.get("cookiePartitionKey", None) is not None
+                CookiePartitionKey.from_json(cookie_partition_key)
+                if cookie_partition_key is not None
                 else None
             ),
             cookie_partition_key_opaque=(
-                bool(json["cookiePartitionKeyOpaque"])
-                if json.get("cookiePartitionKeyOpaque", None) is not None
+                bool(cookie_partition_key_opaque)
+                if cookie_partition_key_opaque is not None
                 else None
             ),
             exempted_cookies=(
                 [
                     ExemptedSetCookieWithReason.from_json(i)
-                    for i in json["exemptedCookies"]
+                    for i in exempted_cookies
                 ]
-                if json.get("exemptedCookies", None) is not None
+                if exempted_cookies is not None
                 else None
             ),
         )
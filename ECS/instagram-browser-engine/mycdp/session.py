@@ -0,0 +1,446 @@
+"""
+Asyncio transport for the generated CDP commands.
+
+Every command in this package is a generator that yields a request dict and
+expects the response dict to be sent back into it. ``CDPSession`` drives
+those generators over a websocket, keeps any number of them in flight
+(matched up by message id) and fans events out to per-method async
+iterators.
+
+    session = await CDPSession.connect(websocket_url)
+    await session.execute(network.enable())
+    async for event in session.listen(network.ResponseReceived):
+        ...
+
+``TargetMultiplexer`` attaches to many targets (tabs) in flat mode and hands
+out one child ``CDPSession`` per target, all sharing the same websocket.
+
+``websockets`` is only needed by ``CDPSession.connect``; anything with an
+async ``send(str)``, async iteration over incoming text frames and an async
+``close()`` can be passed to the constructor instead.
+"""
+import asyncio
+import itertools
+import json
+import typing
+from . import target
+from . import util
+from .util import T_JSON_DICT
+
+_CLOSED = object()
+
+
+class CDPError(Exception):
+    """The browser answered a command with an error."""
+
+    def __init__(self, code: int, message: str, data: typing.Any = None):
+        super().__init__(f"{message} ({code})")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+def _event_method(event: typing.Union[str, type]) -> str:
+    """Return the CDP method for an event class (or a method name)."""
+    if isinstance(event, str):
+        return event
+    for method, cls in util._event_parsers.items():
+        if cls is event:
+            return method
+    raise ValueError(f"{event!r} is not a registered event class")
+
+
+class EventStream:
+    """
+    Async iterator over the events of one or more methods.
+
+    The queue is bounded: once a consumer is ``maxsize`` events behind, the
+    session stops reading from the websocket until it catches up, so a slow
+    consumer slows the browser connection down instead of growing memory.
+    Don't await commands on the same session while holding a full stream.
+    """
+
+    def __init__(self, session, methods: typing.Tuple[str, ...], maxsize: int):
+        self._session = session
+        self.methods = methods
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        event = await self._queue.get()
+        if event is _CLOSED:
+            raise StopAsyncIteration
+        return event
+
+    async def _put(self, event) -> None:
+        if not self.closed:
+            await self._queue.put(event)
+
+    def close(self) -> None:
+        """Detach from the session and drop anything not yet consumed."""
+        if self.closed:
+            return
+        self.closed = True
+        self._session._detach(self)
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(_CLOSED)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+class CDPSession:
+    """
+    Drives mycdp command generators over one websocket connection.
+
+    A session either owns the connection (the browser session) or is a
+    child created by ``session()`` for a flat ``sessionId``: children share
+    the parent's connection and message ids, but have their own in-flight
+    limit and event streams. The owner routes incoming messages to children
+    by ``sessionId``.
+
+    :param connection: An open websocket (or any object with async
+        ``send``/``close`` and async iteration over incoming messages).
+    :param max_in_flight: Maximum number of commands awaiting a response at
+        once; further ``execute`` calls wait for a slot. ``None`` means no
+        limit.
+    :param event_queue_size: Default bound of each ``listen`` stream.
+    :param lazy_events: Decode events as lazy views (see
+        ``util.parse_json_event``).
+    """
+
+    def __init__(
+        self,
+        connection,
+        max_in_flight: typing.Optional[int] = None,
+        event_queue_size: int = 1000,
+        lazy_events: bool = False,
+        session_id: typing.Optional[target.SessionID] = None,
+        parent: typing.Optional["CDPSession"] = None,
+    ):
+        self._connection = connection
+        self._parent = parent
+        self._root: CDPSession = parent._root if parent is not None else self
+        self._ids = self._root._ids if parent is not None else itertools.count(1)
+        self._children: typing.Dict[str, CDPSession] = dict()
+        self._pending: typing.Dict[int, asyncio.Future] = dict()
+        self._streams: typing.Dict[str, typing.List[EventStream]] = dict()
+        self._slots = (
+            asyncio.Semaphore(max_in_flight) if max_in_flight else None
+        )
+        self._reader: typing.Optional[asyncio.Task] = None
+        self.event_queue_size = event_queue_size
+        self.lazy_events = lazy_events
+        self.subscriptions = util.Subscriptions()
+        self.session_id = session_id
+        self.closed = False
+
+    @classmethod
+    async def connect(cls, url: str, **kwargs) -> "CDPSession":
+        """Open a websocket to ``url`` and start a session on it."""
+        try:
+            import websockets
+        except ImportError as exc:
+            raise ImportError(
+                "CDPSession.connect() requires the websockets package"
+            ) from exc
+        connection = await websockets.connect(url, max_size=None)
+        return cls(connection, **kwargs).start()
+
+    def start(self) -> "CDPSession":
+        """Start reading responses and events from the connection."""
+        if self._reader is None and self._parent is None:
+            self._reader = asyncio.ensure_future(self._read_loop())
+        return self
+
+    async def execute(self, cmd: typing.Generator) -> typing.Any:
+        """Run a command generator and return its decoded result."""
+        request = next(cmd)
+        response = await self.send(request["method"], request.get("params"))
+        try:
+            cmd.send(response)
+        except StopIteration as result:
+            return result.value
+        raise RuntimeError(f"{request['method']} yielded more than once")
+
+    async def send(
+        self, method: str, params: typing.Optional[T_JSON_DICT] = None
+    ) -> T_JSON_DICT:
+        """Send a raw command and return the raw ``result`` dict."""
+        if self.closed:
+            raise ConnectionError("CDP session is closed")
+        if self._slots is not None:
+            await self._slots.acquire()
+        message_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            message = {"id": message_id, "method": method}
+            if params:
+                message["params"] = params
+            if self.session_id is not None:
+                message["sessionId"] = self.session_id
+            await self._connection.send(json.dumps(message))
+            return await future
+        finally:
+            self._pending.pop(message_id, None)
+            if self._slots is not None:
+                self._slots.release()
+
+    def session(
+        self,
+        session_id: target.SessionID,
+        max_in_flight: typing.Optional[int] = None,
+        event_queue_size: typing.Optional[int] = None,
+    ) -> "CDPSession":
+        """Return the child session for a flat ``session_id``."""
+        root = self._root
+        child = root._children.get(session_id)
+        if child is None:
+            child = root._children[session_id] = CDPSession(
+                self._connection,
+                max_in_flight=max_in_flight,
+                event_queue_size=event_queue_size or self.event_queue_size,
+                lazy_events=self.lazy_events,
+                session_id=session_id,
+                parent=root,
+            )
+        return child
+
+    def listen(
+        self,
+        *events: typing.Union[str, type],
+        maxsize: typing.Optional[int] = None,
+    ) -> EventStream:
+        """
+        Return an async iterator over the given events (event classes or
+        method names such as ``"Network.responseReceived"``). Events nobody
+        listens to are skipped without being decoded.
+        """
+        methods = tuple(_event_method(event) for event in events)
+        if maxsize is None:
+            maxsize = self.event_queue_size
+        stream = EventStream(self, methods, maxsize)
+        for method in methods:
+            self._streams.setdefault(method, []).append(stream)
+            self.subscriptions.subscribe(method)
+        return stream
+
+    def _detach(self, stream: EventStream) -> None:
+        for method in stream.methods:
+            streams = self._streams.get(method, [])
+            if stream in streams:
+                streams.remove(stream)
+            if not streams:
+                self._streams.pop(method, None)
+                self.subscriptions.unsubscribe(method)
+
+    async def _read_loop(self) -> None:
+        error: Exception = ConnectionError("CDP connection closed")
+        try:
+            async for raw in self._connection:
+                await self._dispatch(json.loads(raw))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            error = exc
+        finally:
+            self._shutdown(error)
+
+    async def _dispatch(self, message: T_JSON_DICT) -> None:
+        session_id = message.get("sessionId")
+        if session_id is not None and session_id != self.session_id:
+            child = self._children.get(session_id)
+            if child is not None:
+                await child._dispatch(message)
+            return
+        if message.get("method") == "Target.detachedFromTarget":
+            detached = message.get("params", {}).get("sessionId")
+            child = self._children.pop(detached, None)
+            if child is not None:
+                child._shutdown(ConnectionError("CDP target detached"))
+        if "id" in message:
+            future = self._pending.get(message["id"])
+            if future is None or future.done():
+                return
+            if "error" in message:
+                error = message["error"]
+                future.set_exception(
+                    CDPError(
+                        error.get("code"),
+                        error.get("message"),
+                        error.get("data"),
+                    )
+                )
+            else:
+                future.set_result(message.get("result", {}))
+            return
+        event = util.parse_json_event(
+            message, lazy=self.lazy_events, subscriptions=self.subscriptions
+        )
+        if event is None:
+            return
+        for stream in list(self._streams.get(message["method"], ())):
+            await stream._put(event)
+
+    def _shutdown(self, error: Exception) -> None:
+        self.closed = True
+        for child in list(self._children.values()):
+            child._shutdown(error)
+        self._children.clear()
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        for streams in list(self._streams.values()):
+            for stream in list(streams):
+                stream.close()
+
+    async def close(self) -> None:
+        """
+        Close the connection and stop every stream. On a child session this
+        only stops the child; the browser connection stays open.
+        """
+        if self._parent is not None:
+            self._root._children.pop(self.session_id, None)
+            self._shutdown(ConnectionError("CDP session is closed"))
+            return
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+        self._shutdown(ConnectionError("CDP session is closed"))
+        await self._connection.close()
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class TargetMultiplexer:
+    """
+    Works several targets in parallel over one browser connection.
+
+    Targets are attached in flat mode, so every command and event carries a
+    ``sessionId`` and is routed through the browser session's websocket to
+    the child ``CDPSession`` for that target. Each child has its own event
+    queues and an in-flight command limit, so one busy tab cannot starve the
+    others of command slots.
+
+    :param browser: The browser-level session (from ``CDPSession.connect``
+        on the ``/devtools/browser/...`` endpoint).
+    :param max_in_flight: Per-target limit of commands awaiting a response.
+    :param event_queue_size: Per-stream event bound for each target.
+    """
+
+    def __init__(
+        self,
+        browser: CDPSession,
+        max_in_flight: typing.Optional[int] = 8,
+        event_queue_size: typing.Optional[int] = None,
+    ):
+        self.browser = browser
+        self.max_in_flight = max_in_flight
+        self.event_queue_size = event_queue_size
+        self.sessions: typing.Dict[target.TargetID, CDPSession] = dict()
+        self._contexts: typing.Dict[target.TargetID, typing.Any] = dict()
+        self._auto_attach: typing.Optional[EventStream] = None
+
+    def _adopt(
+        self, target_id: target.TargetID, session_id: target.SessionID
+    ) -> CDPSession:
+        session = self.browser.session(
+            session_id,
+            max_in_flight=self.max_in_flight,
+            event_queue_size=self.event_queue_size,
+        )
+        self.sessions[target_id] = session
+        return session
+
+    async def attach(self, target_id: target.TargetID) -> CDPSession:
+        """Attach to an existing target and return its session."""
+        if target_id in self.sessions and not self.sessions[target_id].closed:
+            return self.sessions[target_id]
+        session_id = await self.browser.execute(
+            target.attach_to_target(target_id, flatten=True)
+        )
+        return self._adopt(target_id, session_id)
+
+    async def open(
+        self, url: str = "about:blank", new_context: bool = False
+    ) -> CDPSession:
+        """
+        Create a page (optionally in its own browser context, i.e. a
+        separate cookie jar) and return its session.
+        """
+        context_id = None
+        if new_context:
+            context_id = await self.browser.execute(
+                target.create_browser_context(dispose_on_detach=True)
+            )
+        target_id = await self.browser.execute(
+            target.create_target(url, browser_context_id=context_id)
+        )
+        if context_id is not None:
+            self._contexts[target_id] = context_id
+        return await self.attach(target_id)
+
+    async def auto_attach(self) -> None:
+        """Attach to related targets as the browser creates them."""
+        if self._auto_attach is not None:
+            return
+        stream = self._auto_attach = self.browser.listen(
+            target.AttachedToTarget
+        )
+
+        async def adopt():
+            async for event in stream:
+                self._adopt(event.target_info.target_id, event.session_id)
+
+        asyncio.ensure_future(adopt())
+        await self.browser.execute(
+            target.set_auto_attach(
+                auto_attach=True, wait_for_debugger_on_start=False, flatten=True
+            )
+        )
+
+    async def close(self, target_id: target.TargetID) -> None:
+        """Detach from and close a target."""
+        session = self.sessions.pop(target_id, None)
+        if session is None:
+            return
+        await session.close()
+        if self.browser.closed:
+            return
+        await self.browser.execute(target.close_target(target_id))
+        context_id = self._contexts.pop(target_id, None)
+        if context_id is not None:
+            await self.browser.execute(
+                target.dispose_browser_context(context_id)
+            )
+
+    async def close_all(self) -> None:
+        """Close every target opened or attached through the multiplexer."""
+        if self._auto_attach is not None:
+            self._auto_attach.close()
+            self._auto_attach = None
+        for target_id in list(self.sessions):
+            await self.close(target_id)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close_all()
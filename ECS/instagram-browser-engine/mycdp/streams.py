@@ -0,0 +1,110 @@
+"""
+Incremental reading of ``IO`` stream handles over a ``CDPSession``.
+
+``IO.read`` hands a stream back in (usually base64) chunks. ``StreamReader``
+loops over it with a fixed chunk size and yields each chunk as ``bytes`` the
+moment it is decoded, so a multi-megabyte response body never has to be
+held in memory at once. The next chunk is requested while the current one
+is being consumed, and the handle is closed when the reader exits.
+
+    handle = await session.execute(fetch.take_response_body_as_stream(rid))
+    async with StreamReader(session, handle) as reader:
+        async for chunk in reader:
+            out.write(chunk)
+
+To parse JSON without buffering it, feed the chunks to an incremental
+parser, e.g. ``await reader.feed(ijson_coroutine.send)``.
+"""
+import asyncio
+import binascii
+import typing
+from . import io
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class StreamReader:
+    """
+    Reads an ``IO.StreamHandle`` chunk by chunk.
+
+    Peak memory is about two chunks: the one being consumed and the one
+    being fetched.
+
+    :param session: A started ``CDPSession`` (or child session).
+    :param handle: The stream handle, e.g. from
+        ``fetch.take_response_body_as_stream`` or ``page.print_to_pdf``.
+    :param chunk_size: Maximum number of bytes requested per ``IO.read``.
+    """
+
+    def __init__(
+        self,
+        session,
+        handle: io.StreamHandle,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self._session = session
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self.eof = False
+        self.closed = False
+        self._pending: typing.Optional[asyncio.Future] = None
+
+    def _request(self) -> asyncio.Future:
+        return asyncio.ensure_future(
+            self._session.execute(io.read(self.handle, size=self.chunk_size))
+        )
+
+    async def read_chunk(self) -> typing.Optional[bytes]:
+        """Return the next chunk, or ``None`` once the stream is exhausted."""
+        if self.eof or self.closed:
+            return None
+        pending = self._pending or self._request()
+        self._pending = None
+        base64_encoded, data, eof = await pending
+        self.eof = eof
+        if not eof:
+            self._pending = self._request()
+        if base64_encoded:
+            chunk = binascii.a2b_base64(data)
+        else:
+            chunk = data.encode("utf-8")
+        self.bytes_read += len(chunk)
+        return chunk
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        chunk = await self.read_chunk()
+        while chunk is not None and not chunk and not self.eof:
+            chunk = await self.read_chunk()
+        if not chunk:
+            raise StopAsyncIteration
+        return chunk
+
+    async def feed(self, sink: typing.Callable[[bytes], typing.Any]) -> int:
+        """Pass every chunk to ``sink`` and return the number of bytes read."""
+        async for chunk in self:
+            sink(chunk)
+        return self.bytes_read
+
+    async def close(self) -> None:
+        """Close the handle in the browser. Safe to call more than once."""
+        if self.closed:
+            return
+        self.closed = True
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            try:
+                await pending
+            except Exception:
+                pass
+        if not self._session.closed:
+            await self._session.execute(io.close(self.handle))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -1,8 +1,126 @@
+import dataclasses
+import enum
+import importlib
+import os
 import typing
 
 T_JSON_DICT = typing.Dict[str, typing.Any]
+T_PREDICATE = typing.Callable[[T_JSON_DICT], bool]
 _event_parsers = dict()
 
+# Set MYCDP_SLOTS=1 before the first domain is imported to build every
+# generated type with ``__slots__`` instead of a per-instance ``__dict__``.
+# This is process-wide; code that needs a ``__dict__`` subclasses the type
+# (as the lazy views do). See README.md.
+SLOTS = os.environ.get("MYCDP_SLOTS", "") not in ("", "0")
+
+# Map of CDP domain names to the module that defines them. Used to import
+# the owning domain of an event the first time that event is parsed.
+_domain_modules = {
+    "Accessibility": "accessibility",
+    "Animation": "animation",
+    "Audits": "audits",
+    "Autofill": "autofill",
+    "BackgroundService": "background_service",
+    "Browser": "browser",
+    "CacheStorage": "cache_storage",
+    "Cast": "cast",
+    "Console": "console",
+    "CSS": "css",
+    "Database": "database",
+    "Debugger": "debugger",
+    "DeviceAccess": "device_access",
+    "DeviceOrientation": "device_orientation",
+    "DOM": "dom",
+    "DOMDebugger": "dom_debugger",
+    "DOMSnapshot": "dom_snapshot",
+    "DOMStorage": "dom_storage",
+    "Emulation": "emulation",
+    "EventBreakpoints": "event_breakpoints",
+    "Extensions": "extensions",
+    "FedCm": "fed_cm",
+    "Fetch": "fetch",
+    "HeadlessExperimental": "headless_experimental",
+    "HeapProfiler": "heap_profiler",
+    "IndexedDB": "indexed_db",
+    "Input": "input_",
+    "Inspector": "inspector",
+    "IO": "io",
+    "LayerTree": "layer_tree",
+    "Log": "log",
+    "Media": "media",
+    "Memory": "memory",
+    "Network": "network",
+    "Overlay": "overlay",
+    "Page": "page",
+    "Performance": "performance",
+    "PerformanceTimeline": "performance_timeline",
+    "Preload": "preload",
+    "Profiler": "profiler",
+    "PWA": "pwa",
+    "Runtime": "runtime",
+    "Schema": "schema",
+    "Security": "security",
+    "ServiceWorker": "service_worker",
+    "Storage": "storage",
+    "SystemInfo": "system_info",
+    "Target": "target",
+    "Tethering": "tethering",
+    "Tracing": "tracing",
+    "WebAudio": "web_audio",
+    "WebAuthn": "web_authn",
+}
+
+
+class _LazyDomain:
+    """
+    Stand-in for a sibling domain module that is imported on first use.
+
+    Once loaded, the stand-in replaces itself in the namespace that created
+    it, so later lookups go straight to the real module.
+    """
+
+    __slots__ = ("_name", "_namespace")
+
+    def __init__(self, name: str, namespace: T_JSON_DICT):
+        self._name = name
+        self._namespace = namespace
+
+    def __getattr__(self, attr: str) -> typing.Any:
+        module = importlib.import_module("." + self._name, __package__)
+        if self._namespace.get(self._name) is self:
+            self._namespace[self._name] = module
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy domain {__package__}.{self._name}>"
+
+
+def lazy_domain(name: str, namespace: T_JSON_DICT) -> typing.Any:
+    """Return a deferred reference to the sibling domain module ``name``."""
+    return _LazyDomain(name, namespace)
+
+
+def dataclass(cls):
+    """
+    ``dataclasses.dataclass`` for generated types.
+
+    When ``SLOTS`` is enabled the class is rebuilt with ``__slots__`` for its
+    fields (the same way ``dataclass(slots=True)`` does on Python 3.10+), so
+    instances carry no ``__dict__``. ``to_json``/``from_json`` are unchanged.
+    """
+    cls = dataclasses.dataclass(cls)
+    if not SLOTS:
+        return cls
+    names = tuple(field.name for field in dataclasses.fields(cls))
+    namespace = dict(cls.__dict__)
+    for name in names + ("__dict__", "__weakref__"):
+        namespace.pop(name, None)
+    namespace["__slots__"] = names
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
 
 def event_class(method):
     """A decorator that registers a class as an event class."""
@@ -14,6 +132,255 @@ def event_class(method):
     return decorate
 
 
-def parse_json_event(json: T_JSON_DICT) -> typing.Any:
-    """Parse a JSON dictionary into a CDP event."""
-    return _event_parsers[json["method"]].from_json(json["params"])
+def enum_member(cls, value) -> typing.Any:
+    """
+    ``cls(value)`` for an enum, without ``Enum.__call__`` for known values.
+
+    Unknown values still go through the enum, so they raise the usual
+    ``ValueError``.
+    """
+    member = cls._value2member_map_.get(value)
+    return member if member is not None else cls(value)
+
+
+_lazy_classes: typing.Dict[type, type] = dict()
+
+
+def _field_decoder(hint) -> typing.Callable[[typing.Any], typing.Any]:
+    """
+    Build the decoder of one field from its type, the same conversion the
+    generated ``from_json`` applies, except that nested dataclasses become
+    lazy views too.
+    """
+    origin = typing.get_origin(hint)
+    if origin is typing.Union:
+        # typing.Optional[X]; absent values never reach the decoder
+        args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+        return _field_decoder(args[0])
+    if origin is list:
+        item = _field_decoder(typing.get_args(hint)[0])
+        return lambda value: [item(i) for i in value]
+    if not isinstance(hint, type):
+        # typing.Any
+        return lambda value: value
+    if issubclass(hint, enum.Enum):
+        return lambda value: enum_member(hint, value)
+    if dataclasses.is_dataclass(hint):
+        return lambda value: _lazy_view(hint, value)
+    return getattr(hint, "from_json", hint)
+
+
+def _normalize_key(name: str) -> str:
+    return name.replace("_", "").lower()
+
+
+class _LazyField:
+    """
+    Decodes one field of a lazy view on first access and caches it.
+
+    CDP keys are the field names in camelCase, give or take the case of
+    acronyms (``documentURL`` is ``document_url``) and a trailing ``_``
+    (``type_``). The key is looked up once per class and remembered.
+    """
+
+    __slots__ = ("name", "decode", "required", "key")
+
+    def __init__(self, name: str, decode, required: bool):
+        self.name = name
+        self.decode = decode
+        self.required = required
+        head, *rest = name.rstrip("_").split("_")
+        self.key = head + "".join(word.capitalize() for word in rest)
+
+    def _find_key(self, json: T_JSON_DICT) -> typing.Optional[str]:
+        if self.key in json:
+            return self.key
+        wanted = _normalize_key(self.name.rstrip("_"))
+        for key in json:
+            if _normalize_key(key) == wanted:
+                self.key = key
+                return key
+        return None
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        json = obj.__dict__["_json"]
+        key = self._find_key(json)
+        raw = json.get(key) if key is not None else None
+        if raw is None:
+            if self.required:
+                raise KeyError(self.key)
+            value = None
+        else:
+            value = self.decode(raw)
+        obj.__dict__[self.name] = value
+        return value
+
+
+def _lazy_class(cls) -> type:
+    """
+    Return the lazy-view subclass of the dataclass ``cls``, or ``cls`` itself
+    if its field types cannot be resolved.
+    """
+    lazy = _lazy_classes.get(cls)
+    if lazy is not None:
+        return lazy
+    try:
+        hints = typing.get_type_hints(cls)
+        namespace: T_JSON_DICT = {
+            field.name: _LazyField(
+                field.name,
+                _field_decoder(hints[field.name]),
+                typing.get_origin(hints[field.name]) is not typing.Union,
+            )
+            for field in dataclasses.fields(cls)
+        }
+    except Exception:
+        _lazy_classes[cls] = cls
+        return cls
+    names = tuple(namespace)
+
+    def __eq__(self, other):
+        if not isinstance(other, cls):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in names)
+
+    # The dataclass __init__ is inherited on purpose: calling the class (as
+    # dataclasses.replace() does) builds an ordinary, fully decoded instance,
+    # since the values it sets shadow the lazy fields.
+    namespace.update(
+        __eq__=__eq__,
+        __module__=cls.__module__,
+        __qualname__=cls.__qualname__,
+        __doc__=cls.__doc__,
+        from_json=classmethod(lambda klass, json: _lazy_view(cls, json)),
+    )
+    lazy = _lazy_classes[cls] = type(cls.__name__, (cls,), namespace)
+    return lazy
+
+
+def _lazy_view(cls, json: T_JSON_DICT) -> typing.Any:
+    """
+    Wrap ``json`` in a view that looks like ``cls`` but decodes each field on
+    first access. Falls back to ``cls.from_json`` if that is not possible.
+    """
+    lazy = _lazy_classes.get(cls) or _lazy_class(cls)
+    if lazy is cls:
+        return cls.from_json(json)
+    view = object.__new__(lazy)
+    view.__dict__["_json"] = json
+    return view
+
+
+def url_contains(substring: str) -> T_PREDICATE:
+    """
+    Return a predicate on raw event params that matches when the request or
+    response URL (or a top-level ``url``) contains ``substring``.
+    """
+
+    def predicate(params: T_JSON_DICT) -> bool:
+        holder = params.get("request") or params.get("response") or params
+        return substring in holder.get("url", "")
+
+    return predicate
+
+
+class Subscriptions:
+    """
+    A registry of the events a consumer wants parsed.
+
+    Each subscribed method may carry cheap predicates over the raw
+    ``params`` dict; an event is parsed if any of them matches (or if the
+    method was subscribed without one). Everything else is skipped before a
+    single object is built. ``parsed`` and ``skipped`` count events per
+    method so filters can be tuned.
+    """
+
+    def __init__(self):
+        self._predicates: typing.Dict[
+            str, typing.Optional[typing.List[typing.Callable]]
+        ] = dict()
+        self.parsed: typing.Dict[str, int] = dict()
+        self.skipped: typing.Dict[str, int] = dict()
+
+    def subscribe(
+        self,
+        method: str,
+        predicate: typing.Optional[T_PREDICATE] = None,
+        url_substring: typing.Optional[str] = None,
+    ) -> None:
+        """Parse ``method`` events, optionally only those a predicate keeps."""
+        if url_substring is not None:
+            if predicate is not None:
+                raise ValueError("Pass either predicate or url_substring")
+            predicate = url_contains(url_substring)
+        if predicate is None:
+            self._predicates[method] = None
+        elif method not in self._predicates:
+            self._predicates[method] = [predicate]
+        elif self._predicates[method] is not None:
+            self._predicates[method].append(predicate)
+
+    def unsubscribe(self, method: str) -> None:
+        """Stop parsing ``method`` events."""
+        self._predicates.pop(method, None)
+
+    def wants(self, json: T_JSON_DICT) -> bool:
+        """Return whether the raw event ``json`` should be parsed."""
+        method = json["method"]
+        try:
+            predicates = self._predicates[method]
+        except KeyError:
+            wanted = False
+        else:
+            params = json.get("params", {})
+            wanted = predicates is None or any(p(params) for p in predicates)
+        counters = self.parsed if wanted else self.skipped
+        counters[method] = counters.get(method, 0) + 1
+        return wanted
+
+    def stats(self) -> typing.Dict[str, typing.Dict[str, int]]:
+        """Return ``{method: {"parsed": n, "skipped": m}}``."""
+        return {
+            method: {
+                "parsed": self.parsed.get(method, 0),
+                "skipped": self.skipped.get(method, 0),
+            }
+            for method in sorted(set(self.parsed) | set(self.skipped))
+        }
+
+
+def _load_event_parser(method: str) -> typing.Any:
+    """Import the domain that owns ``method`` and return its parser."""
+    domain = method.partition(".")[0]
+    importlib.import_module("." + _domain_modules[domain], __package__)
+    return _event_parsers[method]
+
+
+def parse_json_event(
+    json: T_JSON_DICT,
+    lazy: bool = False,
+    subscriptions: typing.Optional[Subscriptions] = None,
+) -> typing.Any:
+    """
+    Parse a JSON dictionary into a CDP event.
+
+    With ``lazy`` set, the event is a view over ``json["params"]`` that is an
+    instance of the event class but only decodes a field (and, recursively,
+    the nested types inside it) when that field is first read.
+    ``dataclasses.replace()`` on a view returns a fully decoded copy.
+
+    With ``subscriptions`` set, events that nobody subscribed to (including
+    unknown methods) are skipped before anything is decoded, and ``None`` is
+    returned for them.
+    """
+    if subscriptions is not None and not subscriptions.wants(json):
+        return None
+    method = json["method"]
+    parser = _event_parsers.get(method)
+    if parser is None:
+        parser = _load_event_parser(method)
+    if lazy:
+        return _lazy_view(parser, json["params"])
+    return parser.from_json(json["params"])
@@ -0,0 +1,170 @@
+"""
+Streaming NDJSON output for scraped followers.
+
+Instead of collecting every follower and dumping one indented JSON array,
+``FollowerWriter`` appends each page's users to
+``data/<account>_followers.ndjson`` as soon as the page arrives, one user
+per line. The account metadata goes into a header record (first line) and a
+footer record (last line), so the file is written once, front to back, and
+memory stays at one page however large the account is:
+
+    {"record": "header", "username": ..., "user_id": ..., ...}
+    {"pk": ..., "username": ..., ...}
+    ...
+    {"record": "footer", "users_written": ..., "scrape_end_time": ..., ...}
+
+A file without a footer is a partial scrape, and can be resumed from a
+checkpoint with ``resume``.
+"""
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = "followers-ndjson/1"
+RECORD_KEY = "record"
+
+
+def followers_path(data_dir: Path, target_account: str) -> Path:
+    return Path(data_dir) / f"{target_account}_followers.ndjson"
+
+
+class FollowerWriter:
+    """
+    Appends follower pages to an NDJSON file.
+
+    :param path: Output file.
+    :param header: Account metadata written as the first record.
+
+    ``footer`` is merged into the footer record on ``close``, so a caller
+    using the writer as a context manager can still fill it in.
+    """
+
+    def __init__(self, path: Path, header: Dict):
+        self.path = Path(path)
+        self.header = dict(header)
+        self.footer: Dict = dict()
+        self.pages_written = 0
+        self.users_written = 0
+        self.bytes_written = 0
+        self._file = None
+
+    def open(self) -> "FollowerWriter":
+        """Create the file and write the header record."""
+        self._file = open(self.path, "w", encoding="utf-8", newline="\n")
+        self._write({RECORD_KEY: "header", "format": FORMAT_VERSION, **self.header})
+        return self
+
+    def resume(self, bytes_written: int, pages_written: int, users_written: int) -> bool:
+        """
+        Reopen a partial file for appending after ``bytes_written`` bytes.
+
+        Anything past that offset was written after the checkpoint and is
+        cut off. Returns False (and does nothing) if the file is shorter
+        than the checkpoint says, in which case the caller starts over.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return False
+        if size < bytes_written or bytes_written <= 0:
+            return False
+        os.truncate(self.path, bytes_written)
+        self._file = open(self.path, "a", encoding="utf-8", newline="\n")
+        self.bytes_written = bytes_written
+        self.pages_written = pages_written
+        self.users_written = users_written
+        logger.info(f"Resuming {self.path} after {pages_written} pages")
+        return True
+
+    def sync(self) -> None:
+        """fsync what has been written so far."""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _write(self, record: Dict) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._file.write(line)
+        self.bytes_written += len(line.encode("utf-8"))
+
+    def write_page(self, users: Iterable[Dict]) -> int:
+        """Append one page of users and return how many were written."""
+        count = 0
+        for user in users:
+            self._write(user)
+            count += 1
+        self._file.flush()
+        self.pages_written += 1
+        self.users_written += count
+        return count
+
+    def close(self, footer: Optional[Dict] = None) -> None:
+        """Write the footer record (marks the file complete) and close."""
+        if self._file is None:
+            return
+        self._write(
+            {
+                RECORD_KEY: "footer",
+                "pages_written": self.pages_written,
+                "users_written": self.users_written,
+                "written_at": time.time(),
+                **self.footer,
+                **(footer or {}),
+            }
+        )
+        self._file.close()
+        self._file = None
+        logger.info(
+            f"Wrote {self.users_written} users in {self.pages_written} pages to {self.path}"
+        )
+
+    def abort(self) -> None:
+        """Close without a footer, leaving a partial file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        if self._file is None:
+            self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def read_followers(path: Path) -> Tuple[Dict, Iterator[Dict], Dict]:
+    """
+    Return ``(header, users, footer)`` for an NDJSON followers file.
+
+    ``users`` is a lazy iterator; ``footer`` is filled in once it has been
+    exhausted and stays empty for a partial file.
+    """
+    f = open(path, "r", encoding="utf-8")
+    first = f.readline()
+    header = json.loads(first) if first.strip() else {}
+    if header.get(RECORD_KEY) != "header":
+        f.close()
+        raise ValueError(f"{path} does not start with a header record")
+    footer: Dict = dict()
+
+    def users() -> Iterator[Dict]:
+        with f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get(RECORD_KEY) == "footer":
+                    footer.update(record)
+                    return
+                yield record
+
+    return header, users(), footer
@@ -0,0 +1,333 @@
+"""
+Keep-alive pagination of Instagram's followers API.
+
+Each followers page is a small JSON document, so opening a new TLS
+connection and rebuilding the headers and cookies for every page used to
+cost more than the page itself. ``FollowerPaginator`` is built once per
+account: one pooled ``requests.Session`` with the headers set up front and a
+cookie jar seeded from the browser. The jar follows ``Set-Cookie`` on its
+own. The ``X-CSRFToken`` header is only refreshed when ``csrftoken``
+changes, and the browser cookies are only read again after a CSRF rejection.
+If the API answers as a logged-out client (401, or a redirect to the login
+page), the paginator calls ``relogin`` once and retries the page with the
+fresh cookies, so a session that expires mid-walk does not lose the walk.
+
+For re-scrapes, ``EarlyStop`` ends the walk once a few consecutive pages
+hold nothing but followers already in the previous snapshot: the API lists
+newest followers first, so everything after that point is known.
+"""
+import logging
+import statistics
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+API_HOST = "www.instagram.com"
+COOKIE_URL = "https://www.instagram.com/"
+FOLLOWERS_URL = "https://www.instagram.com/api/v1/friendships/{user_id}/followers/"
+PROFILE_URL = "https://www.instagram.com/api/v1/users/web_profile_info/"
+
+# (connect, read) seconds; a stalled connection fails the page instead of
+# hanging the worker (and, in queue mode, its heartbeat) forever
+TIMEOUT = (10, 30)
+
+BASE_HEADERS = {
+    "sec-ch-ua-full-version-list": '"Not(A:Brand";v="99.0.0.0", "Google Chrome";v="133.0.6943.54", "Chromium";v="133.0.6943.54"',
+    "sec-ch-ua-platform": '"macOS"',
+    "sec-ch-ua": '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
+    "sec-ch-ua-model": '""',
+    "sec-ch-ua-mobile": "?0",
+    "X-IG-App-ID": "936619743392459",
+    "X-Requested-With": "XMLHttpRequest",
+    "Accept": "*/*",
+    "X-Web-Session-ID": "wcfm36:dt9dcn:ib5aos",  # May need to update dynamically
+    "X-ASBD-ID": "129477",
+    "sec-ch-prefers-color-scheme": "dark",
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36",
+    "X-IG-WWW-Claim": "hmac.AR3KwkFLVueyIUz-AWqejkSqx6M86xUZNmPCAKexOlwHAvi0",
+    "sec-ch-ua-platform-version": '"15.1.0"',
+}
+
+
+class LoginRequired(Exception):
+    """The followers API rejected the session as logged out."""
+
+
+def login_required(response: requests.Response) -> bool:
+    """True for a 401, or a request redirected to the login page."""
+    # requests follows the redirect, so the final URL is the login page
+    return response.status_code == 401 or "/accounts/login" in response.url
+
+
+class EarlyStop:
+    """
+    Decides when an incremental walk has reached known followers.
+
+    :param known: Follower pks of the previous snapshot, ascending. A sorted
+        int64 array is the membership structure: exact, 8 bytes per id and
+        O(log n) per lookup, with no hash table to build.
+    :param pages: Consecutive all-known pages that end the walk.
+    """
+
+    def __init__(self, known: Sequence[int], pages: int = 3):
+        self.known = known
+        self.pages = pages
+        self.streak = 0
+        self.new_ids = 0
+        self.stopped = False
+
+    def is_known(self, pk) -> bool:
+        pk = int(pk)
+        n = bisect_left(self.known, pk)
+        return n < len(self.known) and self.known[n] == pk
+
+    def update(self, page: Dict) -> bool:
+        """Account for one page; returns True once the walk should stop."""
+        users = page.get("users", [])
+        new = sum(1 for user in users if not self.is_known(user["pk"]))
+        self.new_ids += new
+        self.streak = self.streak + 1 if users and not new else 0
+        return self.streak >= self.pages
+
+
+class FollowerPaginator:
+    """
+    Walks the followers of one account over a single keep-alive session.
+
+    :param sb: The SeleniumBase driver the cookies come from.
+    :param target_account: Username, used for the ``Referer`` header.
+    :param page_size: Users requested per page.
+    :param delay: Pause between pages, in seconds.
+    :param pool_size: Connections kept alive in the pool.
+    :param budget: Optional shared ``RateBudget`` every request waits on,
+        on top of ``delay``.
+    :param timeout: ``(connect, read)`` timeout of every request, in seconds.
+    :param relogin: Called to log the browser in again when the API answers
+        as logged out; without it, ``LoginRequired`` is raised.
+    """
+
+    def __init__(
+        self,
+        sb,
+        target_account: str,
+        page_size: int = 12,
+        delay: float = 1.0,
+        pool_size: int = 2,
+        budget=None,
+        timeout: Tuple[float, float] = TIMEOUT,
+        relogin: Optional[Callable[[], None]] = None,
+    ):
+        self._sb = sb
+        self.target_account = target_account
+        self.page_size = page_size
+        self.delay = delay
+        self.budget = budget
+        self.timeout = timeout
+        self.relogin = relogin
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self._adapter = adapter
+        self.session.headers.update(BASE_HEADERS)
+        self.session.headers["Referer"] = f"https://www.instagram.com/{target_account}/followers/"
+
+        self.latencies: List[float] = []
+        self.cookie_syncs = 0
+        self.csrf_rotations = 0
+        self.relogins = 0
+        self.sync_cookies()
+
+    def sync_cookies(self) -> None:
+        """Reload the cookie jar from the browser."""
+        self.session.cookies.clear()
+        for cookie in self._browser_cookies():
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+        self.session.headers["X-CSRFToken"] = self._csrf_token()
+        self.cookie_syncs += 1
+
+    def _browser_cookies(self) -> List[Dict]:
+        # ask DevTools for the site's cookies: WebDriver only returns those of the
+        # current page, and a restored session may not have opened any page yet
+        try:
+            return self._sb.driver.execute_cdp_cmd("Network.getCookies", {"urls": [COOKIE_URL]})["cookies"]
+        except Exception as e:
+            logger.debug(f"Network.getCookies failed, using WebDriver cookies: {e}")
+            return self._sb.get_cookies()
+
+    def _csrf_token(self) -> str:
+        for cookie in self.session.cookies:
+            if cookie.name == "csrftoken":
+                return cookie.value
+        return ""
+
+    def _observe_cookies(self, response: requests.Response) -> None:
+        # the session jar already merged any Set-Cookie; only the header lags behind
+        if "Set-Cookie" not in response.headers:
+            return
+        csrf_token = self._csrf_token()
+        if csrf_token and csrf_token != self.session.headers.get("X-CSRFToken"):
+            logger.info("csrftoken rotated, updating X-CSRFToken")
+            self.session.headers["X-CSRFToken"] = csrf_token
+            self.csrf_rotations += 1
+
+    def fetch_page(self, user_id: str, max_id: Optional[str] = None) -> Dict:
+        """Request one page of followers and return the decoded JSON."""
+        params = {"count": self.page_size, "search_surface": "follow_list_page"}
+        if max_id:
+            params["max_id"] = max_id
+        url = FOLLOWERS_URL.format(user_id=user_id)
+
+        response = self._get(url, params)
+        if response.status_code == 403 and "CSRF" in response.text:
+            # our jar went stale; take the browser's cookies once and retry
+            logger.warning("CSRF check failed, re-syncing cookies from the browser")
+            self.sync_cookies()
+            response = self._get(url, params)
+        if login_required(response):
+            if self.relogin is None:
+                raise LoginRequired(f"Followers request for {user_id} needs a login")
+            # the session expired; log the browser in again and take its cookies
+            logger.warning("Followers API answered as logged out, logging in again")
+            self.relogin()
+            self.relogins += 1
+            self.sync_cookies()
+            response = self._get(url, params)
+            if login_required(response):
+                raise LoginRequired(f"Followers request for {user_id} needs a login after logging in again")
+        response.raise_for_status()
+        return response.json()
+
+    def followers_count(self, username: str) -> Optional[int]:
+        """
+        Follower count from the profile API, for accounts whose profile page
+        was skipped (user id cache hit or checkpoint). None if unavailable.
+        """
+        try:
+            response = self._get(PROFILE_URL, {"username": username})
+            response.raise_for_status()
+            return int(response.json()["data"]["user"]["edge_followed_by"]["count"])
+        except Exception as e:
+            logger.warning(f"Could not get the follower count of {username}: {e}")
+            return None
+
+    def _get(self, url: str, params: Dict) -> requests.Response:
+        if self.budget is not None:
+            self.budget.acquire()
+        start = time.perf_counter()
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        self.latencies.append(time.perf_counter() - start)
+        self._observe_cookies(response)
+        return response
+
+    def pages(
+        self,
+        user_id: str,
+        first_page: Optional[Dict] = None,
+        max_id: Optional[str] = None,
+        stop: Optional[EarlyStop] = None,
+    ) -> Iterator[Dict]:
+        """
+        Yield follower pages until ``next_max_id`` runs out.
+
+        ``first_page`` is a page the browser already fetched (e.g. captured
+        when the modal opened); it is yielded first and not requested again.
+        ``max_id`` starts the walk at a saved cursor instead of page one.
+        ``stop`` ends the walk early once it reports only known followers.
+        """
+        page = first_page
+        if page is None:
+            page = self._next_page(user_id, max_id)
+        while True:
+            yield page
+            caught_up = stop is not None and stop.update(page)
+            next_max_id = page.get("next_max_id")
+            if not next_max_id:
+                return
+            if caught_up:
+                stop.stopped = True
+                logger.info(
+                    f"Stopping after {stop.pages} pages of known followers "
+                    f"({stop.new_ids} new this walk)"
+                )
+                return
+            page = self._next_page(user_id, next_max_id)
+
+    def _next_page(self, user_id: str, max_id: Optional[str]) -> Dict:
+        time.sleep(self.delay)
+        logger.info(f"Getting followers at next_max_id: {max_id}")
+        return self.fetch_page(user_id, max_id)
+
+    def followers(
+        self,
+        user_id: str,
+        first_page: Optional[Dict] = None,
+        stop: Optional[EarlyStop] = None,
+    ) -> List[Dict]:
+        """Return every follower of ``user_id`` (or the new ones, with ``stop``)."""
+        users = []
+        for page in self.pages(user_id, first_page, stop=stop):
+            users.extend(page.get("users", []))
+        return users
+
+    def new_connections(self) -> int:
+        """Number of TCP/TLS connections the pool had to open."""
+        pool = self._adapter.poolmanager.connection_from_host(
+            API_HOST, port=443, scheme="https"
+        )
+        return pool.num_connections
+
+    def stats(self) -> Dict:
+        """Connection reuse ratio and per-page latency so far."""
+        requests_made = len(self.latencies)
+        new_connections = self.new_connections() if requests_made else 0
+        stats = {
+            "requests": requests_made,
+            "new_connections": new_connections,
+            "reuse_ratio": (
+                (requests_made - new_connections) / requests_made if requests_made else 0.0
+            ),
+            "cookie_syncs": self.cookie_syncs,
+            "csrf_rotations": self.csrf_rotations,
+            "relogins": self.relogins,
+        }
+        if requests_made:
+            ordered = sorted(self.latencies)
+            stats["latency_median_ms"] = statistics.median(ordered) * 1000
+            stats["latency_p95_ms"] = ordered[int(0.95 * (requests_made - 1))] * 1000
+            stats["latency_max_ms"] = ordered[-1] * 1000
+        return stats
+
+    def report(self) -> None:
+        """Log ``stats()`` for this account."""
+        stats = self.stats()
+        if not stats["requests"]:
+            logger.info(f"{self.target_account}: no follower pages requested")
+            return
+        logger.info(
+            f"{self.target_account}: {stats['requests']} pages, "
+            f"{stats['new_connections']} connections opened "
+            f"(reuse {stats['reuse_ratio']:.0%}), "
+            f"latency median {stats['latency_median_ms']:.0f}ms "
+            f"p95 {stats['latency_p95_ms']:.0f}ms, "
+            f"{stats['cookie_syncs']} cookie syncs"
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
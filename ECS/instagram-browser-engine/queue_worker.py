@@ -0,0 +1,181 @@
+"""
+Long-running worker that scrapes usernames pulled from a queue.
+
+``QueueWorker`` long-polls a ``work_queue`` backend for messages, one at a
+time by default, and hands the usernames in each message to a ``scrape``
+callable. The caller keeps one warm, logged-in browser behind that
+callable across messages. While a message is in progress, a ``Heartbeat``
+thread keeps extending the visibility timeout of every message received
+and not finished yet. That way an account that takes longer than the
+timeout is not handed to a second worker.
+
+Usernames that fail are sent back as a new message with a delay and the
+attempt count raised, until ``max_attempts`` sends them to the dead-letter
+queue instead. A message that keeps coming back without ever finishing is
+dead-lettered on receipt, since it is probably what is killing the
+browser.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from work_queue import Message, decode_body, encode_body
+
+logger = logging.getLogger(__name__)
+
+
+class Heartbeat:
+    """
+    Extends the visibility of in-flight messages on a background thread.
+
+    :param queue: Queue the messages came from.
+    :param messages: Messages to keep invisible until ``done``.
+    :param visibility_timeout: Seconds each extension buys.
+    :param interval: Seconds between extensions, a third of the timeout by
+        default.
+    """
+
+    def __init__(self, queue, messages: List[Message], visibility_timeout: int, interval: Optional[float] = None):
+        self.queue = queue
+        self.pending = {message.id: message for message in messages}
+        self.visibility_timeout = visibility_timeout
+        self.interval = interval or visibility_timeout / 3
+        self.beats = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="queue-heartbeat", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                pending = list(self.pending.values())
+            if not pending:
+                continue
+            try:
+                self.queue.extend(pending, self.visibility_timeout)
+                self.beats += 1
+            except Exception as e:
+                logger.warning(f"Heartbeat for {len(pending)} messages failed: {e}")
+
+    def done(self, message: Message) -> None:
+        with self._lock:
+            self.pending.pop(message.id, None)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+class QueueWorker:
+    """
+    Pulls username messages off ``queue`` until stopped.
+
+    :param queue: ``SQSQueue`` or ``SQLiteQueue``.
+    :param batch_size: Messages per receive (at most 10). Every message
+        received counts as a delivery, so with more than one a worker that
+        dies on the first message also raises the receive count of the
+        untouched rest, and can get them dead-lettered. Keep 1 unless the
+        messages are cheap.
+    :param wait_seconds: Long-poll wait per receive.
+    :param visibility_timeout: Seconds a received message stays hidden
+        before the next heartbeat.
+    :param max_attempts: Tries per username before it is dead-lettered.
+    :param retry_delay: Delay of the first retry, doubled per attempt.
+    :param idle_exit: Stop after this many seconds without messages (0
+        polls forever).
+    """
+
+    def __init__(
+        self,
+        queue,
+        batch_size: int = 1,
+        wait_seconds: float = 20,
+        visibility_timeout: int = 300,
+        max_attempts: int = 3,
+        retry_delay: int = 60,
+        idle_exit: float = 0,
+    ):
+        self.queue = queue
+        self.batch_size = batch_size
+        self.wait_seconds = wait_seconds
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.idle_exit = idle_exit
+        self.handled = 0
+        self._stop = threading.Event()
+        self._idle_since = time.monotonic()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def stop(self) -> None:
+        """Finish the message in progress, hand back the rest and return."""
+        self._stop.set()
+
+    def run(self, scrape: Callable[[List[str]], Dict], healthy: Optional[Callable[[], bool]] = None) -> None:
+        """
+        Process messages with ``scrape(usernames) -> summary``.
+
+        Returns when stopped, when idle for ``idle_exit`` seconds, or when
+        ``healthy()`` turns False after a message, so the caller can replace
+        the browser and call ``run`` again.
+        """
+        while not self.stopping:
+            messages = self.queue.receive(self.batch_size, self.wait_seconds, self.visibility_timeout)
+            if not messages:
+                if self.idle_exit and time.monotonic() - self._idle_since >= self.idle_exit:
+                    logger.info(f"No messages for {self.idle_exit:g}s, stopping")
+                    self.stop()
+                continue
+            self._idle_since = time.monotonic()
+            logger.info(f"Received {len(messages)} messages")
+
+            with Heartbeat(self.queue, messages, self.visibility_timeout) as heartbeat:
+                for n, message in enumerate(messages):
+                    if self.stopping:
+                        self.queue.release(messages[n:])
+                        return
+                    self.handle(message, scrape)
+                    heartbeat.done(message)
+                    if healthy is not None and not healthy():
+                        self.queue.release(messages[n + 1:])
+                        return
+
+    def handle(self, message: Message, scrape: Callable[[List[str]], Dict]) -> None:
+        usernames, attempt = decode_body(message.body)
+        if message.receive_count > self.max_attempts:
+            # received again and again but never finished: the worker died on it
+            logger.error(f"Message {message.id} received {message.receive_count} times, dead-lettering")
+            self.queue.dead_letter(message.body, f"received {message.receive_count} times without finishing")
+            self.queue.delete(message)
+            return
+        if not usernames:
+            logger.warning(f"Message {message.id} holds no usernames: {message.body!r}")
+            self.queue.delete(message)
+            return
+
+        error = ""
+        try:
+            failed = scrape(usernames)["failed"]
+        except Exception as e:
+            logger.error(f"Scraping {usernames} failed: {e}")
+            failed, error = usernames, str(e)
+
+        if failed:
+            attempt += 1
+            if attempt >= self.max_attempts:
+                logger.error(f"Giving up on {failed} after {attempt} attempts")
+                self.queue.dead_letter(encode_body(failed, attempt), error or "scrape failed")
+            else:
+                delay = self.retry_delay * 2 ** (attempt - 1)
+                logger.warning(f"Retrying {failed} in {delay}s (attempt {attempt + 1})")
+                self.queue.send([encode_body(failed, attempt)], delay=delay)
+        self.queue.delete(message)
+        self.handled += 1
@@ -0,0 +1,234 @@
+"""
+Event-driven page readiness.
+
+The scraper used to sleep for a fixed number of seconds after every
+navigation. ``PageReadiness`` follows the page over the CDP bridge instead:
+Page lifecycle events and ``Page.loadEventFired``, in-flight requests from
+``Network.requestWillBeSent``/``loadingFinished``/``loadingFailed`` and
+``largest-contentful-paint`` entries from ``PerformanceTimeline``. ``wait``
+returns as soon as a page-specific predicate over that state holds, with a
+timeout as the ceiling, and keeps count of the time saved against the old
+fixed sleeps.
+
+Events are applied on the bridge's event loop thread while ``wait`` polls
+from the scraper's thread, so ``PageState`` is guarded by its ``lock``.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+
+from mycdp import network, page, performance_timeline
+
+logger = logging.getLogger(__name__)
+
+# Requests that stay open by design and never count towards "busy".
+LONG_LIVED_TYPES = {"WebSocket", "EventSource", "Media", "Ping"}
+
+
+class PageState:
+    """What the bridge has seen of the current navigation."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        now = time.monotonic()
+        with self.lock:
+            self.started_at = now
+            self.load_fired = False
+            self.lcp_at: Optional[float] = None
+            self.lifecycle: Set[str] = set()
+            self.in_flight: Dict[str, float] = dict()
+            self.last_activity = now
+
+    def apply(self, event) -> None:
+        """Update the state with one CDP event."""
+        now = time.monotonic()
+        with self.lock:
+            if isinstance(event, network.RequestWillBeSent):
+                if event.type_ is None or event.type_.value not in LONG_LIVED_TYPES:
+                    self.in_flight[event.request_id] = now
+                    self.last_activity = now
+            elif isinstance(event, (network.LoadingFinished, network.LoadingFailed)):
+                if self.in_flight.pop(event.request_id, None) is not None:
+                    self.last_activity = now
+            elif isinstance(event, page.LoadEventFired):
+                self.load_fired = True
+            elif isinstance(event, page.LifecycleEvent):
+                if event.name == "init":
+                    self.lifecycle.clear()
+                self.lifecycle.add(event.name)
+                if event.name == "load":
+                    self.load_fired = True
+            elif isinstance(event, performance_timeline.TimelineEventAdded):
+                if event.event.type_ == "largest-contentful-paint":
+                    self.lcp_at = now
+
+    def network_idle_for(self, stale_after: float) -> float:
+        """Seconds since the last request finished, 0 if one is running."""
+        now = time.monotonic()
+        with self.lock:
+            started = list(self.in_flight.values())
+            last_activity = self.last_activity
+        if any(now - at < stale_after for at in started):
+            return 0.0
+        return now - last_activity
+
+
+class PageReadiness:
+    """
+    Tracks readiness signals for the bridged page.
+
+    :param bridge: A ``CDPBridge`` attached to the driver's window.
+    :param idle_ms: Quiet period that counts as "network idle".
+    :param stale_after: Requests open longer than this (seconds) are
+        ignored, so a long poll cannot keep the page "busy" forever.
+    :param poll_interval: How often ``wait`` re-checks its predicate.
+    """
+
+    def __init__(
+        self,
+        bridge,
+        idle_ms: int = 500,
+        stale_after: float = 5.0,
+        poll_interval: float = 0.05,
+    ):
+        self._bridge = bridge
+        self.idle_ms = idle_ms
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self.state = PageState()
+        self.saved_seconds = 0.0
+        self._stream = None
+        self._task = None
+
+    def start(self) -> "PageReadiness":
+        """Enable the domains and start following events."""
+        self._bridge.run(self._start(), timeout=10)
+        return self
+
+    async def _start(self):
+        session = self._bridge.page
+        self._stream = session.listen(
+            page.LoadEventFired,
+            page.LifecycleEvent,
+            network.RequestWillBeSent,
+            network.LoadingFinished,
+            network.LoadingFailed,
+            performance_timeline.TimelineEventAdded,
+        )
+        self._task = asyncio.ensure_future(self._follow(self._stream))
+        await session.execute(page.enable())
+        await session.execute(page.set_lifecycle_events_enabled(True))
+        await session.execute(network.enable())
+        await session.execute(
+            performance_timeline.enable(["largest-contentful-paint"])
+        )
+
+    async def _follow(self, stream):
+        # a dead follower would leave the stream subscribed; once its queue
+        # fills, dispatch blocks and stalls every command on the bridge
+        try:
+            async for event in stream:
+                try:
+                    self.state.apply(event)
+                except Exception as e:
+                    # e.g. a lazy field holding an enum value the generated types lack
+                    logger.debug(f"Could not apply {type(event).__name__}: {e}")
+        finally:
+            stream.close()
+
+    def reset(self) -> None:
+        """Forget the previous navigation. Call right before navigating."""
+        self.state.reset()
+
+    def network_idle(self, ms: Optional[int] = None) -> Callable[[PageState], bool]:
+        """Predicate: no request has been running for ``ms`` milliseconds."""
+        seconds = (self.idle_ms if ms is None else ms) / 1000
+
+        def ready(state: PageState) -> bool:
+            return state.network_idle_for(self.stale_after) >= seconds
+
+        return ready
+
+    def wait(
+        self,
+        ready: Callable[[PageState], bool],
+        timeout: float,
+        budget: Optional[float] = None,
+        label: str = "page",
+    ) -> float:
+        """
+        Block until ``ready(state)`` holds or ``timeout`` seconds pass.
+
+        ``budget`` is the fixed sleep this wait replaces; the difference is
+        added to ``saved_seconds``. Returns the time spent waiting.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            try:
+                if ready(self.state):
+                    break
+            except Exception as e:
+                logger.debug(f"Readiness check for {label} failed: {e}")
+            if time.monotonic() >= deadline:
+                logger.warning(f"{label} not ready after {timeout}s, continuing")
+                break
+            time.sleep(self.poll_interval)
+        elapsed = time.monotonic() - start
+        if budget is not None:
+            self.saved_seconds += budget - elapsed
+        logger.debug(f"{label} ready after {elapsed:.2f}s")
+        return elapsed
+
+    def take_saved(self) -> float:
+        """Return the time saved since the last call and reset the count."""
+        saved, self.saved_seconds = self.saved_seconds, 0.0
+        return saved
+
+    def stop(self) -> None:
+        """Stop following events."""
+        try:
+            self._bridge.run(self._stop(), timeout=10)
+        except Exception as e:
+            logger.debug(f"Error stopping page readiness: {e}")
+
+    async def _stop(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+
+def all_of(*predicates: Callable[[PageState], bool]) -> Callable[[PageState], bool]:
+    """Predicate that holds when every one of ``predicates`` holds."""
+
+    def ready(state: PageState) -> bool:
+        return all(predicate(state) for predicate in predicates)
+
+    return ready
+
+
+def loaded(state: PageState) -> bool:
+    """Predicate: the load event fired for the current navigation."""
+    return state.load_fired
+
+
+def lcp_seen(state: PageState) -> bool:
+    """Predicate: the largest contentful paint was reported for the current navigation."""
+    return state.lcp_at is not None
+
+
+def element_present(sb, selector: str) -> Callable[[PageState], bool]:
+    """Predicate: ``selector`` is in the DOM (checked through SeleniumBase)."""
+
+    def ready(state: PageState) -> bool:
+        return sb.is_element_present(selector)
+
+    return ready
@@ -0,0 +1,164 @@
+"""
+Snapshot and warm restore of the logged-in browser state.
+
+Restoring a session used to open about.instagram.com, sleep, add every
+cookie with its own WebDriver round trip, then open the home page and
+sleep again, all before the first profile. A ``SessionSnapshot`` holds the
+browser's cookies (``Storage.getCookies``) and the localStorage of the
+Instagram origin (``DOMStorage``). It is stored as versioned,
+gzip-compressed JSON.
+
+``restore`` needs no page at all. It sets every cookie with one
+``Storage.setCookies`` call. localStorage cannot be written through
+DOMStorage until a frame of the origin exists, so it is seeded instead by
+a script registered with ``Page.addScriptToEvaluateOnNewDocument``, which
+runs before the site's own scripts on the first document of the origin.
+A fresh browser is logged in from its first navigation on.
+"""
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from mycdp import dom_storage, network, page, storage
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+ORIGINS = ("https://www.instagram.com",)
+
+# Cookie fields Storage.setCookies does not take back
+NOT_SETTABLE = ("size", "session", "sameParty", "partitionKeyOpaque")
+
+SEED_SCRIPT = """(() => {
+    if (location.origin !== %s) return;
+    try {
+        for (const [key, value] of %s) {
+            if (localStorage.getItem(key) === null) localStorage.setItem(key, value);
+        }
+    } catch (e) {}
+})();"""
+
+
+@dataclass
+class SessionSnapshot:
+    """Cookies (CDP ``Cookie`` JSON) and localStorage items per origin."""
+    cookies: List[Dict]
+    local_storage: Dict[str, List[List[str]]] = field(default_factory=dict)
+    saved_at: float = 0.0
+    version: int = SNAPSHOT_VERSION
+
+    def live_cookies(self, now: Optional[float] = None) -> List[Dict]:
+        """Cookies that have not expired yet (session cookies included)."""
+        now = now or time.time()
+        return [
+            cookie for cookie in self.cookies
+            if cookie.get("session") or cookie.get("expires", -1) <= 0 or cookie["expires"] > now
+        ]
+
+    def has_cookie(self, name: str) -> bool:
+        return any(cookie["name"] == name for cookie in self.live_cookies())
+
+
+def cdp_executor(sb, bridge=None) -> Callable:
+    """
+    Run mycdp commands on the bridge, or through ``execute_cdp_cmd`` of the
+    WebDriver when there is no bridge.
+    """
+    if bridge is not None:
+        return bridge.execute
+
+    def execute(cmd):
+        request = next(cmd)
+        response = sb.driver.execute_cdp_cmd(request["method"], request.get("params", {}))
+        try:
+            cmd.send(response)
+        except StopIteration as e:
+            return e.value
+
+    return execute
+
+
+def capture(execute: Callable, origins=ORIGINS) -> SessionSnapshot:
+    """Snapshot the cookies and the localStorage of ``origins``."""
+    cookies = [cookie.to_json() for cookie in execute(storage.get_cookies())]
+    local_storage = dict()
+    execute(dom_storage.enable())
+    try:
+        for origin in origins:
+            storage_id = dom_storage.StorageId(is_local_storage=True, security_origin=origin)
+            try:
+                items = execute(dom_storage.get_dom_storage_items(storage_id))
+            except Exception as e:
+                # no frame of the origin loaded yet
+                logger.debug(f"No localStorage for {origin}: {e}")
+                continue
+            local_storage[origin] = [list(item) for item in items]
+    finally:
+        execute(dom_storage.disable())
+    return SessionSnapshot(cookies=cookies, local_storage=local_storage, saved_at=time.time())
+
+
+def cookie_param(cookie: Dict) -> network.CookieParam:
+    cookie = {key: value for key, value in cookie.items() if key not in NOT_SETTABLE}
+    if cookie.get("expires", -1) <= 0:
+        # session cookie
+        cookie.pop("expires", None)
+    return network.CookieParam.from_json(cookie)
+
+
+def restore(execute: Callable, snapshot: SessionSnapshot) -> int:
+    """Load ``snapshot`` into the browser before any navigation; returns cookies set."""
+    cookies = [cookie_param(cookie) for cookie in snapshot.live_cookies()]
+    execute(storage.set_cookies(cookies))
+    for origin, items in snapshot.local_storage.items():
+        if items:
+            # only fills keys the page does not have, so it is harmless on later documents
+            source = SEED_SCRIPT % (json.dumps(origin), json.dumps(items))
+            execute(page.add_script_to_evaluate_on_new_document(source))
+    return len(cookies)
+
+
+def from_webdriver_cookies(cookies: List[Dict]) -> SessionSnapshot:
+    """Wrap WebDriver ``get_cookies()`` output (the old cookies.json) as a snapshot."""
+    converted = []
+    for cookie in cookies:
+        cookie = dict(cookie)
+        if "expiry" in cookie:
+            cookie["expires"] = cookie.pop("expiry")
+        else:
+            cookie["session"] = True
+        converted.append(cookie)
+    return SessionSnapshot(cookies=converted)
+
+
+def save(snapshot: SessionSnapshot, path) -> None:
+    """Write ``snapshot`` atomically, so concurrent readers never see half a file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(asdict(snapshot), f)
+    os.replace(tmp, path)
+    logger.info(f"Saved session snapshot ({len(snapshot.cookies)} cookies) to {path}")
+
+
+def load(path) -> Optional[SessionSnapshot]:
+    """Read a snapshot; None if it is missing, unreadable or another version."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read session snapshot {path}: {e}")
+        return None
+    if data.get("version") != SNAPSHOT_VERSION:
+        logger.warning(f"Ignoring session snapshot {path} of version {data.get('version')}")
+        return None
+    return SessionSnapshot(**data)
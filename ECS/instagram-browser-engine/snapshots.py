@@ -0,0 +1,247 @@
+"""
+Follower snapshot history stored as deltas.
+
+Re-scraping an account every day produces almost the same follower set
+each time. ``SnapshotHistory`` keeps a full copy (a keyframe) only every
+``keyframe_every`` scrapes. Every other scrape stores just the follower
+ids gained and lost since the previous one, found with a merge over the
+two sorted id arrays. Any historical snapshot is rebuilt on demand from
+the nearest keyframe before it plus the deltas after that keyframe.
+
+Id arrays are stored sorted, as zlib-compressed int64 gaps, in a
+``snapshots`` table that lives next to the users/edges tables:
+
+    snapshots (target_pk, scrape_date, kind, size, gained, lost)
+"""
+import logging
+import operator
+import sqlite3
+import zlib
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Iterable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    target_pk INTEGER NOT NULL,
+    scrape_date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    gained BLOB NOT NULL,
+    lost BLOB NOT NULL,
+    PRIMARY KEY (target_pk, scrape_date)
+) WITHOUT ROWID;
+"""
+
+KEYFRAME = "key"
+DELTA = "delta"
+
+
+def sorted_ids(ids: Iterable) -> array:
+    """Unique int64 ids in ascending order."""
+    return array("q", sorted({int(i) for i in ids}))
+
+
+def diff_sorted(old: Sequence[int], new: Sequence[int]) -> Tuple[array, array]:
+    """Return ``(gained, lost)`` between two ascending id arrays."""
+    gained, lost = array("q"), array("q")
+    i = j = 0
+    len_old, len_new = len(old), len(new)
+    while i < len_old and j < len_new:
+        a, b = old[i], new[j]
+        if a == b:
+            i += 1
+            j += 1
+        elif a < b:
+            lost.append(a)
+            i += 1
+        else:
+            gained.append(b)
+            j += 1
+    lost.extend(old[i:])
+    gained.extend(new[j:])
+    return gained, lost
+
+
+def apply_net(base: Sequence[int], present: dict) -> array:
+    """
+    Apply a net change (id -> still present?) to an ascending id array.
+
+    Deltas since a keyframe are folded into one such change, so rebuilding a
+    snapshot is one filtering pass over the keyframe plus a sort of an
+    almost sorted list, however many deltas follow it.
+    """
+    out = [i for i in base if present.get(i, True)]
+    for i, keep in present.items():
+        if keep:
+            n = bisect_left(base, i)
+            if n == len(base) or base[n] != i:
+                out.append(i)
+    out.sort()
+    return array("q", out)
+
+
+def pack(ids: Sequence[int]) -> bytes:
+    """Compress an ascending id array (gaps compress far better than ids)."""
+    if not ids:
+        return b""
+    gaps = array("q", ids[:1])
+    gaps.extend(map(operator.sub, ids[1:], ids))
+    return zlib.compress(gaps.tobytes(), 6)
+
+
+def unpack(blob: bytes) -> array:
+    gaps = array("q")
+    if blob:
+        gaps.frombytes(zlib.decompress(blob))
+    return array("q", accumulate(gaps))
+
+
+class SnapshotHistory:
+    """
+    Keyframes plus deltas of each target's follower id set.
+
+    :param conn: SQLite connection the ``snapshots`` table lives in.
+    :param keyframe_every: Scrapes between full keyframes.
+    :param keyframe_ratio: Also write a keyframe when a delta would change
+        more than this fraction of the previous snapshot.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        keyframe_every: int = 30,
+        keyframe_ratio: float = 0.5,
+    ):
+        self.conn = conn
+        self.keyframe_every = keyframe_every
+        self.keyframe_ratio = keyframe_ratio
+        self.conn.executescript(SCHEMA)
+        # target_pk -> (scrape_date, ids) of the newest snapshot
+        self._latest = dict()
+
+    def dates(self, target_pk) -> list:
+        return [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT scrape_date FROM snapshots WHERE target_pk = ? ORDER BY scrape_date",
+                (int(target_pk),),
+            )
+        ]
+
+    def latest(self, target_pk) -> Tuple[Optional[str], array]:
+        """``(scrape_date, ids)`` of the newest snapshot, ``(None, [])`` if none."""
+        target_pk = int(target_pk)
+        if target_pk not in self._latest:
+            row = self.conn.execute(
+                "SELECT max(scrape_date) FROM snapshots WHERE target_pk = ?", (target_pk,)
+            ).fetchone()
+            if row[0] is None:
+                return None, array("q")
+            self._latest[target_pk] = (row[0], self.snapshot(target_pk, row[0]))
+        return self._latest[target_pk]
+
+    def rekey(self, old_pk, new_pk) -> None:
+        """
+        Move the history of ``old_pk`` to ``new_pk``; a date both have keeps
+        the ``new_pk`` snapshot. Runs in the caller's transaction.
+        """
+        old_pk, new_pk = int(old_pk), int(new_pk)
+        self.conn.execute(
+            "UPDATE OR IGNORE snapshots SET target_pk = ? WHERE target_pk = ?", (new_pk, old_pk)
+        )
+        self.conn.execute("DELETE FROM snapshots WHERE target_pk = ?", (old_pk,))
+        self._latest.pop(old_pk, None)
+        self._latest.pop(new_pk, None)
+
+    def snapshot(self, target_pk, scrape_date: Optional[str] = None) -> array:
+        """
+        Follower ids as of ``scrape_date``: the newest snapshot on or before
+        that date (the latest one if no date is given).
+        """
+        target_pk = int(target_pk)
+        scrape_date = scrape_date or "9999-12-31"
+        key = self.conn.execute(
+            "SELECT scrape_date, gained FROM snapshots "
+            "WHERE target_pk = ? AND kind = ? AND scrape_date <= ? "
+            "ORDER BY scrape_date DESC LIMIT 1",
+            (target_pk, KEYFRAME, scrape_date),
+        ).fetchone()
+        if key is None:
+            return array("q")
+        # fold the deltas into one net change first, then touch the keyframe once
+        present = dict()
+        for gained, lost in self.conn.execute(
+            "SELECT gained, lost FROM snapshots "
+            "WHERE target_pk = ? AND scrape_date > ? AND scrape_date <= ? "
+            "ORDER BY scrape_date",
+            (target_pk, key[0], scrape_date),
+        ):
+            present.update(dict.fromkeys(unpack(gained), True))
+            present.update(dict.fromkeys(unpack(lost), False))
+        ids = unpack(key[1])
+        if not present:
+            return ids
+        return apply_net(ids, present)
+
+    def changes(self, target_pk, scrape_date: str) -> Tuple[array, array]:
+        """``(gained, lost)`` on ``scrape_date`` relative to the scrape before."""
+        row = self.conn.execute(
+            "SELECT kind, gained, lost FROM snapshots WHERE target_pk = ? AND scrape_date = ?",
+            (int(target_pk), scrape_date),
+        ).fetchone()
+        if row is None:
+            return array("q"), array("q")
+        if row[0] == DELTA:
+            return unpack(row[1]), unpack(row[2])
+        previous = self.conn.execute(
+            "SELECT max(scrape_date) FROM snapshots WHERE target_pk = ? AND scrape_date < ?",
+            (int(target_pk), scrape_date),
+        ).fetchone()[0]
+        before = self.snapshot(target_pk, previous) if previous else array("q")
+        return diff_sorted(before, unpack(row[1]))
+
+    def record(self, target_pk, scrape_date: str, follower_pks: Iterable) -> Optional[Tuple[int, int]]:
+        """
+        Store the snapshot of ``scrape_date``; returns ``(gained, lost)``
+        counts, or None if the date is older than the latest snapshot.
+
+        Recording the latest date again replaces it.
+        """
+        target_pk = int(target_pk)
+        ids = sorted_ids(follower_pks)
+        previous_date, previous = self.latest(target_pk)
+        if previous_date is not None and scrape_date < previous_date:
+            logger.warning(
+                f"Snapshot of {target_pk} on {scrape_date} is older than {previous_date}, not recorded"
+            )
+            return None
+        with self.conn:
+            if previous_date == scrape_date:
+                self.conn.execute(
+                    "DELETE FROM snapshots WHERE target_pk = ? AND scrape_date = ?",
+                    (target_pk, scrape_date),
+                )
+                self._latest.pop(target_pk, None)
+                previous_date, previous = self.latest(target_pk)
+            gained, lost = diff_sorted(previous, ids)
+            since_key = self.conn.execute(
+                "SELECT count(*) FROM snapshots WHERE target_pk = ? AND scrape_date > coalesce("
+                "(SELECT max(scrape_date) FROM snapshots WHERE target_pk = ? AND kind = ?), '')",
+                (target_pk, target_pk, KEYFRAME),
+            ).fetchone()[0]
+            keyframe = (
+                previous_date is None
+                or since_key + 1 >= self.keyframe_every
+                or len(gained) + len(lost) > self.keyframe_ratio * max(len(previous), 1)
+            )
+            if keyframe:
+                row = (target_pk, scrape_date, KEYFRAME, len(ids), pack(ids), b"")
+            else:
+                row = (target_pk, scrape_date, DELTA, len(ids), pack(gained), pack(lost))
+            self.conn.execute("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?)", row)
+        self._latest[target_pk] = (scrape_date, ids)
+        return len(gained), len(lost)
@@ -0,0 +1,87 @@
+"""
+enqueue() input formats, deduplication and the persisted seen-set.
+"""
+import json
+
+import pytest
+
+from enqueue import SeenSet, enqueue
+from work_queue import SQLiteQueue, decode_body
+
+
+class RejectingQueue:
+    """Accepts nothing, like a queue that is down."""
+
+    def send(self, bodies, delay=0):
+        return 0
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteQueue(tmp_path / "queue.db")
+    yield queue
+    queue.close()
+
+
+@pytest.fixture
+def seen(tmp_path):
+    seen = SeenSet(tmp_path / "enqueued.sqlite")
+    yield seen
+    seen.close()
+
+
+def write(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def queued(queue):
+    return [decode_body(message.body)[0] for message in queue.receive(10, 0)]
+
+
+def test_usernames_are_normalized_and_deduplicated(tmp_path, queue):
+    jsonl = write(tmp_path / "a.jsonl", [
+        json.dumps("Alice"),
+        json.dumps({"username": "@bob"}),
+        json.dumps({"usernames": ["alice", "carol"]}),
+        "dave",
+        "not a username!",
+    ])
+    csv = write(tmp_path / "b.csv", ["id,username", "1,BOB", "2,erin"])
+    counts = enqueue([jsonl, csv], queue, per_message=2)
+    assert queued(queue) == [["alice", "bob"], ["carol", "dave"], ["erin"]]
+    assert counts["read"] == 8
+    assert counts["duplicate"] == 2
+    assert counts["invalid"] == 1
+    assert (counts["enqueued"], counts["messages"]) == (5, 3)
+
+
+def test_recently_enqueued_usernames_are_skipped(tmp_path, queue, seen):
+    path = write(tmp_path / "a.txt", ["alice", "bob"])
+    enqueue([path], queue, seen=seen)
+    path = write(tmp_path / "b.txt", ["bob", "carol"])
+    counts = enqueue([path], queue, seen=seen)
+    assert counts["recently_enqueued"] == 1
+    assert queued(queue) == [["alice", "bob"], ["carol"]]
+
+
+def test_a_zero_window_enqueues_again(tmp_path, queue, seen):
+    path = write(tmp_path / "a.txt", ["alice"])
+    enqueue([path], queue, seen=seen)
+    counts = enqueue([path], queue, seen=seen, window_days=0)
+    assert counts["enqueued"] == 1
+
+
+def test_recently_scraped_usernames_are_skipped(tmp_path, queue):
+    path = write(tmp_path / "a.txt", ["alice", "bob"])
+    counts = enqueue([path], queue, scraped=["Alice"])
+    assert counts["recently_scraped"] == 1
+    assert queued(queue) == [["bob"]]
+
+
+def test_rejected_sends_are_not_marked_seen(tmp_path, queue, seen):
+    path = write(tmp_path / "a.txt", ["alice"])
+    counts = enqueue([path], RejectingQueue(), seen=seen)
+    assert counts["enqueued"] == 0
+    counts = enqueue([path], queue, seen=seen)
+    assert counts["enqueued"] == 1
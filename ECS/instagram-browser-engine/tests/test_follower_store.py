@@ -0,0 +1,76 @@
+"""
+FollowerStore edges and snapshot history across repeated scrapes.
+"""
+import json
+
+import pytest
+
+from follower_store import FollowerStore
+from migrate_data import load_json
+
+
+def users(*pks):
+    return [{"pk": str(pk), "username": f"user{pk}"} for pk in pks]
+
+
+@pytest.fixture
+def store():
+    with FollowerStore(":memory:") as store:
+        store.add_target(1, "target")
+        yield store
+
+
+def scrape(store, scrape_date, pks, complete=True):
+    if complete:
+        store.start_scrape(1, scrape_date)
+    store.ingest_page(1, scrape_date, users(*pks))
+    return store.finish_scrape(1, scrape_date, complete=complete)
+
+
+def test_complete_scrape_replaces_older_dates(store):
+    scrape(store, "2025-02-13", [10, 11, 12])
+    assert scrape(store, "2025-02-14", [11, 12, 13]) == (1, 1)
+    assert store.followers(1) == [11, 12, 13]
+    assert store.followers(1, "2025-02-13") == [10, 11, 12]
+
+
+def test_second_complete_scrape_on_the_same_day_replaces_the_first(store):
+    scrape(store, "2025-02-14", [10, 11, 12])
+    assert scrape(store, "2025-02-14", [10, 11]) == (2, 0)
+    assert store.followers(1) == [10, 11]
+    assert store.followers(1, "2025-02-14") == [10, 11]
+
+
+def test_same_day_rescrape_is_diffed_against_the_previous_day(store):
+    scrape(store, "2025-02-13", [10, 11, 12])
+    scrape(store, "2025-02-14", [10, 11, 12, 13])
+    assert scrape(store, "2025-02-14", [10, 13]) == (1, 2)
+    assert store.followers(1) == [10, 13]
+
+
+def test_incremental_scrape_adds_to_the_previous_set(store):
+    scrape(store, "2025-02-13", [10, 11])
+    assert scrape(store, "2025-02-14", [12], complete=False) == (1, 0)
+    assert store.followers(1) == [10, 11, 12]
+
+
+def test_history_migrated_without_a_user_id_moves_to_the_real_pk(tmp_path):
+    legacy = tmp_path / "target_followers.json"
+    legacy.write_text(json.dumps({
+        "username": "target",
+        "scrape_date": "2025-02-13",
+        "followers": users(10, 11, 12),
+    }))
+    with FollowerStore(":memory:") as store:
+        load_json(legacy, store)
+        provisional = store.pk_for("target")
+        assert provisional < 0
+
+        assert store.add_target(1, "target") == 1
+        assert list(store.known_followers(1, "2025-02-14", 7)) == [10, 11, 12]
+        store.start_scrape(1, "2025-02-14")
+        store.ingest_page(1, "2025-02-14", users(11, 12, 13))
+        assert store.finish_scrape(1, "2025-02-14") == (1, 1)
+        assert store.followers(1, "2025-02-13") == [10, 11, 12]
+        assert store.followers(1) == [11, 12, 13]
+        assert store.history.dates(provisional) == []
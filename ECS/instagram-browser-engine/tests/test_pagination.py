@@ -0,0 +1,114 @@
+"""
+FollowerPaginator cookie handling and re-login, with canned API responses.
+"""
+import json
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from pagination import FOLLOWERS_URL, FollowerPaginator, LoginRequired  # noqa: E402
+
+LOGIN_URL = "https://www.instagram.com/accounts/login/?next=/api/v1/"
+
+
+class FakeDriver:
+    def __init__(self, browser):
+        self.browser = browser
+
+    def execute_cdp_cmd(self, method, params):
+        return {"cookies": [{"name": "csrftoken", "value": self.browser.csrftoken}]}
+
+
+class FakeBrowser:
+    """Stands in for the SeleniumBase ``sb`` the cookies come from."""
+
+    def __init__(self):
+        self.csrftoken = "before"
+        self.driver = FakeDriver(self)
+
+
+def response(status=200, body=None, url=None):
+    r = requests.Response()
+    r.status_code = status
+    r._content = json.dumps(body or {}).encode()
+    r.url = url or FOLLOWERS_URL.format(user_id="1")
+    return r
+
+
+@pytest.fixture
+def browser():
+    return FakeBrowser()
+
+
+def paginator_for(browser, responses, **kwargs):
+    paginator = FollowerPaginator(browser, "target", delay=0, **kwargs)
+    sent = []
+
+    def get(url, params=None, timeout=None):
+        sent.append(paginator.session.headers["X-CSRFToken"])
+        return responses.pop(0)
+
+    paginator.session.get = get
+    return paginator, sent
+
+
+PAGE = {"users": [{"pk": "10"}], "status": "ok"}
+
+
+@pytest.mark.parametrize(
+    "logged_out",
+    [response(401), response(200, {"message": "login"}, url=LOGIN_URL)],
+    ids=["401", "login redirect"],
+)
+def test_logged_out_page_is_retried_after_logging_in(browser, logged_out):
+    def relogin():
+        browser.csrftoken = "after"
+
+    paginator, sent = paginator_for(
+        browser, [logged_out, response(200, PAGE)], relogin=relogin
+    )
+    assert paginator.fetch_page("1") == PAGE
+    # the retry carries the cookies of the new login
+    assert sent == ["before", "after"]
+    assert paginator.stats()["relogins"] == 1
+
+
+def test_logged_out_without_relogin_raises(browser):
+    paginator, _ = paginator_for(browser, [response(401)])
+    with pytest.raises(LoginRequired):
+        paginator.fetch_page("1")
+
+
+def test_logged_out_after_logging_in_raises(browser):
+    paginator, _ = paginator_for(
+        browser, [response(401), response(401)], relogin=lambda: None
+    )
+    with pytest.raises(LoginRequired):
+        paginator.fetch_page("1")
+
+
+def test_csrf_rejection_resyncs_cookies_without_logging_in(browser):
+    def relogin():
+        raise AssertionError("not a login problem")
+
+    paginator, sent = paginator_for(
+        browser,
+        [response(403, {"message": "CSRF token missing"}), response(200, PAGE)],
+        relogin=relogin,
+    )
+    browser.csrftoken = "rotated"
+    assert paginator.fetch_page("1") == PAGE
+    assert sent == ["before", "rotated"]
+
+
+def test_followers_count_comes_from_the_profile_api(browser):
+    profile = {"data": {"user": {"edge_followed_by": {"count": 1234}}}}
+    paginator, _ = paginator_for(browser, [response(200, profile)])
+    assert paginator.followers_count("target") == 1234
+
+
+def test_followers_count_is_none_when_the_profile_api_fails(browser):
+    paginator, _ = paginator_for(browser, [response(429), response(200, {})])
+    assert paginator.followers_count("target") is None
+    assert paginator.followers_count("target") is None
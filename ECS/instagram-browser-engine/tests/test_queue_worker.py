@@ -0,0 +1,137 @@
+"""
+QueueWorker retries, dead-lettering and receive counts on an SQLiteQueue.
+"""
+import time
+
+import pytest
+
+from queue_worker import QueueWorker
+from worker_pool import scrape_each
+from work_queue import SQLiteQueue, decode_body, encode_body
+
+
+class Crash(BaseException):
+    """Stands in for the worker process dying mid-scrape."""
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteQueue(tmp_path / "queue.db", poll_interval=0.01)
+    yield queue
+    queue.close()
+
+
+def worker_for(queue, **kwargs):
+    kwargs.setdefault("wait_seconds", 0)
+    kwargs.setdefault("idle_exit", 0.05)
+    kwargs.setdefault("retry_delay", 0)
+    return QueueWorker(queue, **kwargs)
+
+
+def summary(failed=()):
+    return {"failed": list(failed)}
+
+
+def bodies_left(queue):
+    return [decode_body(message.body)[0] for message in queue.receive(10, 0)]
+
+
+def dead_letters(queue):
+    rows = queue.conn.execute(
+        "SELECT body, error FROM messages WHERE queue = ?", (queue.dlq_name,)
+    ).fetchall()
+    return [(decode_body(body), error) for body, error in rows]
+
+
+def test_scraped_messages_are_deleted(queue):
+    queue.send([encode_body(["a", "b"]), encode_body(["c"])])
+    scraped = []
+    worker = worker_for(queue)
+    worker.run(lambda usernames: scraped.append(usernames) or summary())
+    assert scraped == [["a", "b"], ["c"]]
+    assert worker.handled == 2
+    assert queue.depth() == 0
+
+
+def test_failed_usernames_are_retried_then_dead_lettered(queue):
+    queue.send([encode_body(["a", "b"])])
+    scraped = []
+
+    def scrape(usernames):
+        scraped.append(usernames)
+        return summary(failed=["b"])
+
+    worker_for(queue, max_attempts=3).run(scrape)
+    assert scraped == [["a", "b"], ["b"], ["b"]]
+    assert queue.depth() == 0
+    assert dead_letters(queue) == [((["b"], 3), "scrape failed")]
+
+
+def test_scrape_errors_are_retried_with_the_error_kept(queue):
+    queue.send([encode_body(["a"])])
+
+    def scrape(usernames):
+        raise RuntimeError("browser gone")
+
+    worker_for(queue, max_attempts=2).run(scrape)
+    assert dead_letters(queue) == [((["a"], 2), "browser gone")]
+
+
+def test_a_message_that_keeps_coming_back_is_dead_lettered(queue):
+    queue.send([encode_body(["a"])])
+    for _ in range(3):
+        queue.release(queue.receive(1, 0))
+    scraped = []
+    worker_for(queue, max_attempts=3).run(
+        lambda usernames: scraped.append(usernames) or summary()
+    )
+    assert scraped == []
+    ((body, error),) = dead_letters(queue)
+    assert body == (["a"], 0)
+    assert error == "received 4 times without finishing"
+
+
+def test_a_crash_only_counts_against_the_message_in_progress(queue):
+    queue.send([encode_body([name]) for name in "abc"])
+
+    def scrape(usernames):
+        raise Crash()
+
+    with pytest.raises(Crash):
+        worker_for(queue, visibility_timeout=0.1).run(scrape)
+    time.sleep(0.15)
+    counts = {
+        decode_body(message.body)[0][0]: message.receive_count
+        for message in queue.receive(10, 0)
+    }
+    assert counts == {"a": 2, "b": 1, "c": 1}
+
+
+def test_unhealthy_browser_hands_back_the_rest_of_the_batch(queue):
+    queue.send([encode_body([name]) for name in "abc"])
+    scraped = []
+    worker = worker_for(queue, batch_size=3)
+    worker.run(
+        lambda usernames: scraped.append(usernames) or summary(),
+        healthy=lambda: False,
+    )
+    assert scraped == [["a"]]
+    assert bodies_left(queue) == [["b"], ["c"]]
+
+
+def test_a_walk_that_fails_after_the_user_id_is_retried(queue):
+    queue.send([encode_body(["a", "b"])])
+    walks = []
+
+    def scrape_one(account):
+        # get_user_information's result when pagination raised mid-walk
+        walks.append(account)
+        result = {"username": account, "user_id": "1", "followers": []}
+        if account == "b" and walks.count("b") == 1:
+            result["error"] = "429 Client Error: Too Many Requests"
+        return result
+
+    worker_for(queue).run(lambda usernames: scrape_each(usernames, scrape_one))
+    assert walks == ["a", "b", "b"]
+    assert queue.depth() == 0
+    assert dead_letters(queue) == []
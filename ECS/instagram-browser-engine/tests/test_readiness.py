@@ -0,0 +1,45 @@
+"""
+PageReadiness keeps following events that fail to apply.
+"""
+import asyncio
+
+from mycdp import util
+from readiness import PageReadiness
+
+
+class FakeStream:
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.events:
+            raise StopAsyncIteration
+        return self.events.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+def request_sent(request_id, resource_type):
+    return util.parse_json_event(
+        {
+            "method": "Network.requestWillBeSent",
+            "params": {"requestId": request_id, "type": resource_type},
+        },
+        lazy=True,
+    )
+
+
+def test_an_event_that_fails_to_apply_does_not_stop_the_follower():
+    readiness = PageReadiness(bridge=None)
+    stream = FakeStream([
+        request_sent("1", "NotAResourceType"),
+        request_sent("2", "Document"),
+    ])
+    asyncio.run(readiness._follow(stream))
+    assert list(readiness.state.in_flight) == ["2"]
+    assert stream.closed
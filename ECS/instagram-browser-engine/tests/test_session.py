@@ -0,0 +1,237 @@
+"""
+CDPSession and TargetMultiplexer against a fake browser on a local websocket.
+
+The fake answers the handful of Target commands the multiplexer uses and
+``Runtime.evaluate``, whose expression drives it: ``sleep:<ms>:<value>``
+replies after a delay, ``throw`` replies with a CDP error, ``hang`` never
+replies and ``event`` emits a ``Network.dataReceived`` first.
+"""
+import asyncio
+import itertools
+import json
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from mycdp import network, runtime, target  # noqa: E402
+from mycdp.session import CDPError, CDPSession, TargetMultiplexer  # noqa: E402
+
+
+def data_received(request_id):
+    return {
+        "method": "Network.dataReceived",
+        "params": {
+            "requestId": request_id,
+            "timestamp": 1.0,
+            "dataLength": 1,
+            "encodedDataLength": 1,
+        },
+    }
+
+
+class FakeBrowser:
+    """A minimal CDP endpoint; ``url`` is valid inside ``async with``."""
+
+    def __init__(self):
+        self.targets = itertools.count(1)
+        self.server = None
+        self.url = None
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = next(iter(self.server.sockets)).getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/devtools/browser/fake"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handler(self, websocket, *args):
+        async for raw in websocket:
+            asyncio.ensure_future(self.answer(websocket, json.loads(raw)))
+
+    async def answer(self, websocket, message):
+        session_id = message.get("sessionId")
+
+        async def send(frame):
+            if session_id is not None:
+                frame["sessionId"] = session_id
+            await websocket.send(json.dumps(frame))
+
+        method, params = message["method"], message.get("params", {})
+        result = {}
+        if method == "Target.createTarget":
+            result = {"targetId": f"target-{next(self.targets)}"}
+        elif method == "Target.attachToTarget":
+            result = {"sessionId": f"session-{params['targetId']}"}
+        elif method == "Target.closeTarget":
+            result = {"success": True}
+        elif method == "Target.detachFromTarget":
+            detached = params["sessionId"]
+            await websocket.send(json.dumps({
+                "method": "Target.detachedFromTarget",
+                "params": {"sessionId": detached},
+            }))
+        elif method == "Runtime.evaluate":
+            expression = params["expression"]
+            if expression == "hang":
+                return
+            if expression == "throw":
+                error = {"code": -32000, "message": "boom", "data": "details"}
+                return await send({"id": message["id"], "error": error})
+            if expression == "event":
+                await send(data_received(str(message["id"])))
+            if expression.startswith("sleep:"):
+                _, delay, expression = expression.split(":", 2)
+                await asyncio.sleep(int(delay) / 1000)
+            value = f"{session_id}:{expression}" if session_id else expression
+            result = {"result": {"type": "string", "value": value}}
+        await send({"id": message["id"], "result": result})
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 10))
+
+
+async def evaluate(session, expression):
+    remote, _ = await session.execute(runtime.evaluate(expression))
+    return remote.value
+
+
+def test_pipelined_commands_are_matched_by_id():
+    async def scenario():
+        async with FakeBrowser() as browser:
+            async with await CDPSession.connect(browser.url) as session:
+                # the slowest command is sent first, so replies come back
+                # in the reverse order
+                expressions = [f"sleep:{50 - 10 * n}:{n}" for n in range(5)]
+                return await asyncio.gather(
+                    *(evaluate(session, e) for e in expressions)
+                )
+
+    assert run(scenario()) == ["0", "1", "2", "3", "4"]
+
+
+def test_max_in_flight_limits_pending_commands():
+    async def scenario():
+        async with FakeBrowser() as browser:
+            session = await CDPSession.connect(browser.url, max_in_flight=2)
+            async with session:
+                tasks = [
+                    asyncio.ensure_future(evaluate(session, "sleep:50:x"))
+                    for _ in range(5)
+                ]
+                await asyncio.sleep(0.02)
+                in_flight = len(session._pending)
+                await asyncio.gather(*tasks)
+                return in_flight
+
+    assert run(scenario()) == 2
+
+
+def test_cdp_error_is_raised_and_session_keeps_working():
+    async def scenario():
+        async with FakeBrowser() as browser:
+            async with await CDPSession.connect(browser.url) as session:
+                with pytest.raises(CDPError) as info:
+                    await evaluate(session, "throw")
+                return info.value, await evaluate(session, "after")
+
+    error, after = run(scenario())
+    assert (error.code, error.message) == (-32000, "boom")
+    assert error.data == "details"
+    assert after == "after"
+
+
+def test_events_go_to_listeners_of_their_method():
+    async def scenario():
+        async with FakeBrowser() as browser:
+            async with await CDPSession.connect(browser.url) as session:
+                stream = session.listen(network.DataReceived)
+                other = session.listen(network.ResponseReceived)
+                await evaluate(session, "event")
+                event = await asyncio.wait_for(stream.__anext__(), 1)
+                stream.close()
+                await evaluate(session, "event")
+                return event, other._queue.qsize(), session.subscriptions
+
+    event, other_queued, subscriptions = run(scenario())
+    assert isinstance(event, network.DataReceived)
+    assert other_queued == 0
+    # closing the only stream of a method stops decoding it
+    assert subscriptions.stats()["Network.dataReceived"] == {
+        "parsed": 1,
+        "skipped": 1,
+    }
+
+
+def test_multiplexer_routes_commands_and_events_by_session():
+    async def scenario():
+        async with FakeBrowser() as browser:
+            async with await CDPSession.connect(browser.url) as session:
+                async with TargetMultiplexer(session) as mux:
+                    first, second = await mux.open(), await mux.open()
+                    first_events = first.listen(network.DataReceived)
+                    second_events = second.listen(network.DataReceived)
+                    values = await asyncio.gather(
+                        evaluate(first, "sleep:30:a"),
+                        evaluate(second, "sleep:10:b"),
+                        evaluate(first, "c"),
+                    )
+                    await evaluate(second, "event")
+                    event = await asyncio.wait_for(
+                        second_events.__anext__(), 1
+                    )
+                    return (
+                        values,
+                        first.session_id,
+                        second.session_id,
+                        first_events._queue.qsize(),
+                        event,
+                    )
+
+    values, first_id, second_id, first_queued, event = run(scenario())
+    assert first_id != second_id
+    assert values == [f"{first_id}:a", f"{second_id}:b", f"{first_id}:c"]
+    assert first_queued == 0
+    assert isinstance(event, network.DataReceived)
+
+
+def test_detach_fails_pending_commands_of_that_target_only():
+    async def scenario():
+        async with FakeBrowser() as browser:
+            async with await CDPSession.connect(browser.url) as session:
+                mux = TargetMultiplexer(session)
+                doomed, survivor = await mux.open(), await mux.open()
+                stream = doomed.listen(network.DataReceived)
+                pending = asyncio.ensure_future(evaluate(doomed, "hang"))
+                await asyncio.sleep(0.02)
+                await session.execute(
+                    target.detach_from_target(session_id=doomed.session_id)
+                )
+                with pytest.raises(ConnectionError):
+                    await pending
+                ended = [event async for event in stream]
+                return doomed.closed, ended, await evaluate(survivor, "ok")
+
+    closed, ended, survivor = run(scenario())
+    assert closed
+    assert ended == []
+    assert survivor.endswith(":ok")
+
+
+def test_closing_the_connection_fails_pending_commands():
+    async def scenario():
+        async with FakeBrowser() as browser:
+            session = await CDPSession.connect(browser.url)
+            pending = asyncio.ensure_future(evaluate(session, "hang"))
+            await asyncio.sleep(0.02)
+            await session.close()
+            with pytest.raises(ConnectionError):
+                await pending
+            with pytest.raises(ConnectionError):
+                await evaluate(session, "late")
+
+    run(scenario())
@@ -0,0 +1,71 @@
+"""
+SQLiteQueue visibility timeouts, receive counts and dead-letter queue.
+"""
+import time
+
+import pytest
+
+from work_queue import SQLiteQueue, decode_body, encode_body
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteQueue(tmp_path / "queue.db", poll_interval=0.01)
+    yield queue
+    queue.close()
+
+
+def bodies(messages):
+    return [decode_body(message.body)[0] for message in messages]
+
+
+def test_received_messages_are_hidden_until_the_timeout(queue):
+    queue.send([encode_body(["a"]), encode_body(["b"])])
+    first = queue.receive(1, 0, visibility_timeout=0.2)
+    second = queue.receive(10, 0, visibility_timeout=0.2)
+    assert bodies(first) == [["a"]]
+    assert bodies(second) == [["b"]]
+    assert queue.receive(10, 0) == []
+    time.sleep(0.25)
+    assert bodies(queue.receive(10, 0)) == [["a"], ["b"]]
+
+
+def test_receive_count_rises_with_every_delivery(queue):
+    queue.send([encode_body(["a"])])
+    counts = []
+    for _ in range(3):
+        (message,) = queue.receive(1, 0, visibility_timeout=30)
+        counts.append(message.receive_count)
+        queue.release([message])
+    assert counts == [1, 2, 3]
+
+
+def test_extend_keeps_a_message_hidden(queue):
+    queue.send([encode_body(["a"])])
+    messages = queue.receive(1, 0, visibility_timeout=0.1)
+    queue.extend(messages, 30)
+    time.sleep(0.15)
+    assert queue.receive(1, 0) == []
+
+
+def test_stale_receipt_cannot_delete_a_redelivered_message(queue):
+    queue.send([encode_body(["a"])])
+    (stale,) = queue.receive(1, 0, visibility_timeout=0)
+    (current,) = queue.receive(1, 0, visibility_timeout=30)
+    queue.delete(stale)
+    assert queue.depth() == 1
+    queue.delete(current)
+    assert queue.depth() == 0
+
+
+def test_delayed_messages_wait_for_their_delay(queue):
+    queue.send([encode_body(["a"])], delay=0.2)
+    assert queue.receive(1, 0) == []
+    assert bodies(queue.receive(1, 1)) == [["a"]]
+
+
+def test_dead_letters_go_to_their_own_queue(queue):
+    queue.dead_letter(encode_body(["a"], 3), "scrape failed")
+    assert queue.depth() == 0
+    assert queue.depth(queue.dlq_name) == 1
+    assert queue.receive(10, 0) == []
@@ -0,0 +1,31 @@
+"""
+Run summaries: which accounts count as scraped, and merging shards.
+"""
+from worker_pool import merge_summaries, scrape_each
+
+
+def test_only_finished_walks_count_as_scraped():
+    results = {
+        "done": {"user_id": "1", "followers": [{"pk": "10"}, {"pk": "11"}]},
+        "streamed": {"user_id": "2", "followers_written": 5},
+        "halfway": {"user_id": "3", "followers": [], "error": "timed out"},
+        "no_id": {"user_id": None},
+        "crashed": None,
+    }
+    summary = scrape_each(list(results), results.get)
+    assert summary["scraped"] == ["done", "streamed"]
+    assert summary["failed"] == ["halfway", "no_id", "crashed"]
+    assert summary["followers"] == 7
+    assert summary["errors"] == {
+        "halfway": "timed out",
+        "no_id": "user id not found",
+        "crashed": "no result",
+    }
+
+
+def test_merged_summary_keeps_failed_walks_failed():
+    first = scrape_each(["a"], lambda account: {"user_id": "1", "followers": []})
+    second = scrape_each(["b"], lambda account: {"user_id": "2", "error": "429"})
+    merged = merge_summaries([first, second])
+    assert (merged["scraped"], merged["failed"]) == (["a"], ["b"])
+    assert merged["errors"] == {"b": "429"}
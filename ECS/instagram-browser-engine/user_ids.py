@@ -0,0 +1,95 @@
+"""
+Persistent username -> user id cache.
+
+Finding a target's numeric id means opening the profile, clicking the
+followers link and catching the friendships request, although the id of
+an account never changes. ``UserIdCache`` remembers every resolution in a
+small SQLite file, and is also seeded with the ``pk``/``username`` of every
+scraped follower, so most targets resolve without the browser. Entries
+expire after ``ttl_days`` because usernames can be renamed or reused.
+
+A cache hit also skips the follower count the profile page showed; the
+scraper fetches it with one profile API request instead
+(``FollowerPaginator.followers_count``), so the count history in the
+scrape database has no gaps. That request is the price of a hit.
+"""
+import logging
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_ids (
+    username TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    resolved_at REAL NOT NULL,
+    source TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+PUT = "INSERT OR REPLACE INTO user_ids VALUES (?, ?, ?, ?)"
+
+
+class UserIdCache:
+    """
+    TTL-aware username -> user id map on disk.
+
+    :param path: SQLite file.
+    :param ttl_days: Age after which an entry is ignored.
+    """
+
+    def __init__(self, path, ttl_days: float = 30):
+        self.path = path
+        self.ttl = ttl_days * 24 * 60 * 60
+        # worker processes share the file; wait for a writer instead of failing
+        self.conn = sqlite3.connect(str(path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username: str) -> Optional[str]:
+        """The cached id of ``username``, or None if unknown or expired."""
+        row = self.conn.execute(
+            "SELECT user_id, resolved_at FROM user_ids WHERE username = ?",
+            (username.lower(),),
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, username: str, user_id, source: str = "profile") -> None:
+        with self.conn:
+            self.conn.execute(PUT, (username.lower(), str(user_id), time.time(), source))
+
+    def seed(self, users: Iterable[Dict]) -> int:
+        """Remember the ``pk`` of every API user dict in ``users``."""
+        now = time.time()
+        rows = [
+            (user["username"].lower(), str(user["pk"]), now, "follower")
+            for user in users
+            if user.get("username") and user.get("pk")
+        ]
+        if rows:
+            with self.conn:
+                self.conn.executemany(PUT, rows)
+        return len(rows)
+
+    def invalidate(self, username: str) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM user_ids WHERE username = ?", (username.lower(),))
+
+    def close(self) -> None:
+        if self.hits or self.misses:
+            logger.info(f"User id cache: {self.hits} hits, {self.misses} misses")
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,298 @@
+"""
+Queues that feed usernames to long-running workers.
+
+Two backends share one small interface:
+
+* ``SQSQueue`` talks to Amazon SQS through boto3 (optional, only needed
+  for this backend).
+* ``SQLiteQueue`` is a local stand-in with the same semantics (long
+  polling, visibility timeouts, receive counts and a dead-letter queue)
+  kept in one SQLite file, for development and tests.
+
+Both provide:
+
+    receive(max_messages, wait_seconds, visibility_timeout) -> [Message]
+    extend(messages, visibility_timeout)   # heartbeat for long accounts
+    release(messages)                      # make visible again right away
+    delete(message)
+    send(bodies, delay=0) -> int           # batches of up to 10
+    dead_letter(body, reason)
+    depth() -> int
+
+A message body is JSON, ``{"usernames": [...], "attempt": n}``. A single
+``{"username": ...}`` object, a JSON list or plain text with one or more
+usernames is accepted as well.
+"""
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import boto3
+except ImportError:  # only the SQS backend needs it
+    boto3 = None
+
+logger = logging.getLogger(__name__)
+
+# SQS limits: messages per receive/send/visibility batch and long-poll wait
+MAX_BATCH = 10
+MAX_WAIT_SECONDS = 20
+MAX_DELAY_SECONDS = 900
+
+SQLITE_PREFIX = "sqlite://"
+
+
+@dataclass
+class Message:
+    """One received message; ``receipt`` identifies this delivery of it."""
+    id: str
+    body: str
+    receipt: str
+    receive_count: int = 1
+
+
+def encode_body(usernames: Iterable[str], attempt: int = 0) -> str:
+    return json.dumps({"usernames": list(usernames), "attempt": attempt})
+
+
+def decode_body(body: str) -> Tuple[List[str], int]:
+    """Return ``(usernames, attempt)`` of a message body."""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        data = body
+    if isinstance(data, dict):
+        usernames = data.get("usernames") or [data.get("username")]
+        return [str(name).strip() for name in usernames if name], int(data.get("attempt", 0))
+    if isinstance(data, list):
+        return [str(name).strip() for name in data if name], 0
+    return [name for name in re.split(r"[\s,]+", str(data)) if name], 0
+
+
+def chunks(items: List, size: int = MAX_BATCH) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class SQSQueue:
+    """
+    Amazon SQS backend.
+
+    :param queue_url: URL of the work queue.
+    :param dlq_url: URL of the dead-letter queue. Without one, dead letters
+        are only logged.
+    :param client: boto3 SQS client, created from the environment if omitted.
+    """
+
+    def __init__(self, queue_url: str, dlq_url: Optional[str] = None, client=None):
+        if client is None:
+            if boto3 is None:
+                raise ImportError("The SQS queue needs boto3: pip install boto3")
+            client = boto3.client("sqs")
+        self.queue_url = queue_url
+        self.dlq_url = dlq_url
+        self.client = client
+
+    def receive(self, max_messages: int = MAX_BATCH, wait_seconds: float = MAX_WAIT_SECONDS, visibility_timeout: int = 300) -> List[Message]:
+        response = self.client.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=min(max_messages, MAX_BATCH),
+            WaitTimeSeconds=int(min(wait_seconds, MAX_WAIT_SECONDS)),
+            VisibilityTimeout=int(visibility_timeout),
+            AttributeNames=["ApproximateReceiveCount"],
+        )
+        return [
+            Message(
+                id=message["MessageId"],
+                body=message["Body"],
+                receipt=message["ReceiptHandle"],
+                receive_count=int(message.get("Attributes", {}).get("ApproximateReceiveCount", 1)),
+            )
+            for message in response.get("Messages", [])
+        ]
+
+    def _change_visibility(self, messages: List[Message], visibility_timeout: int) -> None:
+        for batch in chunks(messages):
+            response = self.client.change_message_visibility_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {"Id": str(n), "ReceiptHandle": message.receipt, "VisibilityTimeout": int(visibility_timeout)}
+                    for n, message in enumerate(batch)
+                ],
+            )
+            for failed in response.get("Failed", []):
+                logger.warning(f"Could not change visibility of {batch[int(failed['Id'])].id}: {failed.get('Message')}")
+
+    def extend(self, messages: List[Message], visibility_timeout: int) -> None:
+        self._change_visibility(messages, visibility_timeout)
+
+    def release(self, messages: List[Message]) -> None:
+        self._change_visibility(messages, 0)
+
+    def delete(self, message: Message) -> None:
+        self.client.delete_message(QueueUrl=self.queue_url, ReceiptHandle=message.receipt)
+
+    def send(self, bodies: List[str], delay: int = 0) -> int:
+        return self._send(self.queue_url, bodies, delay)
+
+    def _send(self, queue_url: str, bodies: List[str], delay: int = 0, attributes=None) -> int:
+        sent = 0
+        for batch in chunks(list(bodies)):
+            entries = [
+                {"Id": str(n), "MessageBody": body, "DelaySeconds": int(min(delay, MAX_DELAY_SECONDS))}
+                for n, body in enumerate(batch)
+            ]
+            if attributes:
+                for entry in entries:
+                    entry["MessageAttributes"] = attributes
+            response = self.client.send_message_batch(QueueUrl=queue_url, Entries=entries)
+            sent += len(response.get("Successful", []))
+            for failed in response.get("Failed", []):
+                logger.error(f"Could not send message: {failed.get('Message')}")
+        return sent
+
+    def dead_letter(self, body: str, reason: str) -> None:
+        if not self.dlq_url:
+            logger.error(f"No dead-letter queue configured, dropping {body}: {reason}")
+            return
+        attributes = {"error": {"DataType": "String", "StringValue": reason[:1024] or "unknown"}}
+        self._send(self.dlq_url, [body], attributes=attributes)
+
+    def depth(self) -> int:
+        response = self.client.get_queue_attributes(
+            QueueUrl=self.queue_url, AttributeNames=["ApproximateNumberOfMessages"]
+        )
+        return int(response["Attributes"]["ApproximateNumberOfMessages"])
+
+    def close(self) -> None:
+        pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    queue TEXT NOT NULL,
+    body TEXT NOT NULL,
+    visible_at REAL NOT NULL,
+    receipt TEXT,
+    receive_count INTEGER NOT NULL DEFAULT 0,
+    sent_at REAL NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_by_visibility ON messages (queue, visible_at);
+"""
+
+
+class SQLiteQueue:
+    """
+    Local SQS stand-in in one SQLite file.
+
+    Several processes can share the file; a receive claims its messages in
+    one write transaction, so no message is handed out twice while visible.
+
+    :param path: SQLite file.
+    :param name: Queue name; the dead-letter queue is ``<name>-dlq`` in the
+        same file.
+    :param poll_interval: Seconds between polls while long-polling.
+    """
+
+    def __init__(self, path, name: str = "scrape", poll_interval: float = 0.5):
+        self.path = Path(path)
+        self.name = name
+        self.dlq_name = f"{name}-dlq"
+        self.poll_interval = poll_interval
+        # heartbeats run on their own thread
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def _claim(self, max_messages: int, visibility_timeout: float) -> List[Message]:
+        # the connection commits the explicit transaction, or rolls it back on error
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            rows = self.conn.execute(
+                "SELECT id, body, receive_count FROM messages "
+                "WHERE queue = ? AND visible_at <= ? ORDER BY visible_at, id LIMIT ?",
+                (self.name, now, min(max_messages, MAX_BATCH)),
+            ).fetchall()
+            messages = [
+                Message(id=str(row[0]), body=row[1], receipt=uuid.uuid4().hex, receive_count=row[2] + 1)
+                for row in rows
+            ]
+            self.conn.executemany(
+                "UPDATE messages SET receipt = ?, visible_at = ?, receive_count = ? WHERE id = ?",
+                [(m.receipt, now + visibility_timeout, m.receive_count, int(m.id)) for m in messages],
+            )
+        return messages
+
+    def receive(self, max_messages: int = MAX_BATCH, wait_seconds: float = MAX_WAIT_SECONDS, visibility_timeout: int = 300) -> List[Message]:
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            messages = self._claim(max_messages, visibility_timeout)
+            if messages or time.monotonic() >= deadline:
+                return messages
+            time.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0)))
+
+    def extend(self, messages: List[Message], visibility_timeout: int) -> None:
+        with self._lock:
+            visible_at = time.time() + visibility_timeout
+            for message in messages:
+                changed = self.conn.execute(
+                    "UPDATE messages SET visible_at = ? WHERE id = ? AND receipt = ?",
+                    (visible_at, int(message.id), message.receipt),
+                ).rowcount
+                if not changed:
+                    logger.warning(f"Could not change visibility of {message.id}: receipt expired")
+
+    def release(self, messages: List[Message]) -> None:
+        self.extend(messages, 0)
+
+    def delete(self, message: Message) -> None:
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM messages WHERE id = ? AND receipt = ?", (int(message.id), message.receipt)
+            )
+
+    def send(self, bodies: List[str], delay: int = 0) -> int:
+        return self._send(self.name, bodies, delay)
+
+    def _send(self, queue: str, bodies: List[str], delay: float = 0, error: Optional[str] = None) -> int:
+        now = time.time()
+        rows = [(queue, body, now + min(delay, MAX_DELAY_SECONDS), now, error) for body in bodies]
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(
+                "INSERT INTO messages (queue, body, visible_at, sent_at, error) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def dead_letter(self, body: str, reason: str) -> None:
+        self._send(self.dlq_name, [body], error=reason)
+
+    def depth(self, queue: Optional[str] = None) -> int:
+        """Messages waiting in ``queue`` (this queue by default), in flight or not."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT count(*) FROM messages WHERE queue = ?", (queue or self.name,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def open_queue(url: str, dlq_url: Optional[str] = None):
+    """``sqlite:///path/queue.db`` opens the local stand-in, anything else is an SQS queue URL."""
+    if url.startswith(SQLITE_PREFIX):
+        return SQLiteQueue(url[len(SQLITE_PREFIX):])
+    return SQSQueue(url, dlq_url)
@@ -0,0 +1,194 @@
+"""
+Process pool that scrapes an account list with several browsers at once.
+
+One browser walks accounts one after another and mostly waits on the
+network, so a multi-vCPU task leaves most of its cores idle.
+``run_shards`` splits the target list into shards and hands each shard to
+its own worker process. Every worker launches its own browser and session,
+and streams its output to the shared data directory as usual. Each worker
+returns a run summary built by ``scrape_each``, which counts an account as
+scraped only when its follower walk finished, and the parent merges them
+with ``merge_summaries``.
+
+Accounts are sharded by a stable hash of the username rather than round
+robin. That way an interrupted account lands on the same worker (and the
+same per-worker checkpoint journal) when the run is repeated.
+
+``RateBudget`` paces follower API requests across every process, so the
+total request rate stays at the configured value however many workers
+run.
+"""
+import logging
+import multiprocessing
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# workers are spawned, not forked: Chrome and its driver threads do not survive a fork
+CONTEXT = multiprocessing.get_context("spawn")
+
+# set in each worker process by use_budget
+_budget = None
+
+
+class RateBudget:
+    """
+    At most ``rate`` requests per second, shared by every process.
+
+    Each ``acquire`` reserves the next free slot on a shared timeline and
+    sleeps until it comes up. The state lives in shared memory, so the
+    budget must reach workers at process creation (``initargs``), not
+    through a queue.
+
+    :param rate: Requests per second across all processes.
+    :param ctx: Multiprocessing context of the processes sharing it.
+    """
+
+    def __init__(self, rate: float, ctx=CONTEXT):
+        self.interval = 1.0 / rate
+        self._next = ctx.Value("d", 0.0, lock=False)
+        self._waited = ctx.Value("d", 0.0, lock=False)
+        self._lock = ctx.Lock()
+
+    def acquire(self) -> float:
+        """Wait for a request slot; returns the seconds spent waiting."""
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next.value)
+            self._next.value = slot + self.interval
+            self._waited.value += slot - now
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    @property
+    def waited(self) -> float:
+        """Total seconds every process has waited on the budget."""
+        return self._waited.value
+
+
+def current_budget() -> Optional[RateBudget]:
+    """The budget this process paces its requests with, if any."""
+    return _budget
+
+
+def shard(accounts: Iterable[str], workers: int) -> List[List[str]]:
+    """Split ``accounts`` (deduplicated, order kept) into at most ``workers`` shards."""
+    shards = [[] for _ in range(max(workers, 1))]
+    for account in dict.fromkeys(accounts):
+        shards[zlib.crc32(account.lower().encode("utf-8")) % len(shards)].append(account)
+    return [part for part in shards if part]
+
+
+def use_budget(budget: Optional[RateBudget]) -> None:
+    """Make ``budget`` the one ``current_budget`` returns in this process."""
+    global _budget
+    _budget = budget
+
+
+def run_shards(
+    shards: List[List[str]],
+    worker: Callable[[int, List[str]], Dict],
+    budget: Optional[RateBudget] = None,
+) -> List[Dict]:
+    """
+    Run ``worker(index, accounts)`` for every shard, one process each.
+
+    ``worker`` must be a module-level function, since it is pickled into a
+    freshly spawned process. Returns one summary per shard.
+    A worker that raised gets a summary with every account marked failed.
+    """
+    summaries = []
+    with ProcessPoolExecutor(
+        max_workers=len(shards),
+        mp_context=CONTEXT,
+        initializer=use_budget,
+        initargs=(budget,),
+    ) as pool:
+        futures = {
+            pool.submit(worker, index, accounts): (index, accounts)
+            for index, accounts in enumerate(shards)
+        }
+        for future in as_completed(futures):
+            index, accounts = futures[future]
+            try:
+                summary = future.result() or empty_summary(accounts)
+            except Exception as e:
+                logger.error(f"Worker {index} failed: {e}")
+                summary = empty_summary(accounts)
+                summary["failed"] = list(accounts)
+                summary["errors"] = {account: f"worker failed: {e}" for account in accounts}
+            summary["worker"] = index
+            summaries.append(summary)
+    return sorted(summaries, key=lambda summary: summary["worker"])
+
+
+def empty_summary(accounts: List[str]) -> Dict:
+    return {
+        "accounts": len(accounts),
+        "scraped": [],
+        "failed": [],
+        "errors": {},
+        "followers": 0,
+        "start_time": time.time(),
+        "end_time": time.time(),
+    }
+
+
+def walk_finished(result: Optional[Dict]) -> bool:
+    """
+    True if a ``get_user_information`` result walked its followers to the
+    end. A result with a user id but an ``error`` stopped halfway.
+    """
+    return bool(result and result.get("user_id") and not result.get("error"))
+
+
+def failure_reason(result: Optional[Dict]) -> str:
+    if not result:
+        return "no result"
+    return result.get("error") or "user id not found"
+
+
+def scrape_each(accounts: List[str], scrape_one: Callable[[str], Optional[Dict]]) -> Dict:
+    """
+    Run ``scrape_one(account) -> result`` for every account and return the
+    run summary. Only accounts whose walk finished count as scraped;
+    ``errors`` maps each failed account to why.
+    """
+    summary = empty_summary(accounts)
+    for account in accounts:
+        result = scrape_one(account)
+        if walk_finished(result):
+            summary["scraped"].append(account)
+            summary["followers"] += result.get("followers_written", len(result.get("followers", [])))
+        else:
+            summary["failed"].append(account)
+            summary["errors"][account] = failure_reason(result)
+    summary["end_time"] = time.time()
+    return summary
+
+
+def merge_summaries(summaries: List[Dict], budget: Optional[RateBudget] = None) -> Dict:
+    """Combine per-worker summaries into one run summary."""
+    merged = {
+        "workers": len(summaries),
+        "accounts": sum(summary["accounts"] for summary in summaries),
+        "scraped": [account for summary in summaries for account in summary["scraped"]],
+        "failed": [account for summary in summaries for account in summary["failed"]],
+        "errors": {
+            account: error
+            for summary in summaries
+            for account, error in summary.get("errors", {}).items()
+        },
+        "followers": sum(summary["followers"] for summary in summaries),
+        "start_time": min((summary["start_time"] for summary in summaries), default=time.time()),
+        "end_time": max((summary["end_time"] for summary in summaries), default=time.time()),
+        "per_worker": summaries,
+    }
+    if budget is not None:
+        merged["rate_budget_wait"] = budget.waited
+    return merged